@@ -0,0 +1,590 @@
+"""Many independent sessions stepped at once with NumPy.
+
+BatchSimulation keeps the state of N runs in arrays, one row per session:
+the player, the power-up timers, the guardian, and the upcoming obstacles,
+coins and power-ups in per-session ring buffers.  One step() applies the
+rules of Player.update, ChasingEnemy.update, Simulation.update and
+check_collisions to every row with vectorized operations, so the cost of a
+step barely depends on N.
+
+The rules are the scalar ones, with these differences:
+
+* Random draws come from one numpy Generator for the whole batch, so a
+  session does not reproduce the Simulation with the same seed; the two
+  agree in distribution.  `python batch_sim.py --validate` plays the same
+  random policy through both and checks that mean survival distance and
+  score agree within three standard errors, and prints the death reasons.
+* Track content is laid out as in track_gen.py, but only what is within
+  reach of the player is looked at, so obstacles must be more than 100
+  units apart and power-ups more than 80 (one per collision window), and
+  a tick must not travel further than that.
+* Messages that embed the lives left are reduced to their first words
+  ("Life lost!", "Guardian touched you!"); they never end a run.
+* Coins do not spin and power-ups do not rotate: neither affects a rule.
+
+A finished session keeps its final distance, score and reason in the
+final_* arrays and, with auto_reset, starts a new run on the same step.
+
+    python batch_sim.py --sessions 4096 --steps 2000    # session-steps/sec
+    python batch_sim.py --validate                      # compare with Simulation
+"""
+import argparse
+import math
+import random
+import statistics
+import time
+from collections import Counter
+
+import numpy as np
+
+from simulation import POWER_UPS, Action, Difficulty, GameState, PowerUpType, Simulation, TICK
+from track_gen import OBSTACLE_AHEAD, POWER_UP_AHEAD
+
+
+NO_ACTION = -1
+
+# Reason codes; REASONS[code] is the text Simulation.game_over_reason would hold
+REASONS = (
+    "",
+    "Hit low barrier! Should have slid!",
+    "Didn't slide low enough!",
+    "Hit high barrier! Should have jumped higher!",
+    "Fell in gap! Should have jumped!",
+    "Caught by Guardian for repeated failures!",
+    "Life lost!",
+    "Caught by the Ancient Guardian!",
+    "Guardian touched you!",
+)
+HIT_LOW, HIT_SLIDE, HIT_HIGH, HIT_GAP, REPEATED, LIFE_LOST, CAUGHT, TOUCHED = range(1, 9)
+
+OBSTACLE_TYPES = ('low', 'high', 'gap')
+LOW, HIGH, GAP = range(3)
+
+# Ticks each power-up lasts, indexed by PowerUpType
+POWER_UP_TICKS = np.array([POWER_UPS[kind].duration for kind in sorted(POWER_UPS)])
+LOOKAHEAD = 1000  # Track laid out this far past the player
+
+
+def swept_hits(offset, previous_offset, reach):
+    """Vectorized simulation.swept_hit: within reach now, or passed clean through."""
+    return ((np.abs(offset) < reach) |
+            ((offset <= -reach) & (previous_offset >= reach)) |
+            ((offset >= reach) & (previous_offset <= -reach)))
+
+
+class _Ring:
+    """Per-session FIFO of fixed capacity: columns of shape (sessions, size)."""
+
+    def __init__(self, sessions, size, **columns):
+        self.size = size
+        self.head = np.zeros(sessions, dtype=np.int64)
+        self.tail = np.zeros(sessions, dtype=np.int64)
+        for name, dtype in columns.items():
+            setattr(self, name, np.zeros((sessions, size), dtype=dtype))
+
+    def push(self, rows, **values):
+        slots = self.tail[rows] % self.size
+        for name, value in values.items():
+            getattr(self, name)[rows, slots] = value
+        self.tail[rows] += 1
+        if np.any(self.tail[rows] - self.head[rows] > self.size):
+            raise RuntimeError("ring buffer overflow; the track is denser than its size allows")
+
+    def window(self, width):
+        """Slots of the first width entries of every session, and which of them exist."""
+        offsets = np.arange(width)
+        slots = (self.head[:, None] + offsets) % self.size
+        return slots, offsets < (self.tail - self.head)[:, None]
+
+    def advance(self, done):
+        """Drop entries off the head while done(rows, slots) says so."""
+        rows = np.arange(len(self.head))
+        for _ in range(self.size):
+            slots = self.head % self.size
+            drop = (self.head < self.tail) & done(rows, slots)
+            if not drop.any():
+                break
+            self.head += drop
+
+    def clear(self, rows):
+        self.head[rows] = 0
+        self.tail[rows] = 0
+
+
+class BatchSimulation:
+    """N game sessions advanced in lockstep, one tick per step()."""
+
+    def __init__(self, sessions, seed=None, difficulty=None, auto_reset=True, delta_time=TICK):
+        self.n = sessions
+        self.rng = np.random.default_rng(seed)
+        self.difficulty = difficulty if difficulty is not None else Difficulty()
+        self.auto_reset = auto_reset
+        self.delta_time = delta_time
+
+        obstacle_gap = self.difficulty.obstacle_gap
+        power_up_gap = self.difficulty.power_up_gap
+        if obstacle_gap[0] <= 100 or power_up_gap[0] <= 80:
+            raise ValueError("BatchSimulation needs obstacles more than 100 apart "
+                             "and power-ups more than 80 apart")
+        # Enough room for everything from just behind the player to LOOKAHEAD
+        groups = math.ceil((LOOKAHEAD + 400 + obstacle_gap[1]) / obstacle_gap[0]) + 2
+        self.obstacles = _Ring(sessions, groups, x=np.float64, y=np.float64,
+                               type=np.int8, active=bool)
+        self.coins = _Ring(sessions, 3 * groups, x=np.float64, y=np.float64, collected=bool)
+        self.power_ups = _Ring(sessions, math.ceil((LOOKAHEAD + power_up_gap[1]) / power_up_gap[0]) + 2,
+                               x=np.float64, y=np.float64, type=np.int8, collected=bool)
+        # Coins that can be within 300 of the player, plus a few already passed
+        self.coin_window = min(3 * (math.ceil(700 / obstacle_gap[0]) + 2), self.coins.size)
+
+        zeros = np.zeros
+        n = sessions
+        # Player
+        self.x = zeros(n)
+        self.target_x = zeros(n)
+        self.lane = zeros(n, dtype=np.int8)
+        self.z = zeros(n)
+        self.jumping = zeros(n, dtype=bool)
+        self.sliding = zeros(n, dtype=bool)
+        self.jump_velocity = zeros(n)
+        self.slide_timer = zeros(n, dtype=np.int32)
+        self.timers = zeros((n, 6), dtype=np.int32)  # Power-up ticks left, by PowerUpType
+        self.can_double_jump = zeros(n, dtype=bool)
+        self.has_double_jumped = zeros(n, dtype=bool)
+        self.flying_animation = zeros(n, dtype=np.int32)
+        # Guardian
+        self.enemy_x = zeros(n)
+        self.enemy_y = zeros(n)
+        self.previous_enemy_y = zeros(n)  # Where the last tick started, for swept collisions
+        self.enemy_target_x = zeros(n)
+        self.enemy_speed = zeros(n)
+        self.pursuit = zeros(n, dtype=bool)
+        self.has_lost_life = zeros(n, dtype=bool)  # last_life_lost_time is not None
+        self.last_life_lost_time = zeros(n)
+        self.life_lost_count = zeros(n, dtype=np.int32)
+        # Session
+        self.distance = zeros(n)
+        self.previous_distance = zeros(n)
+        self.speed = zeros(n)
+        self.score = zeros(n)
+        self.coins_collected = zeros(n, dtype=np.int64)
+        self.lives = zeros(n, dtype=np.int64)
+        self.last_speed_increase_score = zeros(n)
+        self.reason = zeros(n, dtype=np.int8)
+        self.time = zeros(n)
+        self.ticks = zeros(n, dtype=np.int64)
+        self.float_offset = zeros(n)
+        self.next_obstacle_y = zeros(n)
+        self.next_power_up_y = zeros(n)
+        self.alive = zeros(n, dtype=bool)
+        # Outcome of each session's last finished run
+        self.episodes = zeros(n, dtype=np.int64)
+        self.final_distance = zeros(n)
+        self.final_score = zeros(n)
+        self.final_reason = zeros(n, dtype=np.int8)
+        self.final_ticks = zeros(n, dtype=np.int64)
+
+        self.reset()
+
+    def reset(self, rows=None):
+        """Start a fresh run in the given sessions (all of them by default)."""
+        if rows is None:
+            rows = np.arange(self.n)
+        elif rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+
+        for name in ('x', 'target_x', 'lane', 'jumping', 'sliding', 'jump_velocity', 'slide_timer',
+                     'can_double_jump', 'has_double_jumped', 'flying_animation', 'enemy_x',
+                     'enemy_target_x', 'pursuit', 'has_lost_life', 'last_life_lost_time',
+                     'life_lost_count', 'distance', 'previous_distance', 'score', 'coins_collected',
+                     'last_speed_increase_score', 'reason', 'time', 'ticks', 'float_offset'):
+            getattr(self, name)[rows] = 0
+        self.timers[rows] = 0
+        self.z[rows] = 20
+        self.enemy_y[rows] = -300
+        self.previous_enemy_y[rows] = -300
+        self.enemy_speed[rows] = 1.5
+        self.speed[rows] = 3
+        self.lives[rows] = 5
+        self.alive[rows] = True
+
+        for ring in (self.obstacles, self.coins, self.power_ups):
+            ring.clear(rows)
+        self.next_obstacle_y[rows] = 100 + OBSTACLE_AHEAD
+        self.next_power_up_y[rows] = 800 + POWER_UP_AHEAD
+        self._lay_track()
+
+    def step(self, actions=None):
+        """Apply one action per session (NO_ACTION for none) and advance a tick.
+
+        Returns a boolean mask of the sessions whose run ended on this step.
+        """
+        if actions is not None:
+            self._apply(np.asarray(actions))
+        self.ticks += 1
+        self._update()
+
+        ended = self.alive & (self.lives <= 0)
+        if ended.any():
+            self.final_distance[ended] = self.distance[ended]
+            self.final_score[ended] = self.score[ended]
+            self.final_reason[ended] = self.reason[ended]
+            self.final_ticks[ended] = self.ticks[ended]
+            self.episodes += ended
+            self.alive &= ~ended
+            if self.auto_reset:
+                self.reset(ended)
+        return ended
+
+    def _apply(self, actions):
+        flying = self.timers[:, PowerUpType.FLYING] > 0
+        lane = self.lane
+
+        left = (actions == Action.LEFT) & (lane > -1)
+        right = (actions == Action.RIGHT) & (lane < 1)
+        lane -= left
+        lane += right
+        turned = left | right
+        self.target_x[turned] = lane[turned] * 100
+
+        jump = (actions == Action.JUMP) & ~flying
+        start = jump & ~self.jumping & ~self.sliding
+        double = jump & self.jumping & self.can_double_jump & ~self.has_double_jumped
+        self.jumping |= start
+        self.jump_velocity[start] = 25
+        self.jump_velocity[double] = 50
+        self.has_double_jumped |= double
+
+        slide = (actions == Action.SLIDE) & ~flying & ~self.jumping & ~self.sliding
+        self.sliding |= slide
+        self.slide_timer[slide] = 180
+
+    def _lay_track(self):
+        """Lay out obstacles, their coins and power-ups up to LOOKAHEAD past every player."""
+        rng = self.rng
+        low, high = self.difficulty.obstacle_gap
+        while True:
+            rows = np.flatnonzero(self.next_obstacle_y < self.distance + LOOKAHEAD)
+            if not rows.size:
+                break
+            y = self.next_obstacle_y[rows]
+            lane = rng.integers(-1, 2, rows.size)
+            self.obstacles.push(rows, x=lane * 100, y=y, type=rng.integers(0, 3, rows.size), active=True)
+            for i in range(3):
+                coin_lane = rng.integers(-1, 2, rows.size)
+                other = coin_lane != lane
+                self.coins.push(rows[other], x=coin_lane[other] * 100, y=y[other] - 400 + i * 150,
+                                collected=False)
+            self.next_obstacle_y[rows] = y + rng.integers(low, high + 1, rows.size)
+
+        low, high = self.difficulty.power_up_gap
+        while True:
+            rows = np.flatnonzero(self.next_power_up_y < self.distance + LOOKAHEAD)
+            if not rows.size:
+                break
+            y = self.next_power_up_y[rows]
+            self.power_ups.push(rows, x=rng.integers(-1, 2, rows.size) * 100, y=y,
+                                type=rng.integers(0, 6, rows.size), collected=False)
+            self.next_power_up_y[rows] = y + rng.integers(low, high + 1, rows.size)
+
+    def _retire(self):
+        """Move every ring head to the first entry still within reach, now or
+        over the tick (see swept_hits)."""
+        distance = self.distance
+        previous = self.previous_distance
+
+        def behind(y, reach):
+            return (y <= distance - reach) & (y < previous + reach)
+
+        self.obstacles.advance(lambda rows, slots: behind(self.obstacles.y[rows, slots], 50))
+        self.coins.advance(lambda rows, slots: self.coins.collected[rows, slots] |
+                           ((self.coins.y[rows, slots] < distance - 300) &
+                            (self.coins.y[rows, slots] < previous + 300)))
+        self.power_ups.advance(lambda rows, slots: self.power_ups.collected[rows, slots] |
+                               behind(self.power_ups.y[rows, slots], 40))
+
+    def _update(self):
+        difficulty = self.difficulty
+        dt = self.delta_time
+        self.time += dt
+
+        # Guardian pursuit cools down after 20 seconds without a second mistake
+        cooled = self.has_lost_life & (self.time - self.last_life_lost_time > 20) & (self.life_lost_count < 2)
+        self.life_lost_count[cooled] = 0
+        self.has_lost_life &= ~cooled
+
+        self._update_players()
+        self._update_guardians()
+
+        speed = np.where(self.timers[:, PowerUpType.SPEED_BOOST] > 0, self.speed * 2.0, self.speed)
+        self.previous_distance = self.distance.copy()
+        self.distance += speed * dt * 60
+        self.score += 0.2
+
+        milestone = difficulty.speed_milestone
+        up = (self.score // milestone) > (self.last_speed_increase_score // milestone)
+        self.speed[up] = np.minimum(self.speed[up] + difficulty.speed_step, difficulty.max_speed)
+        self.last_speed_increase_score[up] = self.score[up]
+
+        self._lay_track()
+        self._retire()
+        self._check_collisions()
+        self._update_pickups()
+
+    def _update_players(self):
+        x, target_x = self.x, self.target_x
+        self.x = np.where(np.abs(x - target_x) > 1, np.where(x < target_x, x + 2, x - 2), target_x)
+
+        timers = self.timers
+        flying = timers[:, PowerUpType.FLYING] > 0
+        ground = ~flying
+        z = self.z
+
+        # Flying: ease towards a bobbing height of 200
+        self.flying_animation = np.where(flying, self.flying_animation + 1, 0)
+        target_z = 200 + np.sin(self.flying_animation * 0.1) * 25
+        flying_z = np.where(z < target_z, np.minimum(z + 5, target_z), target_z)
+
+        # On the ground: descend after flying, jump physics, slide timer
+        jumping = self.jumping
+        z = np.where(ground & (z > 20) & ~jumping, np.maximum(20, z - 8), z)
+        jumps = ground & jumping
+        z = np.where(jumps, z + self.jump_velocity, z)
+        self.jump_velocity = np.where(jumps, self.jump_velocity - 0.5, self.jump_velocity)
+        landed = jumps & (z <= 20)
+        z[landed] = 20
+        jumping &= ~landed
+        self.jump_velocity[landed] = 0
+        self.has_double_jumped &= ~landed
+
+        slides = ground & self.sliding
+        self.slide_timer -= slides
+        self.sliding &= ~(slides & (self.slide_timer <= 0))
+
+        self.z = np.where(flying, flying_z, z)
+        jumping &= ground
+        self.sliding &= ground
+        self.jump_velocity[flying] = 0
+
+        self.can_double_jump = timers[:, PowerUpType.DOUBLE_JUMP] > 0
+        np.subtract(timers, 1, out=timers, where=timers > 0)
+
+    def _update_guardians(self):
+        difficulty = self.difficulty
+        chasing = self.pursuit
+        behind = self.distance - self.enemy_y
+        speed = np.select([behind > 100, behind < 30],
+                          [difficulty.guardian_far_speed, difficulty.guardian_near_speed],
+                          difficulty.guardian_speed)
+        self.enemy_speed = np.where(chasing, speed, self.enemy_speed)
+        self.previous_enemy_y = self.enemy_y.copy()
+        self.enemy_y += np.where(chasing, speed * self.delta_time * 60, 0)
+
+        follow = chasing & (self.rng.random(self.n) < 1 / 30)
+        self.enemy_target_x[follow] = self.lane[follow] * 100
+        ex, tx = self.enemy_x, self.enemy_target_x
+        moved = np.where(np.abs(ex - tx) > 2, np.where(ex < tx, ex + 3, ex - 3), tx)
+        self.enemy_x = np.where(chasing, moved, ex)
+
+    def _check_collisions(self):
+        rows = np.arange(self.n)
+        distance = self.distance
+        previous = self.previous_distance
+        x, z = self.x, self.z
+        timers = self.timers
+        flying = timers[:, PowerUpType.FLYING] > 0
+        exposed = (timers[:, PowerUpType.SHIELD] <= 0) & ~flying
+        now = self.time
+
+        # Obstacles: at most the ring head is within 50 of the player
+        obstacles = self.obstacles
+        slot = obstacles.head % obstacles.size
+        kind = obstacles.type[rows, slot]
+        contact = (exposed & (obstacles.head < obstacles.tail) & obstacles.active[rows, slot] &
+                   (np.abs(obstacles.x[rows, slot] - x) < 50) &
+                   swept_hits(obstacles.y[rows, slot] - distance, obstacles.y[rows, slot] - previous, 50))
+        sliding = self.sliding
+        code = np.select([(kind == LOW) & ~sliding,
+                          (kind == LOW) & sliding & (z > 25),
+                          (kind == HIGH) & (z < 70),
+                          (kind == GAP) & (z < 30)],
+                         [HIT_LOW, HIT_SLIDE, HIT_HIGH, HIT_GAP], 0)
+        hit = contact & (code > 0)
+        cleared = contact & (code == 0)
+        obstacles.active[rows[contact], slot[contact]] = False
+        self.reason[hit] = code[hit]
+        self.lives -= hit
+
+        # First mistake wakes the guardian; a second within 20 s lets it catch up
+        first = hit & ~self.has_lost_life
+        recent = now - self.last_life_lost_time <= 20
+        again = hit & self.has_lost_life & recent
+        later = hit & self.has_lost_life & ~recent
+        restart = first | later
+        self.life_lost_count[restart] = 1
+        self.last_life_lost_time[restart] = now[restart]
+        self.has_lost_life |= restart
+        self.pursuit |= restart
+        self.enemy_y[restart] = np.maximum(self.enemy_y[restart], distance[restart] - 150)
+        self.previous_enemy_y[restart] = self.enemy_y[restart]
+
+        self.life_lost_count += again
+        rush = again & (self.life_lost_count >= 2)
+        self.enemy_y[rush] = distance[rush] - 30
+        self.previous_enemy_y[rush] = self.enemy_y[rush]
+        self.enemy_speed[rush] = 5.0
+        self.lives -= rush
+        self.reason[rush] = REPEATED
+        self.life_lost_count[rush] = 0
+        self.has_lost_life &= ~rush
+
+        self.reason[hit & (self.lives > 0) & (self.life_lost_count < 2)] = LIFE_LOST
+        self.jumping &= ~hit
+        self.sliding &= ~hit
+        self.z[hit] = 20
+
+        self.score += np.select([cleared & (kind == LOW) & sliding,
+                                 cleared & (kind == HIGH) & (z > 60),
+                                 cleared & (kind == GAP) & (z > 30)], [150, 200, 250], 0)
+
+        # The guardian itself
+        caught = (self.pursuit & exposed & (np.abs(self.enemy_x - x) < 40) &
+                  swept_hits(self.enemy_y - distance, self.previous_enemy_y - previous, 40))
+        self.lives -= caught
+        self.reason[caught] = np.where(self.lives[caught] <= 0, CAUGHT, TOUCHED)
+        self.enemy_y -= np.where(caught & (self.lives > 0), 80, 0)
+
+        # Coins: flying sweeps a 300 window in every lane, otherwise a 40 box
+        coins = self.coins
+        slots, exists = coins.window(self.coin_window)
+        coin_rows = rows[:, None]
+        coin_x = coins.x[coin_rows, slots]
+        coin_y = coins.y[coin_rows, slots]
+        coin_dy = coin_y - distance[:, None]
+        coin_previous_dy = coin_y - previous[:, None]
+        free = exists & ~coins.collected[coin_rows, slots]
+        near = (swept_hits(coin_dy, coin_previous_dy, 40) & (np.abs(coin_x - x[:, None]) < 40) &
+                (np.abs(30 - z) < 40)[:, None])
+        picked = free & np.where(flying[:, None], swept_hits(coin_dy, coin_previous_dy, 300), near)
+        coins.collected[np.broadcast_to(coin_rows, slots.shape)[picked], slots[picked]] = True
+        count = picked.sum(axis=1)
+        self.coins_collected += count
+        self.score += count * np.where(timers[:, PowerUpType.COIN_MULTIPLIER] > 0, 30, 10)
+
+        # Power-ups: at most the ring head is within 40
+        power_ups = self.power_ups
+        slot = power_ups.head % power_ups.size
+        got = ((power_ups.head < power_ups.tail) & ~power_ups.collected[rows, slot] &
+               (np.abs(power_ups.x[rows, slot] - x) < 40) &
+               swept_hits(power_ups.y[rows, slot] - distance, power_ups.y[rows, slot] - previous, 40) &
+               (np.abs(30 + self.float_offset - self.z) < 40))
+        if got.any():
+            got_rows = rows[got]
+            kind = power_ups.type[got_rows, slot[got]]
+            power_ups.collected[got_rows, slot[got]] = True
+            timers[got_rows, kind] = POWER_UP_TICKS[kind]
+            flown = got_rows[kind == PowerUpType.FLYING]
+            self.jumping[flown] = False
+            self.sliding[flown] = False
+            self.jump_velocity[flown] = 0
+            self.score += got * 50
+
+    def _update_pickups(self):
+        self.float_offset = np.sin(self.time * 3) * 10
+
+        magnet = self.timers[:, PowerUpType.MAGNET] > 0
+        if not magnet.any():
+            return
+        coins = self.coins
+        rows = np.flatnonzero(magnet)[:, None]
+        slots, exists = coins.window(self.coin_window)
+        slots, exists = slots[magnet], exists[magnet]
+        coin_x = coins.x[rows, slots]
+        coin_y = coins.y[rows, slots]
+        dx = self.x[rows] - coin_x
+        dy = self.distance[rows] - coin_y
+        pulled = (exists & ~coins.collected[rows, slots] & (np.abs(dy) < 600) &
+                  (np.sqrt(dx * dx + dy * dy) < 200))
+        coins.x[rows, slots] = np.where(pulled, coin_x + dx * 0.15, coin_x)
+        coins.y[rows, slots] = np.where(pulled, coin_y + dy * 0.15, coin_y)
+
+    def outcomes(self):
+        """(distance, score, reason) of the last finished run of every session that has one."""
+        done = np.flatnonzero(self.episodes > 0)
+        return [(self.final_distance[i], self.final_score[i], REASONS[self.final_reason[i]])
+                for i in done]
+
+
+def random_actions(rng, sessions, tick):
+    """The sweep's random policy: a random move every quarter second."""
+    if tick % 15:
+        return np.full(sessions, NO_ACTION)
+    return rng.integers(0, 4, sessions)
+
+
+def validate(sessions, seed):
+    """Play the random policy through both simulators and compare the outcomes."""
+    batch = BatchSimulation(sessions, seed=seed, auto_reset=False)
+    rng = np.random.default_rng(seed + 1)
+    tick = 0
+    while batch.alive.any():
+        batch.step(random_actions(rng, sessions, tick))
+        tick += 1
+    batch_runs = batch.outcomes()
+
+    scalar_runs = []
+    moves = (Action.LEFT, Action.RIGHT, Action.JUMP, Action.SLIDE)
+    for session in range(sessions):
+        sim = Simulation(seed=seed + session)
+        policy = random.Random(seed + session)
+        sim.step([Action.START])
+        tick = 0
+        while sim.game_state == GameState.PLAYING:
+            sim.step([policy.choice(moves)] if tick % 15 == 0 else [])
+            tick += 1
+        scalar_runs.append((sim.distance, sim.score, sim.game_over_reason))
+
+    agree = True
+    print(f"{sessions} sessions each, random policy")
+    print(f"{'':<18}{'scalar':>12}{'batch':>12}{'allowed':>12}")
+    for column, name in ((0, "mean distance"), (1, "mean score")):
+        scalar = [run[column] for run in scalar_runs]
+        batched = [run[column] for run in batch_runs]
+        difference = statistics.fmean(batched) - statistics.fmean(scalar)
+        allowed = 3 * math.sqrt(statistics.variance(scalar) / len(scalar) +
+                                statistics.variance(batched) / len(batched))
+        agree &= abs(difference) <= allowed
+        print(f"{name:<18}{statistics.fmean(scalar):>12.1f}{statistics.fmean(batched):>12.1f}"
+              f"{'+-%.1f' % allowed:>12}")
+    scalar_reasons = Counter(run[2] for run in scalar_runs)
+    batch_reasons = Counter(run[2] for run in batch_runs)
+    for reason in sorted(set(scalar_reasons) | set(batch_reasons)):
+        print(f"  {reason:<46}{scalar_reasons[reason] / sessions:>7.1%}{batch_reasons[reason] / sessions:>8.1%}")
+    print("agree" if agree else "DISAGREE")
+    return agree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized Temple Run 3D batch simulator")
+    parser.add_argument("--sessions", type=int, default=4096)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--validate", action="store_true",
+                        help="compare outcome statistics with the scalar Simulation")
+    args = parser.parse_args()
+
+    if args.validate:
+        raise SystemExit(0 if validate(min(args.sessions, 1000), args.seed) else 1)
+
+    batch = BatchSimulation(args.sessions, seed=args.seed)
+    rng = np.random.default_rng(args.seed + 1)
+    start = time.perf_counter()
+    for tick in range(args.steps):
+        batch.step(random_actions(rng, args.sessions, tick))
+    elapsed = time.perf_counter() - start
+    print(f"{args.sessions} sessions x {args.steps} steps in {elapsed:.2f}s: "
+          f"{args.sessions * args.steps / elapsed:,.0f} session-steps/s, "
+          f"{int(batch.episodes.sum())} runs finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Offscreen rendering benchmark.
+
+Builds a few fixed scenes by playing seeded scenarios (see bench_sim.py),
+then draws each one repeatedly through escape_runner's own draw_frame() on
+an offscreen EGL or OSMesa context, so render throughput can be measured on
+a Linux box with no GPU and no display (Mesa llvmpipe).
+
+    python bench_render.py                       # every scene, 200 frames each
+    python bench_render.py --scene coin_storm --frames 500
+    python bench_render.py --snapshot out/       # also save each scene as a PPM
+    python bench_render.py --renderer shader     # the GL 3.3 instanced backend
+    python bench_render.py --quality low         # at a reduced quality tier
+
+For each scene it reports frames per second of wall time, the CPU time of
+the first (cold cache) frame and of an average frame, and the mean CPU time
+of every draw function.  llvmpipe rasterizes when the frame is flushed, so
+that work shows up in the "finish" phase rather than in the draw functions.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+
+import offscreen
+from bench_sim import (Scenario, hold_coin_storm, hold_flying, hold_pursuit,
+                       setup_pursuit, ENDLESS_LIVES)
+from quality import TIER_NAMES
+
+
+WIDTH, HEIGHT = 1000, 800
+
+
+def hold_lives(sim):
+    sim.player_lives = ENDLESS_LIVES
+
+
+def hold_status(sim):
+    hold_pursuit(sim)
+    # Keep every power-up line of the HUD on screen
+    player = sim.player
+    player.magnet_timer = player.shield_timer = 600
+    player.speed_boost_timer = player.coin_multiplier_timer = 600
+    player.double_jump_timer = 900
+
+
+SCENES = [
+    Scenario("track", "plain run with obstacles, coins and power-ups", 900, hold_lives, seed=3),
+    Scenario("coin_storm", "magnet and three extra coins a tick", 900, hold_coin_storm),
+    Scenario("flying", "flying high above the track", 900, hold_flying),
+    Scenario("guardian", "guardian close behind, every power-up active",
+             900, hold_status, setup_pursuit),
+]
+
+
+def land(sim):
+    """End any jump: a snapshot taken at the top of one frames nothing but sky."""
+    player = sim.player
+    if player.flying_timer <= 0:
+        player.jumping = False
+        player.jump_velocity = 0
+        player.z = 20
+
+
+def save_ppm(path):
+    from OpenGL.GL import glReadPixels, GL_RGB, GL_UNSIGNED_BYTE
+
+    pixels = glReadPixels(0, 0, WIDTH, HEIGHT, GL_RGB, GL_UNSIGNED_BYTE)
+    row = WIDTH * 3
+    with open(path, "wb") as f:
+        f.write(b"P6 %d %d 255\n" % (WIDTH, HEIGHT))
+        for y in range(HEIGHT - 1, -1, -1):  # GL rows run bottom to top
+            f.write(pixels[y * row:(y + 1) * row])
+
+
+def render_scene(er, sim, frames):
+    """Draw sim frames times and return its timings."""
+    from OpenGL.GL import glFinish
+
+    profiler = er.profiler
+    er.sim = sim
+    er.timestep.alpha = 1.0  # Draw the current tick, not a blend with the previous one
+
+    cold_start = time.process_time()
+    er.draw_frame()
+    glFinish()
+    cold_ms = (time.process_time() - cold_start) * 1000
+
+    profiler.reset()
+    start = time.perf_counter()
+    for _ in range(frames):
+        profiler.next_frame()
+        er.draw_frame()
+        with profiler.phase("finish"):
+            glFinish()
+    profiler.next_frame()
+    elapsed = time.perf_counter() - start
+
+    summary = profiler.summary()
+    return {
+        "frames": frames,
+        "fps": frames / elapsed,
+        "cold_frame_cpu_ms": cold_ms,
+        "frame_cpu_ms": summary["frame"]["mean"],
+        "phase_cpu_ms": {name: stats["mean"] for name, stats in sorted(summary["phases"].items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offscreen Temple Run 3D rendering benchmark")
+    parser.add_argument("--platform", choices=offscreen.PLATFORMS, default="egl")
+    parser.add_argument("--frames", type=int, default=200, help="timed frames per scene")
+    parser.add_argument("--renderer", choices=("fixed", "shader"), default="fixed")
+    parser.add_argument("--quality", choices=TIER_NAMES, default=TIER_NAMES[0],
+                        help="render quality tier, held fixed (default %(default)s)")
+    parser.add_argument("--scene", action="append", metavar="NAME",
+                        help="render only the named scene (repeatable)")
+    parser.add_argument("--snapshot", metavar="DIR", help="save each scene to DIR/<scene>.ppm")
+    parser.add_argument("--output", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    scenes = [s for s in SCENES if not args.scene or s.name in args.scene]
+    if not scenes:
+        parser.error("no scene matches " + ", ".join(args.scene))
+
+    offscreen.use_platform(args.platform)
+    context = offscreen.create_context(WIDTH, HEIGHT)
+
+    # Imported only now: PyOpenGL fixes its platform on first import
+    from OpenGL.GL import glGetString, GL_RENDERER
+    import escape_runner as er
+    from hud_text import BlockFont, HudLayer
+
+    er.hud = HudLayer(glyph_class=BlockFont)  # GLUT fonts need glutInit and a window
+    er.profiler.timer = time.process_time
+    er.use_renderer(args.renderer)
+    er.quality.adaptive = False
+    er.quality.set_tier(args.quality)
+    er.apply_quality()
+    print(f"Renderer: {glGetString(GL_RENDERER).decode()}, {args.renderer} backend, {args.quality} quality")
+
+    results = {}
+    print(f"{'scene':<12}{'fps':>8}{'cold ms':>10}{'frame ms':>10}")
+    for scene in scenes:
+        sim, _ = scene.run()
+        land(sim)
+        result = results[scene.name] = render_scene(er, sim, args.frames)
+        print(f"{scene.name:<12}{result['fps']:>8.1f}{result['cold_frame_cpu_ms']:>10.2f}"
+              f"{result['frame_cpu_ms']:>10.2f}")
+        for name, ms in sorted(result["phase_cpu_ms"].items(), key=lambda item: -item[1]):
+            print(f"    {name:<22}{ms:>8.3f} ms")
+        if args.snapshot:
+            os.makedirs(args.snapshot, exist_ok=True)
+            save_ppm(os.path.join(args.snapshot, scene.name + ".ppm"))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        er.release_gl_resources()
+    context.release()
+
+
+if __name__ == "__main__":
+    main()
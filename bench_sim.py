@@ -0,0 +1,271 @@
+"""Headless benchmarks for the simulation hot loop.
+
+Each scenario drives a seeded Simulation with no window, holding some piece
+of state in place every tick (power-up timers, lives, speed) so the run
+keeps exercising the path it is meant to stress.  Every scenario is timed
+repeat times with a FrameProfiler attached, reporting the best steps/sec
+and the mean cost of each update() phase (player, enemy, generate_track,
+check_collisions, retire, pickups) from that run, then run once more under
+tracemalloc for peak traced memory and the number of memory blocks still
+allocated when the run ends (the live state of the finished Simulation;
+a leak grows it with the tick count).
+
+Raw steps/sec swings with whatever else the machine is doing, so timed runs
+stop every PAUSE_EVERY ticks for calibrate(), a fixed pure-Python loop, and
+throughput is compared as relative speed: steps/sec over calibration
+loops/sec.  Even so it is only advisory unless --strict is given.
+
+    python bench_sim.py                  # compare against bench_baselines.json
+    python bench_sim.py --strict         # throughput regressions fail too
+    python bench_sim.py --update         # store the current results as baselines
+    python bench_sim.py -k coin_storm    # run one scenario
+
+The exit status is 1 when memory regresses past its baseline by more than
+the tolerance, or throughput does under --strict.  Refresh the baselines
+with --update, all scenarios in one run.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from profiler import FrameProfiler
+from simulation import Action, GameState, Simulation
+
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baselines.json")
+ENDLESS_LIVES = 10 ** 9
+PHASES = ("player", "enemy", "generate_track", "check_collisions", "retire", "pickups")
+CALIBRATION_LOOPS = 5000  # Per calibrate() call; about 1 ms
+PAUSE_EVERY = 500  # Ticks between calibrations during a timed run
+
+
+class Scenario:
+    """A seeded run of ticks steps; hold(sim) is called before every step."""
+
+    def __init__(self, name, description, ticks, hold=None, setup=None, seed=1):
+        self.name = name
+        self.description = description
+        self.ticks = ticks
+        self.hold = hold
+        self.setup = setup
+        self.seed = seed
+
+    def run(self, profiler=None, scale=1.0, pause=None):
+        """Play the scenario and return the Simulation and the number of steps.
+        pause() is called every PAUSE_EVERY ticks, e.g. to calibrate."""
+        sim = Simulation(seed=self.seed, profiler=profiler)
+        sim.step([Action.START])
+        if self.setup is not None:
+            self.setup(sim)
+        inputs = random.Random(self.seed)
+        actions = (Action.LEFT, Action.RIGHT, Action.JUMP, Action.SLIDE)
+        ticks = int(self.ticks * scale)
+
+        for tick in range(ticks):
+            if pause is not None and tick % PAUSE_EVERY == 0:
+                pause()
+            if self.hold is not None:
+                self.hold(sim)
+            sim.profiler.next_frame()
+            sim.step([inputs.choice(actions)] if tick % 15 == 0 else [])
+            if sim.game_state != GameState.PLAYING:
+                raise RuntimeError(f"{self.name}: run ended at tick {tick}: {sim.game_over_reason}")
+        return sim, ticks
+
+
+def hold_long_run(sim):
+    sim.speed = 8.0
+    sim.player_lives = ENDLESS_LIVES
+
+
+def hold_coin_storm(sim):
+    sim.player_lives = ENDLESS_LIVES
+    sim.player.magnet_timer = 600
+    sim.player.coin_multiplier_timer = 600
+    # Three lanes of coins every tick on top of the normal spawns
+    y = sim.distance + 800
+    for lane in (-1, 0, 1):
+        sim.coins.add(lane * 100, y)
+
+
+def hold_flying(sim):
+    sim.player.flying_timer = 1200
+
+
+def setup_pursuit(sim):
+    sim.chasing_enemy.activate_pursuit(sim.distance)
+
+
+def hold_pursuit(sim):
+    sim.player_lives = ENDLESS_LIVES
+    sim.chasing_enemy.pursuit_mode = True
+
+
+SCENARIOS = [
+    # distance grows by speed per tick, so 8.0 reaches 1,000,000 in 125,000 ticks
+    Scenario("long_run", "run to distance 1,000,000 at speed 8.0", 125000, hold_long_run),
+    Scenario("coin_storm", "magnet and coin multiplier with three extra coins a tick",
+             20000, hold_coin_storm),
+    Scenario("flying", "permanent flying: window coin pickup, no obstacle checks",
+             30000, hold_flying),
+    Scenario("guardian_pursuit", "guardian chasing from the first tick",
+             30000, hold_pursuit, setup_pursuit),
+]
+
+
+def calibrate(loops=CALIBRATION_LOOPS):
+    """A fixed workload of the kind a tick is made of: attribute reads and
+    writes, float arithmetic, comparisons, calls; returns loops per second."""
+    state = SimpleNamespace(total=0.0)
+    start = time.perf_counter()
+    for i in range(loops):
+        state.total += abs(i % 7 - 3) * 0.5
+        if state.total > 1000.0:
+            state.total = min(state.total, 0.0)
+    return loops / (time.perf_counter() - start)
+
+
+def measure(scenario, scale=1.0, repeat=3):
+    """Benchmark one scenario; returns its metrics as a dict."""
+    elapsed = None
+    for _ in range(repeat):
+        # Calibrate all through the run, so it sees the same machine the
+        # ticks do; its time is then taken back out of the run's
+        calibrations = []
+
+        def pause():
+            start = time.perf_counter()
+            calibrate()
+            calibrations.append(time.perf_counter() - start)
+
+        profiler = FrameProfiler(window=1000)
+        start = time.perf_counter()
+        sim, ticks = scenario.run(profiler, scale, pause)
+        run_time = time.perf_counter() - start - sum(calibrations)
+        if elapsed is None or run_time < elapsed:
+            # The fastest run is the one least disturbed by the rest of the machine
+            elapsed = run_time
+            calibration = len(calibrations) * CALIBRATION_LOOPS / sum(calibrations)
+            phases = profiler.summary()["phases"]
+        del sim  # Freed now rather than inside the measured window
+    gc.collect()
+
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    sim, _ = scenario.run(None, scale)
+    blocks_after = sys.getallocatedblocks()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    steps_per_sec = ticks / elapsed
+    return {
+        "ticks": ticks,
+        "distance": round(sim.distance),
+        "steps_per_sec": steps_per_sec,
+        "relative_speed": steps_per_sec / calibration,
+        "peak_kib": peak / 1024,
+        "retained_blocks": blocks_after - blocks_before,
+        "phase_us": {name: phases[name]["mean"] * 1000 for name in PHASES if name in phases},
+    }
+
+
+def regressions(name, result, baseline, tolerance):
+    """Describe every metric of result that is worse than baseline allows,
+    as (throughput, memory) lists."""
+    throughput = []
+    floor = baseline["relative_speed"] * (1 - tolerance)
+    if result["relative_speed"] < floor:
+        throughput.append(f"{name}: relative speed {result['relative_speed']:.4f} "
+                          f"({result['steps_per_sec']:.0f} steps/s), baseline "
+                          f"{baseline['relative_speed']:.4f} (floor {floor:.4f})")
+    memory = []
+    ceiling = baseline["peak_kib"] * (1 + tolerance)
+    if result["peak_kib"] > ceiling:
+        memory.append(f"{name}: peak {result['peak_kib']:.0f} KiB, baseline "
+                      f"{baseline['peak_kib']:.0f} (ceiling {ceiling:.0f})")
+    ceiling = baseline["retained_blocks"] * (1 + tolerance)
+    if result["retained_blocks"] > ceiling:
+        memory.append(f"{name}: {result['retained_blocks']} blocks retained, baseline "
+                      f"{baseline['retained_blocks']} (ceiling {ceiling:.0f})")
+    return throughput, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Temple Run 3D simulation benchmarks")
+    parser.add_argument("-k", dest="only", action="append", metavar="NAME",
+                        help="run only the named scenario (repeatable)")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    parser.add_argument("--update", action="store_true",
+                        help="store the results as the new baselines")
+    parser.add_argument("--strict", action="store_true",
+                        help="fail on throughput regressions, not only memory ones")
+    parser.add_argument("--baselines", default=BASELINES, metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed fractional regression (default 0.25)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed runs per scenario; the fastest counts (default 3)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply every scenario's tick count (for quick runs)")
+    parser.add_argument("--output", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args()
+    if args.list:
+        for scenario in SCENARIOS:
+            print(f"{scenario.name:<18}{scenario.ticks:>8} ticks  {scenario.description}")
+        return
+
+    scenarios = [s for s in SCENARIOS if not args.only or s.name in args.only]
+    if not scenarios:
+        parser.error("no scenario matches " + ", ".join(args.only))
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as f:
+            baselines = json.load(f)
+
+    results = {}
+    slow = []
+    failures = []
+    print(f"{'scenario':<18}{'ticks':>8}{'steps/s':>10}{'relative':>10}{'peak KiB':>10}{'retained':>10}")
+    for scenario in scenarios:
+        result = results[scenario.name] = measure(scenario, args.scale, args.repeat)
+        print(f"{scenario.name:<18}{result['ticks']:>8}{result['steps_per_sec']:>10.0f}"
+              f"{result['relative_speed']:>10.4f}{result['peak_kib']:>10.0f}"
+              f"{result['retained_blocks']:>10}")
+        print("    " + "  ".join(f"{name} {us:.1f}us" for name, us in result["phase_us"].items()))
+        if not args.update and scenario.name in baselines:
+            throughput, memory = regressions(scenario.name, result, baselines[scenario.name],
+                                             args.tolerance)
+            (failures if args.strict else slow).extend(throughput)
+            failures += memory
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update:
+        baselines.update({name: {key: result[key] for key in
+                                 ("steps_per_sec", "relative_speed", "peak_kib", "retained_blocks")}
+                          for name, result in results.items()})
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Baselines written to {args.baselines}")
+        return
+    if slow:
+        print("\nSlower than baseline (advisory; --strict fails on these):")
+        for line in slow:
+            print("  " + line)
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print("  " + failure)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Batched coin rendering.
+
+Drawing coins one at a time costs a push/translate/rotate/colour/cylinder/pop
+sequence per coin.  CoinBatch instead transforms a single coin mesh into every
+visible coin position with NumPy and submits the whole lot as one client-side
+vertex array, so a frame's coins are one draw call whatever their number.
+With a LevelOfDetail, distant coins use a coarser mesh in the same array.
+"""
+import math
+
+import numpy as np
+from OpenGL.GL import *
+
+
+def cylinder_triangles(radius, height, slices, stacks):
+    """Open cylinder along +z (the shape gluCylinder draws) as a triangle list."""
+    angles = [2 * math.pi * i / slices for i in range(slices + 1)]
+    ring = [(math.sin(a) * radius, math.cos(a) * radius) for a in angles]
+    vertices = []
+    for stack in range(stacks):
+        z0 = height * stack / stacks
+        z1 = height * (stack + 1) / stacks
+        for i in range(slices):
+            (x0, y0), (x1, y1) = ring[i], ring[i + 1]
+            vertices += [(x0, y0, z0), (x1, y1, z0), (x1, y1, z1),
+                         (x0, y0, z0), (x1, y1, z1), (x0, y0, z1)]
+    return np.array(vertices, dtype=np.float32)
+
+
+class CoinBatch:
+    """Draws every visible coin in one glDrawArrays call."""
+
+    def __init__(self, radius=15, height=5, slices=8, stacks=2, lod=None):
+        self.lod = lod
+        levels = range(len(lod.scales)) if lod is not None else range(1)
+        # One mesh per level of detail, finest first
+        self.templates = [cylinder_triangles(radius, height,
+                                             slices if lod is None else lod.segments(slices, level),
+                                             stacks if lod is None else lod.segments(stacks, level))
+                          for level in levels]
+        self._vertices = np.empty((0, 3), dtype=np.float32)
+
+    def draw(self, x, y, z, rotation, color):
+        """Draw coins at the given positions, each spun rotation degrees about z.
+
+        color is per batch, so the coin multiplier highlight is one glColor.
+        """
+        count = len(x)
+        if count == 0:
+            return
+        x, y, z = np.asarray(x), np.asarray(y), np.asarray(z)
+        if count * len(self.templates[0]) > len(self._vertices):
+            self._vertices = np.empty((count * 2 * len(self.templates[0]), 3), dtype=np.float32)
+
+        if self.lod is None:
+            levels = np.zeros(count, dtype=np.intp)
+        else:
+            cx, cy, cz = self.lod.camera
+            distance = np.sqrt((x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2)
+            levels = np.searchsorted(self.lod.thresholds, distance, side='right')
+
+        angle = np.radians(rotation)
+        cos, sin = np.cos(angle), np.sin(angle)
+        filled = 0
+        for level, template in enumerate(self.templates):
+            rows = np.flatnonzero(levels == level)
+            if not rows.size:
+                continue
+            size = rows.size * len(template)
+            vertices = self._vertices[filled:filled + size].reshape(rows.size, len(template), 3)
+            c, s = cos[rows, None], sin[rows, None]
+            tx = template[:, 0]
+            ty = template[:, 1]
+            vertices[:, :, 0] = c * tx - s * ty + x[rows, None]
+            vertices[:, :, 1] = s * tx + c * ty + y[rows, None]
+            vertices[:, :, 2] = template[:, 2] + z[rows, None]
+            filled += size
+
+        glColor3f(*color)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self._vertices)
+        glDrawArrays(GL_TRIANGLES, 0, filled)
+        glDisableClientState(GL_VERTEX_ARRAY)
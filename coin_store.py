@@ -0,0 +1,154 @@
+"""Coins stored as NumPy column arrays.
+
+Coins are the most numerous track entity and every rule that touches them
+(magnet pull, spin, pickup) applies the same arithmetic to each coin, so they
+live in parallel arrays and each rule is one vectorized pass over the live
+rows instead of a Python loop over Coin objects.  This makes NumPy a
+requirement of the simulation itself, not just of the renderers.
+"""
+import numpy as np
+
+
+class CoinStore:
+    """Column store for coins: x, y, z, rotation and collected.
+
+    Live coins occupy rows head..tail.  Coins are added at the tail in spawn
+    order and retired from the head, so the arrays act as a ring: when the
+    tail reaches the end the live rows are moved back to row 0, and the
+    arrays only grow when they are genuinely full.
+    """
+
+    COLUMNS = ('x', 'y', 'z', 'rotation', 'collected')
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.z = np.zeros(capacity)
+        self.rotation = np.zeros(capacity)
+        self.collected = np.zeros(capacity, dtype=bool)
+        self.head = 0
+        self.tail = 0
+
+        # Allocation counters
+        self.added = 0
+        self.grown = 0        # Times the arrays were reallocated larger
+        self.compactions = 0  # Times live rows were moved back to the start
+
+    def __len__(self):
+        return self.tail - self.head
+
+    def add(self, x, y, z=30):
+        if self.tail == self.capacity:
+            self._make_room()
+        i = self.tail
+        self.x[i] = x
+        self.y[i] = y
+        self.z[i] = z
+        self.rotation[i] = 0
+        self.collected[i] = False
+        self.tail += 1
+        self.added += 1
+
+    def _make_room(self):
+        live = self.tail - self.head
+        if live * 2 > self.capacity:
+            self.capacity *= 2
+            for name in self.COLUMNS:
+                old = getattr(self, name)
+                column = np.zeros(self.capacity, dtype=old.dtype)
+                column[:live] = old[self.head:self.tail]
+                setattr(self, name, column)
+            self.grown += 1
+        else:
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[:live] = column[self.head:self.tail]
+            self.compactions += 1
+        self.head = 0
+        self.tail = live
+
+    def retire(self, y_cutoff):
+        """Drop coins off the head once they are behind y_cutoff or collected."""
+        y = self.y
+        collected = self.collected
+        head = self.head
+        while head < self.tail and (y[head] <= y_cutoff or collected[head]):
+            head += 1
+        retired = head - self.head
+        self.head = head
+        return retired
+
+    def clear(self):
+        self.head = 0
+        self.tail = 0
+
+    def visible(self, y, reach):
+        """Row indices of uncollected coins with abs(coin.y - y) < reach."""
+        live = slice(self.head, self.tail)
+        mask = ~self.collected[live] & (np.abs(self.y[live] - y) < reach)
+        return np.flatnonzero(mask) + self.head
+
+    def animate(self, y, reach, magnet_x=None, magnet_y=None, strength=0.15, radius=200, spin=True):
+        """Spin uncollected coins within reach of y and, if a magnet position
+        is given, pull the ones inside radius towards it."""
+        live = slice(self.head, self.tail)
+        x = self.x[live]
+        ys = self.y[live]
+        active = ~self.collected[live] & (np.abs(ys - y) < reach)
+
+        if magnet_x is not None:
+            dx = magnet_x - x
+            dy = magnet_y - ys
+            pulled = active & (np.sqrt(dx * dx + dy * dy) < radius)
+            np.add(x, dx * strength, out=x, where=pulled)
+            np.add(ys, dy * strength, out=ys, where=pulled)
+
+        if spin:
+            rotation = self.rotation[live]
+            np.remainder(rotation + 2, 360, out=rotation, where=active)
+
+    def collect_near(self, x, y, z, reach, previous_y=None):
+        """Collect coins inside the box of half-size reach around (x, y, z).
+
+        With previous_y, where the box was a tick earlier, coins it passed
+        clean over on the way are collected too (the box only moves forward).
+        """
+        live = slice(self.head, self.tail)
+        hit = self._swept(y, reach, previous_y)
+        if not hit.any():
+            # Most ticks have no coin level with the player
+            return 0
+        collected = self.collected[live]
+        hit &= ~collected
+        hit &= np.abs(self.x[live] - x) < reach
+        hit &= np.abs(self.z[live] - z) < reach
+        collected |= hit
+        return int(np.count_nonzero(hit))
+
+    def collect_window(self, y, reach, previous_y=None):
+        """Collect every coin with abs(coin.y - y) < reach, whatever its lane,
+        or passed over since previous_y as in collect_near()."""
+        live = slice(self.head, self.tail)
+        collected = self.collected[live]
+        hit = ~collected & self._swept(y, reach, previous_y)
+        collected |= hit
+        return int(np.count_nonzero(hit))
+
+    def _swept(self, y, reach, previous_y):
+        """Mask of live coins within reach of y, or that a box moving
+        forward from previous_y to y went clean past."""
+        coin_y = self.y[self.head:self.tail]
+        hit = np.abs(coin_y - y) < reach
+        if previous_y is not None and y - previous_y >= 2 * reach:
+            hit |= (coin_y - y <= -reach) & (coin_y - previous_y >= reach)
+        return hit
+
+    def stats(self):
+        return {
+            "capacity": self.capacity,
+            "live": len(self),
+            "added": self.added,
+            "grown": self.grown,
+            "compactions": self.compactions,
+        }
@@ -0,0 +1,73 @@
+"""Timed effects that expire in deadline order.
+
+An EffectSchedule keeps, for every active effect, the tick at which it runs
+out, plus a heap of those deadlines.  Advancing the clock only pops the
+deadlines that have come due, so a tick costs nothing per active effect,
+and the ticks left on any effect are one dict lookup away.
+"""
+import heapq
+
+
+class EffectSchedule:
+    """Active effects keyed by any hashable id, on a clock of whole ticks."""
+
+    def __init__(self):
+        self.now = 0
+        self.active = {}  # Effect -> tick it expires at; read-only outside this class
+        self._heap = []  # (deadline, effect); entries at or before each active deadline
+
+    def __contains__(self, effect):
+        return effect in self.active
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def __len__(self):
+        return len(self.active)
+
+    def start(self, effect, ticks, extend=False):
+        """Run effect for ticks from now, or, with extend, ticks past its
+        current deadline if it is already running."""
+        deadline = self.now + ticks
+        if extend and effect in self.active:
+            deadline = self.active[effect] + ticks
+        if deadline <= self.now:
+            self.active.pop(effect, None)
+            return
+        current = self.active.get(effect)
+        self.active[effect] = deadline
+        if current is not None and current <= deadline:
+            # Its entry in the heap comes due no later than the new deadline,
+            # and advance() moves it on then
+            return
+        heap = self._heap
+        heapq.heappush(heap, (deadline, effect))
+        if len(heap) > 2 * len(self.active) + 2:
+            # Refreshed effects leave their old deadlines behind; drop them
+            # so the heap stays in proportion to the active effects
+            heap[:] = [(deadline, effect) for effect, deadline in self.active.items()]
+            heapq.heapify(heap)
+
+    def remaining(self, effect):
+        """Ticks left on effect; 0 if it is not running."""
+        deadline = self.active.get(effect)
+        return 0 if deadline is None else deadline - self.now
+
+    def advance(self):
+        """Move the clock on one tick and return the effects that ran out."""
+        self.now += 1
+        heap = self._heap
+        expired = []
+        while heap and heap[0][0] <= self.now:
+            deadline, effect = heapq.heappop(heap)
+            current = self.active.get(effect)
+            if current == deadline:
+                del self.active[effect]
+                expired.append(effect)
+            elif current is not None and current > deadline:
+                heapq.heappush(heap, (current, effect))  # Extended since it was pushed
+        return expired
+
+    def clear(self):
+        self.active.clear()
+        self._heap.clear()
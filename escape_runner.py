@@ -1,357 +1,59 @@
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
-import random
+import argparse
+import atexit
 import math
+import sys
 import time
 
-
-# Game state
-class GameState:
-    MENU = 0
-    PLAYING = 1
-    GAME_OVER = 2
-    PAUSED = 3
-
-
-# Power-up types
-class PowerUpType:
-    MAGNET = 0
-    SHIELD = 1
-    SPEED_BOOST = 2
-    DOUBLE_JUMP = 3
-    COIN_MULTIPLIER = 4
-    FLYING = 5  # Add this new power-up
+from coin_batch import CoinBatch
+from events import BONUS, POWER_UP, QUALITY, LogWriter
+from hud_text import HudLayer
+from profiler import FrameProfiler
+from quality import TIER_NAMES, QualityGovernor
+from render_cache import ChunkCache, LevelOfDetail, MeshCache
+from replay import SEED_LIMIT, Recorder, Replay, ReplayPlayer
+from shader_renderer import ShaderRenderer
+from simulation import POWER_UPS, Action, FixedTimestep, GameState, PowerUpType, Simulation
 
 
 # Add near other global variables
-last_time = time.time()
-delta_time = 0
-
-
-
-# Player class
-class Player:
-
-
-    def __init__(self):
-        self.x = 0 # Lane position (-1, 0, 1 for left, center, right)
-        self.y = 0 # Forward position
-        self.z = 20 # Height (for jumping)
-        self.target_x = 0 # Target lane for smooth movement
-        self.lane = 0 # Current lane (-1, 0, 1)
-        self.jumping = False
-        self.sliding = False
-        self.jump_velocity = 0
-        self.slide_timer = 0
-        self.turning = False
-        self.turn_direction = 0 # -1 for left, 1 for right
-
-        # Power-up states
-        self.magnet_timer = 0
-        self.shield_timer = 0
-        self.speed_boost_timer = 0
-        self.double_jump_timer = 0
-        self.coin_multiplier_timer = 0
-        self.flying_timer = 0  # Add flying timer
-        self.can_double_jump = False
-        self.has_double_jumped = False
-        
-        # Flying animation variables
-        self.flying_height_offset = 0
-        self.flying_animation_timer = 0
-
-
-
-    def update(self):
-            
-
-
-            # Smooth lane movement
-            if abs(self.x - self.target_x) > 1:
-                if self.x < self.target_x:
-                    self.x += 2
-                else:
-                    self.x -= 2
-            else:
-                self.x = self.target_x
-
-
-
-            # Flying mode with smooth transition
-            if self.flying_timer > 0:
-                self.flying_timer -= 1
-                self.flying_animation_timer += 1
-                
-                # Target flying height
-                target_height = 200
-                self.flying_height_offset = math.sin(self.flying_animation_timer * 0.1) * 25
-                target_z = target_height + self.flying_height_offset
-                
-                # Smooth transition to flying height
-                if self.z < target_z:
-                    self.z = min(self.z + 5, target_z)  # Ascend smoothly
-                else:
-                    self.z = target_z
-                    
-                # Disable jumping and sliding while flying
-                self.jumping = False
-                self.sliding = False
-                self.jump_velocity = 0
-                
-
-
-            else:
-                # Normal ground-based movement
-                self.flying_height_offset = 0
-                self.flying_animation_timer = 0
-                
-                # Smooth descent when flying ends
-                if self.z > 20 and not self.jumping:
-                    self.z = max(20, self.z - 8)  # Descend smoothly at 8 units per frame
-                
-                # Jumping physics (only when not flying)
-                if self.jumping:
-                    self.z += self.jump_velocity
-                    self.jump_velocity -= 0.5
-                    if self.z <= 20:
-                        self.z = 20
-                        self.jumping = False
-                        self.jump_velocity = 0
-                        self.has_double_jumped = False # Reset double jump
-
-                # Sliding (only when not flying)
-                if self.sliding:
-                    self.slide_timer -= 1
-                    if self.slide_timer <= 0:
-                        self.sliding = False
-
-
-
-            # Update other power-up timers
-            if self.magnet_timer > 0:
-                self.magnet_timer -= 1
-            if self.shield_timer > 0:
-                self.shield_timer -= 1
-            if self.speed_boost_timer > 0:
-                self.speed_boost_timer -= 1
-            if self.double_jump_timer > 0:
-                self.double_jump_timer -= 1
-                self.can_double_jump = True
-            else:
-                self.can_double_jump = False
-            if self.coin_multiplier_timer > 0:
-                self.coin_multiplier_timer -= 1
-
-
-
-    def jump(self):
-        # Can't jump while flying
-        if self.flying_timer > 0:
-            return
-
-
-        if not self.jumping and not self.sliding:
-            self.jumping = True
-            self.jump_velocity = 25
-        elif self.jumping and self.can_double_jump and not self.has_double_jumped:
-            # Double jump
-            self.jump_velocity = 50
-            self.has_double_jumped = True
-
-
-    def slide(self):
-        # Can't slide while flying
-        if self.flying_timer > 0:
-            return
-            
-        if not self.jumping and not self.sliding:
-            self.sliding = True
-            self.slide_timer = 180
-
-
-
-    def move_left(self):
-        if not self.turning and self.lane > -1:
-            self.lane -= 1
-            self.target_x = self.lane * 100
-
-
-
-    def move_right(self):
-        if not self.turning and self.lane < 1:
-            self.lane += 1
-            self.target_x = self.lane * 100
-
-
-    def activate_power_up(self, power_up_type):
-        if power_up_type == PowerUpType.MAGNET:
-            self.magnet_timer = 600 # 10 seconds at 60 FPS
-        elif power_up_type == PowerUpType.SHIELD:
-            self.shield_timer = 600 # 10 seconds
-        elif power_up_type == PowerUpType.SPEED_BOOST:
-            self.speed_boost_timer = 480 # 8 seconds
-        elif power_up_type == PowerUpType.DOUBLE_JUMP:
-            self.double_jump_timer = 900 # 15 seconds
-        elif power_up_type == PowerUpType.COIN_MULTIPLIER:
-            self.coin_multiplier_timer = 600 # 10 seconds
-        elif power_up_type == PowerUpType.FLYING:
-            self.flying_timer = 1200  # 20 seconds
-            # Cancel other movement states when starting to fly
-            self.jumping = False
-            self.sliding = False
-            self.jump_velocity = 0
-
-
-
-
-
-
-class ChasingEnemy:
-    def __init__(self):
-        self.x = 0  # Lane position
-        self.y = -300  # Start far behind player
-        self.z = 20  # Ground level
-        self.speed = 1.5  # Base chase speed
-        self.target_x = 0  # Target lane position
-        self.active = True
-        self.caught_player = False
-        self.pursuit_mode = False  # Activated after first life lost
-        
-        # Animation variables
-        self.animation_timer = 0
-        self.glowing_intensity = 0
-        
-    def update(self):
-        if not self.active:
-            return
-            
-        # Update animation
-        self.animation_timer += 1
-        self.glowing_intensity = (math.sin(self.animation_timer * 0.2) + 1) * 0.5
-        
-        # Only start moving if pursuit mode is activated
-        if self.pursuit_mode:
-            # Calculate distance to player
-            distance_to_player = distance - self.y
-            
-            # Adjust speed based on distance
-            if distance_to_player > 100:
-                self.speed = 2.5  # Speed up if far behind
-            elif distance_to_player < 30:
-                self.speed = 1.0  # Slow down when close
-            else:
-                self.speed = 2.0  # Normal pursuit speed
-            
-            # Move forward
-            self.y += self.speed * delta_time * 60
-            
-            # Follow player's lane with some delay
-            if random.randint(1, 30) == 1:  # Update target occasionally
-                self.target_x = player.lane * 100
-                
-            # Smooth lane movement
-            if abs(self.x - self.target_x) > 2:
-                if self.x < self.target_x:
-                    self.x += 3
-                else:
-                    self.x -= 3
-            else:
-                self.x = self.target_x
-    
-    def activate_pursuit(self):
-        """Start chasing after first life lost"""
-        self.pursuit_mode = True
-        self.y = max(self.y, distance - 150)  # Move closer
-        
-    def rush_attack(self):
-        """Rush forward for immediate catch after second life lost"""
-        self.y = distance - 30  # Move very close
-        self.speed = 5.0  # Fast approach
-        
-    def check_collision(self):
-        if not self.active or not self.pursuit_mode:
-            return False
-            
-        # Check if enemy caught the player
-        if (abs(self.x - player.x) < 40 and 
-            abs(self.y - distance) < 40):
-            self.caught_player = True
-            return True
-        return False
-        
-    def reset(self):
-        self.x = 0
-        self.y = -300
-        self.speed = 1.5
-        self.active = True
-        self.caught_player = False
-        self.pursuit_mode = False
-        self.animation_timer = 0
-
-
-
-
-
-
-
-# Obstacle class
-class Obstacle:
-    def __init__(self, x, y, obstacle_type):
-        self.x = x  # Lane position
-        self.y = y  # Forward position
-        self.type = obstacle_type  # 'low', 'high', 'gap'
-        self.active = True
-
-
-
-# Coin class
-class Coin:
-    def __init__(self, x, y, z=30):
-        self.x = x
-        self.y = y
-        self.z = z
-        self.rotation = 0
-        self.collected = False
-
-
-
-# Power-up class
-class PowerUp:
-    def __init__(self, x, y, power_type):
-        self.x = x
-        self.y = y
-        self.z = 30
-        self.type = power_type
-        self.rotation = 0
-        self.collected = False
-        self.float_offset = 0
-
-
-# Game variables
-player = Player()
-obstacles = []
-coins = []
-power_ups = []
-game_state = GameState.MENU
-score = 0
-speed = 1.5
-distance = 0
-coins_collected = 0
-game_over_reason = ""
-player_lives = 5
-last_speed_increase_score = 0  # Track when we last increased speed
-
-# Add these global variables near your other game variables
-chasing_enemy = None
-last_life_lost_time = None
-life_lost_count = 0
-enemy_pursuit_active = False
-
-# Initialize the enemy
-chasing_enemy = ChasingEnemy()
-
-
+last_time = time.perf_counter()
+
+
+# Frame phase timings, shown with F and dumped with --profile
+profiler = FrameProfiler()
+show_profiler = False
+profiler_stats = None  # Summary shown by the overlay, refreshed every 30 frames
+
+# The game itself; this module only draws it and forwards input
+sim = Simulation(profiler=profiler)
+timestep = FixedTimestep()
+view = sim.view()  # Interpolated positions for the frame being drawn
+pending_inputs = []  # Actions received since the last tick
+replay_player = None  # Set by --replay; supplies the inputs instead of the user
+event_log = None  # Writes the game's events to stdout off the main thread
+hud_event = None  # Latest bonus or power-up, flashed on the HUD for a moment
+HUD_EVENT_TICKS = 90
+
+# Shared quadric and compiled primitives; nothing GL is allocated per frame.
+# Curved shapes get coarser with distance from the camera.
+lod = LevelOfDetail()
+meshes = MeshCache(lod)
+coin_batch = CoinBatch(lod=lod)
+hud = HudLayer()
+
+# Render quality tier: draw distance, scenery density, tessellation and
+# effects, stepped to hold the frame budget unless --quality fixes it
+quality = QualityGovernor()
+lod_thresholds = lod.thresholds  # Before the tier scales them; set by --lod
+scenery_spacing = 1  # The spacing the cached scenery chunks were compiled at
+
+# World backend: None draws with the fixed-function functions below, else a
+# ShaderRenderer (see use_renderer()); the HUD is fixed-function either way
+RENDERERS = ("fixed", "shader")
+renderer = None
 
 
 # Camera variables
@@ -361,111 +63,22 @@ camera_angle = 0
 
 
 
-# Track generation
-track_length = 0
-next_obstacle_distance = 100
-next_powerup_distance = 800
-
-
-
-# Power-up names for display
-power_up_names = {
-    PowerUpType.MAGNET: "MAGNET",
-    PowerUpType.SHIELD: "SHIELD",
-    PowerUpType.SPEED_BOOST: "SPEED BOOST",
-    PowerUpType.DOUBLE_JUMP: "DOUBLE JUMP",
-    PowerUpType.COIN_MULTIPLIER: "COIN MULTIPLIER",
-    PowerUpType.FLYING: "FLYING MODE"
-}
-
-
-
-
-
-def reset_game():
-    global player, obstacles, coins, power_ups, score, speed, distance, coins_collected, game_state
-    global track_length, next_obstacle_distance, next_powerup_distance, player_lives, last_speed_increase_score
-    global chasing_enemy, last_life_lost_time, life_lost_count
-    
-    player = Player()
-    obstacles = []
-    coins = []
-    power_ups = []
-    score = 0
-    speed = 3
-    distance = 0
-    coins_collected = 0
-    game_state = GameState.PLAYING
-    track_length = 0
-    next_obstacle_distance = 100
-    next_powerup_distance = 800
-    player_lives = 5
-    last_speed_increase_score = 0
-    
-    # Reset enemy tracking
-    chasing_enemy.reset()
-    last_life_lost_time = None
-    life_lost_count = 0
-
-
-
-
-def generate_track():
-    global track_length, next_obstacle_distance, next_powerup_distance
-
-    # Generate obstacles
-    if distance > next_obstacle_distance:
-        lane = random.randint(-1, 1)
-        obstacle_type = random.choice(['low', 'high', 'gap'])
-        obstacles.append(Obstacle(lane * 100, distance + 1200, obstacle_type))
-        next_obstacle_distance = distance + random.randint(400, 700)
-
-        # Generate coins around obstacles
-        for i in range(3):
-            coin_lane = random.randint(-1, 1)
-            if coin_lane * 100 != lane * 100:
-                coins.append(Coin(coin_lane * 100, distance + 800 + i * 150))
-
-    # Generate power-ups (less frequent than obstacles)
-    if distance > next_powerup_distance:
-        lane = random.randint(-1, 1)
-        power_type = random.randint(0, 5)  # Change from 4 to 5 to include flying
-        power_ups.append(PowerUp(lane * 100, distance + 1000, power_type))
-        next_powerup_distance = distance + random.randint(800, 1500)
-
-
 
 
 
+@profiler.timed
+def draw_player():
+    player = sim.player
+    distance = view.distance
 
-def draw_text(x, y, text, font=GLUT_BITMAP_HELVETICA_18):
-    glColor3f(1, 1, 1)
-    glMatrixMode(GL_PROJECTION)
+    here = (view.player_x, distance + player.y, view.player_z)
     glPushMatrix()
-    glLoadIdentity()
-    gluOrtho2D(0, 1000, 0, 800)
-    
-    glMatrixMode(GL_MODELVIEW)
-    glPushMatrix()
-    glLoadIdentity()
-    
-    glRasterPos2f(x, y)
-    for ch in text:
-        glutBitmapCharacter(font, ord(ch))
-    
-    glPopMatrix()
-    glMatrixMode(GL_PROJECTION)
-    glPopMatrix()
-    glMatrixMode(GL_MODELVIEW)
-
+    glTranslatef(*here)
 
-
-def draw_player():
-    glPushMatrix()
-    glTranslatef(player.x, distance + player.y, player.z)
+    effects = quality.tier.effects
 
     # Flying trail effect
-    if player.flying_timer > 0:
+    if effects and player.flying_timer > 0:
         glColor4f(0.5, 0.8, 1.0, 0.3)
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
@@ -474,17 +87,17 @@ def draw_player():
         for i in range(3):
             glPushMatrix()
             glTranslatef(0, -i * 20, -i * 5)
-            glutSolidSphere(30 - i * 5, 12, 12)
+            glCallList(meshes.sphere(30 - i * 5, 12, 12, at=here))
             glPopMatrix()
             
         glDisable(GL_BLEND)
     
     # Shield effect
-    if player.shield_timer > 0:
+    if effects and player.shield_timer > 0:
         glColor4f(0.5, 0.5, 1.0, 0.3)
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        glutSolidSphere(35, 16, 16)
+        glCallList(meshes.sphere(35, 16, 16, at=here))
         glDisable(GL_BLEND)
     
     # Animation variables
@@ -511,24 +124,24 @@ def draw_player():
     else:
         glColor3f(0.1, 0.5, 1.0)  # Normal blue
     
-    glutSolidCube(25)
+    glCallList(meshes.cube(25))
     
     # Player head
     glPushMatrix()
     glTranslatef(0, 0, 15)
     glColor3f(1.0, 0.8, 0.6)
-    glutSolidCube(12)
+    glCallList(meshes.cube(12))
     
     # Eyes
     glColor3f(1.0, 1.0, 1.0)
     glPushMatrix()
     glTranslatef(-3, -5, 1)
-    glutSolidCube(1.5)
+    glCallList(meshes.cube(1.5))
     glPopMatrix()
     
     glPushMatrix()
     glTranslatef(3, -5, 1)
-    glutSolidCube(1.5)
+    glCallList(meshes.cube(1.5))
     glPopMatrix()
     glPopMatrix()
     
@@ -544,7 +157,7 @@ def draw_player():
         glPushMatrix()
         glTranslatef(0, 0, -6)
         glScalef(0.4, 0.4, 1.0)
-        glutSolidCube(12)
+        glCallList(meshes.cube(12))
         glPopMatrix()
         
         # Lower arm
@@ -553,13 +166,13 @@ def draw_player():
         glPushMatrix()
         glTranslatef(0, 0, -6)
         glScalef(0.3, 0.3, 0.8)
-        glutSolidCube(12)
+        glCallList(meshes.cube(12))
         glPopMatrix()
         
         # Hand
         glTranslatef(0, 0, -12)
         glColor3f(1.0, 0.7, 0.5)
-        glutSolidCube(4)
+        glCallList(meshes.cube(4))
         glPopMatrix()
     
 
@@ -575,7 +188,7 @@ def draw_player():
         glPushMatrix()
         glTranslatef(0, 0, -8)
         glScalef(0.5, 0.5, 1.2)
-        glutSolidCube(12)
+        glCallList(meshes.cube(12))
         glPopMatrix()
         
         # Lower leg
@@ -585,7 +198,7 @@ def draw_player():
         glPushMatrix()
         glTranslatef(0, 0, -8)
         glScalef(0.4, 0.4, 1.0)
-        glutSolidCube(12)
+        glCallList(meshes.cube(12))
         glPopMatrix()
         
         # Foot
@@ -594,7 +207,7 @@ def draw_player():
         glPushMatrix()
         glTranslatef(0, -4, 0)
         glScalef(0.6, 1.2, 0.3)
-        glutSolidCube(10)
+        glCallList(meshes.cube(10))
         glPopMatrix()
         glPopMatrix()
     
@@ -603,34 +216,48 @@ def draw_player():
 
 
 
-def draw_track():
+def build_track_chunk(y_start, y_end):
     # Draw the main track
     glColor3f(0.6, 0.4, 0.2)
-    for i in range(int(distance - 500), int(distance + 1000), 100):
-        glBegin(GL_QUADS)
+    glBegin(GL_QUADS)
+    for i in range(y_start, y_end, 100):
         glVertex3f(-150, i, 0)
         glVertex3f(150, i, 0)
         glVertex3f(150, i + 100, 0)
         glVertex3f(-150, i + 100, 0)
-        glEnd()
+    glEnd()
     
     # Draw lane dividers
     glColor3f(0.8, 0.8, 0.8)
     glLineWidth(3)
-    for i in range(int(distance - 500), int(distance + 1000), 20):
-        glBegin(GL_LINES)
+    glBegin(GL_LINES)
+    for i in range(y_start, y_end, 20):
         glVertex3f(-50, i, 1)
         glVertex3f(-50, i + 10, 1)
         glVertex3f(50, i, 1)
         glVertex3f(50, i + 10, 1)
-        glEnd()
+    glEnd()
 
 
+track_chunks = ChunkCache(build_track_chunk)
 
 
+@profiler.timed
+def draw_track():
+    distance = view.distance
+    behind, ahead = quality.tier.span
+    track_chunks.draw(distance - behind, distance + ahead)
+
+
+
+
+@profiler.timed
 def draw_obstacles():
-    for obstacle in obstacles:
-        if obstacle.active and abs(obstacle.y - distance) < 600:
+    distance = view.distance
+    reach = quality.tier.view_distance
+
+    for obstacle in sim.obstacles.query(distance - reach, distance + reach):
+        if obstacle.active:
             glPushMatrix()
             glTranslatef(obstacle.x, obstacle.y, 0)
             
@@ -639,19 +266,19 @@ def draw_obstacles():
                 glPushMatrix()
                 glTranslatef(0, 0, 70)
                 glScalef(2, 0.4, 1.2)
-                glutSolidCube(60)
+                glCallList(meshes.cube(60))
                 glPopMatrix()
                 
                 glPushMatrix()
                 glTranslatef(-60, 0, 50)
                 glScalef(0.4, 0.4, 2.5)
-                glutSolidCube(60)
+                glCallList(meshes.cube(60))
                 glPopMatrix()
                 
                 glPushMatrix()
                 glTranslatef(60, 0, 50)
                 glScalef(0.4, 0.4, 2.5)
-                glutSolidCube(60)
+                glCallList(meshes.cube(60))
                 glPopMatrix()
                 
                 glColor3f(0.1, 0.1, 0.1)
@@ -667,7 +294,7 @@ def draw_obstacles():
                 glColor3f(0.7, 0.2, 0.1)
                 glTranslatef(0, 0, 50)  # Lowered from 60 to 50
                 glScalef(1.5, 0.4, 1.8)  # Reduced scale values
-                glutSolidCube(50)  # Smaller cube size
+                glCallList(meshes.cube(50))  # Smaller cube size
                 
             elif obstacle.type == 'gap':
                 glColor3f(0.0, 0.0, 0.0)
@@ -706,13 +333,13 @@ def draw_obstacles():
                     glPushMatrix()
                     glTranslatef(i, -55, 5)
                     glRotatef(45, 0, 0, 1)
-                    glutSolidCube(8)
+                    glCallList(meshes.cube(8))
                     glPopMatrix()
                     
                     glPushMatrix()
                     glTranslatef(i, 55, 5)
                     glRotatef(45, 0, 0, 1)
-                    glutSolidCube(8)
+                    glCallList(meshes.cube(8))
                     glPopMatrix()
             
             glPopMatrix()
@@ -721,12 +348,18 @@ def draw_obstacles():
 
 
 
+@profiler.timed
 def draw_chasing_enemy():
-    if not chasing_enemy.active or not chasing_enemy.pursuit_mode or abs(chasing_enemy.y - distance) > 600:
+    chasing_enemy = sim.chasing_enemy
+    distance = view.distance
+
+    if (not chasing_enemy.active or not chasing_enemy.pursuit_mode or
+            abs(view.enemy_y - distance) > quality.tier.view_distance):
         return
         
+    here = (view.enemy_x, view.enemy_y, chasing_enemy.z)
     glPushMatrix()
-    glTranslatef(chasing_enemy.x, chasing_enemy.y, chasing_enemy.z)
+    glTranslatef(*here)
     
     # Pulsing glow effect
     glow = 0.3 + chasing_enemy.glowing_intensity * 0.4
@@ -737,22 +370,22 @@ def draw_chasing_enemy():
     glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
     
     # Draw outer glow
-    glutSolidSphere(45, 12, 12)
+    glCallList(meshes.sphere(45, 12, 12, at=here))
     
     # Main body (darker red)
     glColor3f(0.8, 0.1, 0.1)
-    glutSolidCube(35)
+    glCallList(meshes.cube(35))
     
     # Eyes (glowing yellow)
     glColor3f(1.0, 1.0, 0.2)
     glPushMatrix()
     glTranslatef(-8, -15, 8)
-    glutSolidSphere(3, 6, 6)
+    glCallList(meshes.sphere(3, 6, 6, at=here))
     glPopMatrix()
     
     glPushMatrix()
     glTranslatef(8, -15, 8)
-    glutSolidSphere(3, 6, 6)
+    glCallList(meshes.sphere(3, 6, 6, at=here))
     glPopMatrix()
     
     glDisable(GL_BLEND)
@@ -763,89 +396,79 @@ def draw_chasing_enemy():
 
 
 
+@profiler.timed
 def draw_coins():
-    for coin in coins:
-        if not coin.collected and abs(coin.y - distance) < 600:
-            # Magnet effect - attract coins to player
-            if player.magnet_timer > 0:
-                dx = player.x - coin.x
-                dy = (distance + player.y) - coin.y
-                dist = math.sqrt(dx*dx + dy*dy)
-                if dist < 200:  # Magnet range
-                    coin.x += dx * 0.15
-                    coin.y += dy * 0.15
-            
-            glPushMatrix()
-            glTranslatef(coin.x, coin.y, coin.z)
-            glRotatef(coin.rotation, 0, 0, 1)
-            
-            # Glowing effect for coin multiplier
-            if player.coin_multiplier_timer > 0:
-                glColor3f(1, 1, 0.5)
-            else:
-                glColor3f(1, 1, 0)
-            
-            quadric = gluNewQuadric()
-            gluCylinder(quadric, 15, 15, 5, 8, 2)
-            
-            glPopMatrix()
-            coin.rotation = (coin.rotation + 2) % 360
+    coins = sim.coins
+    visible = coins.visible(view.distance, quality.tier.view_distance)
+    
+    # Glowing effect for coin multiplier
+    if sim.player.coin_multiplier_timer > 0:
+        color = (1, 1, 0.5)
+    else:
+        color = (1, 1, 0)
+    
+    coin_batch.draw(coins.x[visible], coins.y[visible], coins.z[visible],
+                    coins.rotation[visible], color)
 
 
 
+@profiler.timed
 def draw_power_ups():
-    for power_up in power_ups:
-        if not power_up.collected and abs(power_up.y - distance) < 600:
+    distance = view.distance
+    reach = quality.tier.view_distance
+
+    for power_up in sim.power_ups.query(distance - reach, distance + reach):
+        if not power_up.collected:
             glPushMatrix()
             
-            # Floating animation
-            power_up.float_offset = math.sin(time.time() * 3) * 10
-            glTranslatef(power_up.x, power_up.y, power_up.z + power_up.float_offset)
+            # Floating animation (offset is advanced by the simulation)
+            here = (power_up.x, power_up.y, power_up.z + power_up.float_offset)
+            glTranslatef(*here)
             glRotatef(power_up.rotation, 0, 1, 0)
 
             # Different colors and shapes for different power-ups
             if power_up.type == PowerUpType.MAGNET:
                 glColor3f(1.0, 0.0, 1.0)  # Magenta
-                glutSolidTorus(5, 15, 8, 16)
+                glCallList(meshes.torus(5, 15, 8, 16, at=here))
             elif power_up.type == PowerUpType.SHIELD:
                 glColor3f(0.0, 1.0, 1.0)  # Cyan
                 glPushMatrix()
                 glRotatef(45, 1, 1, 0)
-                glutSolidCube(20)
+                glCallList(meshes.cube(20))
                 glPopMatrix()
             elif power_up.type == PowerUpType.SPEED_BOOST:
                 glColor3f(1.0, 0.5, 0.0)  # Orange
                 glScalef(0.5, 2.0, 0.5)
-                glutSolidCube(20)
+                glCallList(meshes.cube(20))
             elif power_up.type == PowerUpType.DOUBLE_JUMP:
                 glColor3f(0.0, 1.0, 0.0)  # Green
-                glutSolidCube(15)
+                glCallList(meshes.cube(15))
                 glTranslatef(0, 0, 20)
-                glutSolidCube(10)
+                glCallList(meshes.cube(10))
             elif power_up.type == PowerUpType.COIN_MULTIPLIER:
                 glColor3f(1.0, 1.0, 0.0)  # Yellow
                 for i in range(5):
                     glPushMatrix()
                     glRotatef(i * 72, 0, 0, 1)
                     glTranslatef(0, 15, 0)
-                    glutSolidCube(8)
+                    glCallList(meshes.cube(8))
                     glPopMatrix()
             elif power_up.type == PowerUpType.FLYING:
                 # Flying power-up - Light blue with wing-like shape
                 glColor3f(0.5, 0.8, 1.0)  # Light blue
                 
                 # Main body
-                glutSolidSphere(12, 8, 8)
+                glCallList(meshes.sphere(12, 8, 8, at=here))
                 
                 # Wing animation
-                wing_angle = math.sin(time.time() * 8) * 30  # Fast wing flapping
+                wing_angle = math.sin(sim.time * 8) * 30  # Fast wing flapping
                 
                 # Left wing
                 glPushMatrix()
                 glTranslatef(-15, 0, 0)
                 glRotatef(wing_angle, 0, 0, 1)
                 glScalef(2.0, 0.3, 0.1)
-                glutSolidCube(15)
+                glCallList(meshes.cube(15))
                 glPopMatrix()
                 
                 # Right wing
@@ -853,232 +476,114 @@ def draw_power_ups():
                 glTranslatef(15, 0, 0)
                 glRotatef(-wing_angle, 0, 0, 1)
                 glScalef(2.0, 0.3, 0.1)
-                glutSolidCube(15)
+                glCallList(meshes.cube(15))
                 glPopMatrix()
                 
             glPopMatrix()
-            power_up.rotation = (power_up.rotation + 3) % 360
 
 
 
 
-def draw_environment():
-    # Draw temple walls on sides
+def pillar_mesh(level):
+    segments = lod.segments(8, level)
+    return meshes.cylinder(20, 20, 160, segments, segments)
+
+
+def build_scenery_chunk(y_start, y_end, level):
+    # Draw temple walls on sides (every 200 units at full density)
+    wall_gap = 200 * scenery_spacing
     glColor3f(0.4, 0.3, 0.2)
-    for i in range(int(distance - 500), int(distance + 1000), 200):
+    for i in range(-(-y_start // wall_gap) * wall_gap, y_end, wall_gap):
         # Left wall
         glPushMatrix()
         glTranslatef(-300, i, 50)
         glScalef(1, 4, 2)
-        glutSolidCube(50)
+        glCallList(meshes.cube(50))
         glPopMatrix()
         
         # Right wall
         glPushMatrix()
         glTranslatef(300, i, 50)
         glScalef(1, 4, 2)
-        glutSolidCube(50)
+        glCallList(meshes.cube(50))
         glPopMatrix()
     
-    # Draw temple pillars
+    # Draw temple pillars (every 400 units at full density, so not in every chunk)
+    pillar_gap = 400 * scenery_spacing
     glColor3f(0.5, 0.4, 0.3)
-    for i in range(int(distance - 500), int(distance + 1000), 400):
+    for i in range(-(-y_start // pillar_gap) * pillar_gap, y_end, pillar_gap):
         for side in [-200, 200]:
             glPushMatrix()
             glTranslatef(side, i, 80)
-            gluCylinder(gluNewQuadric(), 20, 20, 160, 8, 8)
+            glCallList(pillar_mesh(level))
             glPopMatrix()
 
 
+def prepare_scenery_chunk(level):
+    # Shared meshes used by the chunk lists must exist before compiling one
+    meshes.cube(50)
+    pillar_mesh(level)
 
-def check_collisions():
-    global game_state, game_over_reason, player_lives, score, coins_collected
-    global last_life_lost_time, life_lost_count, chasing_enemy
-    
-    current_time = time.time()
-    
-    # Check obstacle collisions (unless shield is active OR flying)
-    if player.shield_timer <= 0 and player.flying_timer <= 0:
-        for obstacle in obstacles:
-            if obstacle.active:
-                if (abs(obstacle.x - player.x) < 50 and
-                    abs(obstacle.y - (player.y + distance)) < 50):
-                    collision_happened = False
-                    
-                    if obstacle.type == 'low' and not player.sliding:
-                        collision_happened = True
-                        game_over_reason = "Hit low barrier! Should have slid!"
-                    elif obstacle.type == 'low' and player.sliding and player.z > 25:
-                        collision_happened = True
-                        game_over_reason = "Didn't slide low enough!"
-                    elif obstacle.type == 'high' and player.z < 70:
-                        collision_happened = True
-                        game_over_reason = "Hit high barrier! Should have jumped higher!"
-                    elif obstacle.type == 'gap' and player.z < 30:
-                        collision_happened = True
-                        game_over_reason = "Fell in gap! Should have jumped!"
-                    
-                    if collision_happened:
-                        player_lives -= 1
-                        obstacle.active = False
-                        
-                        # ENEMY CHASING LOGIC
-                        if last_life_lost_time is None:
-                            # First life lost - activate enemy pursuit
-                            life_lost_count = 1
-                            last_life_lost_time = current_time
-                            chasing_enemy.activate_pursuit()
-                            print("Guardian awakened! It's now hunting you...")
-                            
-                        elif (current_time - last_life_lost_time) <= 20:
-                            # Second life lost within 20 seconds
-                            life_lost_count += 1
-                            if life_lost_count >= 2:
-                                chasing_enemy.rush_attack()
-                                # Enemy catches player, causing additional life loss
-                                player_lives -= 1
-                                print("Guardian caught you due to repeated mistakes!")
-                                game_over_reason = "Caught by Guardian for repeated failures!"
-                                
-                                # Reset tracking
-                                life_lost_count = 0
-                                last_life_lost_time = None
-                        else:
-                            # More than 20 seconds passed, reset counter
-                            life_lost_count = 1
-                            last_life_lost_time = current_time
-                            chasing_enemy.activate_pursuit()
-                        
-                        if player_lives <= 0:
-                            game_state = GameState.GAME_OVER
-                        else:
-                            if life_lost_count < 2:
-                                game_over_reason = f"Life lost! {player_lives} lives remaining - Guardian approaches!"
-                            
-                        player.jumping = False
-                        player.sliding = False
-                        player.z = 20
-                        
-                    else:
-                        obstacle.active = False
-                        # Bonus points for successfully avoiding obstacles
-                        if obstacle.type == 'low' and player.sliding:
-                            score += 150
-                            print("Nice slide! +150 points")
-                        elif obstacle.type == 'high' and player.z > 60:
-                            score += 200
-                            print("Great jump! +200 points")
-                        elif obstacle.type == 'gap' and player.z > 30:
-                            score += 250
-                            print("Perfect gap jump! +250 points")
-    
 
+scenery_chunks = ChunkCache(build_scenery_chunk, prepare=prepare_scenery_chunk, lod=lod)
 
-    # Check if enemy caught player (separate from obstacle collisions, but not while flying)
-    if chasing_enemy.check_collision() and player.shield_timer <= 0 and player.flying_timer <= 0:
-        player_lives -= 1
-        if player_lives <= 0:
-            game_state = GameState.GAME_OVER
-            game_over_reason = "Caught by the Ancient Guardian!"
-        else:
-            game_over_reason = f"Guardian touched you! {player_lives} lives remaining"
-            chasing_enemy.y -= 80  # Push enemy back after catch
-    
 
+@profiler.timed
+def draw_environment():
+    distance = view.distance
+    behind, ahead = quality.tier.span
+    scenery_chunks.draw(distance - behind, distance + ahead)
 
-    # Auto-collect all nearby coins while flying
-    if player.flying_timer > 0:
-        for coin in coins:
-            if (not coin.collected and 
-                abs(coin.y - distance) < 300):  # Larger collection range when flying
-                coin.collected = True
-                coins_collected += 1
-                
-                coin_value = 10
-                if player.coin_multiplier_timer > 0:
-                    coin_value = 30
-                score += coin_value
-    else:
-        # Normal coin collection (existing code)
-        for coin in coins:
-            if (not coin.collected and
-                abs(coin.x - player.x) < 40 and
-                abs(coin.y - (player.y + distance)) < 40 and
-                abs(coin.z - player.z) < 40):
-                coin.collected = True
-                coins_collected += 1
-                
-                coin_value = 10
-                if player.coin_multiplier_timer > 0:
-                    coin_value = 30
-                score += coin_value
-    
-    # Check power-up collection
-    for power_up in power_ups:
-        if (not power_up.collected and
-            abs(power_up.x - player.x) < 40 and
-            abs(power_up.y - (player.y + distance)) < 40 and
-            abs(power_up.z + power_up.float_offset - player.z) < 40):
-            power_up.collected = True
-            player.activate_power_up(power_up.type)
-            score += 50
 
+def apply_quality():
+    """Bring the caches in line with quality.tier (needs the GL context)."""
+    global scenery_spacing
+    tier = quality.tier
+    lod.thresholds = tuple(threshold * tier.detail for threshold in lod_thresholds)
+    if tier.scenery_spacing != scenery_spacing:
+        scenery_chunks.release()  # Compiled at the old density
+        scenery_spacing = tier.scenery_spacing
 
 
 
+def gl_object_counts():
+    """Live GL/GLU objects held by the frontend caches."""
+    counts = meshes.counts()
+    counts["display_lists"] += (len(track_chunks) + len(scenery_chunks) +
+                                hud.counts()["display_lists"])
+    if renderer is not None:
+        counts.update(renderer.counts())
+    return counts
+
+
+def release_gl_resources():
+    print("GL objects at shutdown:", gl_object_counts())
+    track_chunks.release()
+    scenery_chunks.release()
+    meshes.release()
+    hud.release()
+    use_renderer("fixed")
 
-def update_game():
-    global distance, speed, score, last_speed_increase_score
-    global last_life_lost_time, life_lost_count
-    
-    if game_state == GameState.PLAYING:
-        current_time = time.time()
-        
-        # Reset life lost tracking if 20 seconds passed without second life lost
-        if (last_life_lost_time is not None and 
-            (current_time - last_life_lost_time) > 20 and 
-            life_lost_count < 2):
-            life_lost_count = 0
-            last_life_lost_time = None
-            print("Guardian's pursuit cooled down...")
-        
-        # Update player
-        player.update()
-        
-        # Update chasing enemy
-        chasing_enemy.update()
-        
-        # Calculate current speed with power-up effects
-        current_speed = speed
-        if player.speed_boost_timer > 0:
-            current_speed *= 2.0
-        
-        # Move forward - FRAME RATE INDEPENDENT
-        distance += current_speed * delta_time * 60
-        score += 0.2
-        
-        # Speed increase based on score (every 2500 points)
-        score_milestones = int(score // 2500)
-        last_milestones = int(last_speed_increase_score // 2500)
-        if score_milestones > last_milestones:
-            speed += 0.1
-            speed = min(speed, 8.0)
-            last_speed_increase_score = score
-        
-        # Generate new track sections
-        generate_track()
-        
-        # Check collisions
-        check_collisions()
-        
-        # Remove old objects
-        obstacles[:] = [obs for obs in obstacles if obs.y > distance - 1200]
-        coins[:] = [coin for coin in coins if coin.y > distance - 1200]
-        power_ups[:] = [pu for pu in power_ups if pu.y > distance - 1200]
 
+def use_renderer(name):
+    """Switch the world backend; "shader" needs a current GL 3.3 context."""
+    global renderer
+    if name not in RENDERERS:
+        raise ValueError(f"unknown renderer {name!r}; expected one of {RENDERERS}")
+    if renderer is not None:
+        renderer.release()
+        renderer = None
+    if name == "shader":
+        renderer = ShaderRenderer(lod, profiler)
 
 
 
+def camera_pose():
+    """Eye and look-at points of the third-person camera."""
+    distance = view.distance
+    eye = (view.player_x, distance - camera_distance, view.player_z + camera_height)
+    target = (view.player_x, distance + 50, view.player_z + 10)
+    return eye, target
 
 
 def setup_camera():
@@ -1090,281 +595,386 @@ def setup_camera():
     glLoadIdentity()
     
     # Third-person camera
-    cam_x = player.x
-    cam_y = distance - camera_distance
-    cam_z = player.z + camera_height
-    
-    look_x = player.x
-    look_y = distance + 50
-    look_z = player.z + 10
-    
-    gluLookAt(cam_x, cam_y, cam_z,
-              look_x, look_y, look_z,
-              0, 0, 1)
+    eye, target = camera_pose()
+    gluLookAt(*eye, *target, 0, 0, 1)
+    lod.set_camera(*eye)
+
+
+def draw_world(paused=False):
+    """The 3D scene through the selected backend; paused leaves out the guardian."""
+    if renderer is not None:
+        renderer.draw(sim, view, *camera_pose(), paused=paused, tier=quality.tier)
+        return
+
+    setup_camera()
+    draw_track()
+    draw_environment()
+    draw_obstacles()
+    draw_coins()
+    draw_power_ups()
+
+    if paused:
+        draw_player()
+        return
+
+    # Draw chasing enemy
+    draw_chasing_enemy()
+
+    # Draw player
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    draw_player()
+    glDisable(GL_BLEND)
 
 
 
+@profiler.timed
 def draw_power_up_status():
     """Draw active power-up indicators"""
+    effects = sim.player.effects
     y_offset = 580
 
-    if player.magnet_timer > 0:
-        glColor3f(1.0, 0.0, 1.0)
-        draw_text(10, y_offset, f"MAGNET: {player.magnet_timer // 60 + 1}s")
+    # Only the active ones, in PowerUpType order
+    for power_up_type in sorted(effects):
+        effect = POWER_UPS[power_up_type]
+        hud.text(10, y_offset, effect.label + ": {}s", effects.remaining(power_up_type) // 60 + 1,
+                 color=effect.color)
         y_offset -= 25
 
-    if player.shield_timer > 0:
-        glColor3f(0.0, 1.0, 1.0)
-        draw_text(10, y_offset, f"SHIELD: {player.shield_timer // 60 + 1}s")
-        y_offset -= 25
 
-    if player.speed_boost_timer > 0:
-        glColor3f(1.0, 0.5, 0.0)
-        draw_text(10, y_offset, f"SPEED BOOST: {player.speed_boost_timer // 60 + 1}s")
-        y_offset -= 25
 
-    if player.double_jump_timer > 0:
-        glColor3f(0.0, 1.0, 0.0)
-        draw_text(10, y_offset, f"DOUBLE JUMP: {player.double_jump_timer // 60 + 1}s")
-        y_offset -= 25
 
-    if player.coin_multiplier_timer > 0:
-        glColor3f(1.0, 1.0, 0.0)
-        draw_text(10, y_offset, f"COIN x3: {player.coin_multiplier_timer // 60 + 1}s")
-        y_offset -= 25
 
-    if player.flying_timer > 0:
-        glColor3f(0.5, 0.8, 1.0)
-        draw_text(10, y_offset, f"FLYING: {player.flying_timer // 60 + 1}s")
-        y_offset -= 25
 
 
 
+@profiler.timed
+def draw_hud():
+    """Score, progress, power-up and guardian lines while playing"""
+    chasing_enemy = sim.chasing_enemy
+    score = sim.score
+    distance = view.distance
+    game_over_reason = sim.game_over_reason
+    
+    hud.begin()
+    hud.text(10, 770, "Score: {}", int(score))
+    hud.text(10, 740, "Distance: {}m", int(distance))
+    hud.text(10, 710, "Coins: {}", sim.coins_collected)
+    hud.text(10, 680, "Speed: {:.1f}", sim.speed)
+    hud.text(10, 650, "Lives: {}", sim.player_lives)
+    
+    # Show next speed increase progress
+    next_milestone = ((int(score // 2500) + 1) * 2500)
+    points_needed = next_milestone - int(score)
+    hud.text(10, 620, "Next speed boost: {} points", points_needed)
+    
+    # Draw power-up status
+    draw_power_up_status()
+    
+
+    # Show life loss message if applicable
+    if "lives remaining" in game_over_reason:
+        hud.text(300, 400, game_over_reason, color=(1, 0, 0))
+
+
+    # Show enemy warning if active and close
+    if (chasing_enemy.pursuit_mode and 
+        sim.last_life_lost_time is not None):
+        time_remaining = 20 - (sim.time - sim.last_life_lost_time)
+        if time_remaining > 0 and sim.life_lost_count >= 1:
+            hud.text(10, 590, "Guardian Alert! Avoid mistakes: {:.1f}s",
+                     round(time_remaining, 1), color=(1, 0, 0))
+            
+        enemy_distance = distance - view.enemy_y
+        if enemy_distance < 200:
+            if enemy_distance < 50:
+                color = (1, 0, 0)  # Red when very close
+            else:
+                color = (1, 1, 0)  # Yellow when close
+            hud.text(10, 565, "Guardian Distance: {}m", int(enemy_distance), color=color)
+        
+
+    # Flash the latest bonus or power-up
+    if hud_event is not None and sim.tick - hud_event.tick < HUD_EVENT_TICKS:
+        hud.text(400, 700, hud_event.message, color=(1, 1, 0))
+
+    hud.text(10, 45, "Quality: {}", quality.tier.name.upper())
+    hud.text(10, 20, "P - Pause")
+    hud.end()
+
+
+
+def draw_profiler_overlay():
+    """Per-phase frame timings in the top right corner"""
+    global profiler_stats
+    if profiler_stats is None or profiler.frames % 30 == 0:
+        profiler_stats = profiler.summary()
+
+    font = GLUT_BITMAP_HELVETICA_12
+    frame = profiler_stats["frame"]
+    hud.begin()
+    hud.text(600, 780, "frame ms  p50 {:.1f}  p95 {:.1f}  p99 {:.1f}  worst {:.1f}",
+             frame["p50"], frame["p95"], frame["p99"], frame["worst"], font=font, color=(1, 1, 0))
+    y_offset = 760
+    phases = sorted(profiler_stats["phases"].items(), key=lambda item: -item[1]["p95"])
+    for name, stats in phases:
+        hud.text(600, y_offset, "{}  {:.2f} / {:.2f} / {:.2f}",
+                 name, stats["p50"], stats["p95"], stats["p99"], font=font, color=(1, 1, 0))
+        y_offset -= 16
+    hud.end()
 
 
 
 
+def on_event(event):
+    """Subscriber on sim.events; runs inside the tick, so it only records."""
+    global hud_event
+    if event.kind in (BONUS, POWER_UP):
+        hud_event = event
+
 
 def keyboardListener(key, x, y):
-    global game_state
+    global show_profiler
+    game_state = sim.game_state
     
-    if game_state == GameState.MENU:
+    if key == b'f':
+        show_profiler = not show_profiler  # Frame profiler overlay, any screen
+    elif game_state == GameState.MENU:
         if key == b' ':
-            reset_game()
+            pending_inputs.append(Action.START)
     elif game_state == GameState.PLAYING:
         if key == b'a':
-            player.move_left()
+            pending_inputs.append(Action.LEFT)
         elif key == b'd':
-            player.move_right()
+            pending_inputs.append(Action.RIGHT)
         elif key == b'w':
-            player.jump()
+            pending_inputs.append(Action.JUMP)
         elif key == b's':
-            player.slide()
+            pending_inputs.append(Action.SLIDE)
         elif key == b'p':
-            game_state = GameState.PAUSED  # Pause the game
-    elif game_state == GameState.PAUSED:  # ADD THIS SECTION
+            pending_inputs.append(Action.PAUSE)  # Pause the game
+    elif game_state == GameState.PAUSED:
         if key == b'p':
-            game_state = GameState.PLAYING  # Resume the game
+            pending_inputs.append(Action.PAUSE)  # Resume the game
         elif key == b'q':
-            game_state = GameState.MENU
+            pending_inputs.append(Action.MENU)
     elif game_state == GameState.GAME_OVER:
         if key == b'r':
-            reset_game()
+            pending_inputs.append(Action.START)
         elif key == b'q':
-            game_state = GameState.MENU
+            pending_inputs.append(Action.MENU)
 
 
 
 
 def specialKeyListener(key, x, y):
-    if game_state == GameState.PLAYING:
+    if sim.game_state == GameState.PLAYING:
         if key == GLUT_KEY_LEFT:
-            player.move_left()
+            pending_inputs.append(Action.LEFT)
         elif key == GLUT_KEY_RIGHT:
-            player.move_right()
+            pending_inputs.append(Action.RIGHT)
         elif key == GLUT_KEY_UP:
-            player.jump()
+            pending_inputs.append(Action.JUMP)
         elif key == GLUT_KEY_DOWN:
-            player.slide()
+            pending_inputs.append(Action.SLIDE)
 
 
 
 def mouseListener(button, state, x, y):
     if state == GLUT_DOWN:
-        if game_state == GameState.MENU:
+        if sim.game_state == GameState.MENU:
             if button == GLUT_LEFT_BUTTON:
-                reset_game()
-        elif game_state == GameState.PLAYING:
+                pending_inputs.append(Action.START)
+        elif sim.game_state == GameState.PLAYING:
             if button == GLUT_LEFT_BUTTON:
-                player.jump()
+                pending_inputs.append(Action.JUMP)
             elif button == GLUT_RIGHT_BUTTON:
-                player.slide()
+                pending_inputs.append(Action.SLIDE)
 
 
 
 def idle():
-    global delta_time, last_time
+    global last_time
     
-    current_time = time.time()
-    delta_time = current_time - last_time
+    profiler.next_frame()
+    quality.begin_frame()
+    current_time = time.perf_counter()
+    frame_time = current_time - last_time
     last_time = current_time
     
-    if game_state == GameState.PLAYING:
-        update_game()
+    # Run the fixed 60 Hz ticks this frame owes; queued input goes to the first
+    with profiler.phase("update"):
+        for _ in range(timestep.advance(frame_time)):
+            if replay_player is not None:
+                pending_inputs[:] = replay_player.inputs(sim.tick)
+            sim.step(pending_inputs)
+            pending_inputs.clear()
     glutPostRedisplay()
 
 
 
 
-def showScreen():
+def draw_frame():
+    """Draw the current state into the back buffer; showScreen() presents it."""
+    global view
+    view = sim.view(timestep.alpha)
+
     glEnable(GL_DEPTH_TEST)
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     glLoadIdentity()
     glViewport(0, 0, 1000, 800)
     
+    game_state = sim.game_state
+    score = sim.score
+    distance = view.distance
+    game_over_reason = sim.game_over_reason
 
 
     if game_state == GameState.MENU:
-
-
-
         # Menu screen
         glClearColor(0.1, 0.1, 0.2, 1.0)
-        draw_text(300, 600, "TEMPLE RUN 3D - ENHANCED", GLUT_BITMAP_TIMES_ROMAN_24)
-        draw_text(350, 550, "Press SPACE or Click to Start")
+        hud.begin()
+        hud.text(300, 600, "TEMPLE RUN 3D - ENHANCED", font=GLUT_BITMAP_TIMES_ROMAN_24)
+        hud.text(350, 550, "Press SPACE or Click to Start")
         
-        draw_text(300, 500, "Controls:")
-        draw_text(320, 470, "A/D or Left/Right Arrow: Move lanes")
-        draw_text(320, 440, "W or Up Arrow: Jump")
-        draw_text(320, 410, "S or Down Arrow: Slide")
-        draw_text(320, 380, "Left Click: Jump")
-        draw_text(320, 350, "Right Click: Slide")
+        hud.text(300, 500, "Controls:")
+        hud.text(320, 470, "A/D or Left/Right Arrow: Move lanes")
+        hud.text(320, 440, "W or Up Arrow: Jump")
+        hud.text(320, 410, "S or Down Arrow: Slide")
+        hud.text(320, 380, "Left Click: Jump")
+        hud.text(320, 350, "Right Click: Slide")
         
         # Power-ups section
-        draw_text(300, 300, "Power-ups:")
-        draw_text(320, 270, "Magnet (Purple): Attracts coins")
-        draw_text(320, 240, "Shield (Cyan): Temporary invincibility")
-        draw_text(320, 210, "Speed Boost (Orange): Double speed")
-        draw_text(320, 180, "Double Jump (Green): Jump twice")
-        draw_text(320, 150, "Coin Multiplier (Yellow): Triple coin value")
-        draw_text(320, 120, "Flying Mode (Light Blue): Fly high & auto-collect coins")
+        hud.text(300, 300, "Power-ups:")
+        hud.text(320, 270, "Magnet (Purple): Attracts coins")
+        hud.text(320, 240, "Shield (Cyan): Temporary invincibility")
+        hud.text(320, 210, "Speed Boost (Orange): Double speed")
+        hud.text(320, 180, "Double Jump (Green): Jump twice")
+        hud.text(320, 150, "Coin Multiplier (Yellow): Triple coin value")
+        hud.text(320, 120, "Flying Mode (Light Blue): Fly high & auto-collect coins")
         
         # Game mechanics info
-        draw_text(300, 90, "Guardian Enemy:")
-        draw_text(320, 60, "Awakens after first mistake - avoid repeated failures!")
+        hud.text(300, 90, "Guardian Enemy:")
+        hud.text(320, 60, "Awakens after first mistake - avoid repeated failures!")
         
-        draw_text(300, 30, "Speed increases by 0.1 every 2500 points!")
-        draw_text(300, 10, "Bonus points for going through obstacles correctly!")
-
-
-
-
+        hud.text(300, 30, "Speed increases by 0.1 every 2500 points!")
+        hud.text(300, 10, "Bonus points for going through obstacles correctly!")
+        hud.end()
 
 
     elif game_state == GameState.PLAYING:
         glClearColor(0.3, 0.5, 0.8, 1.0)
-        setup_camera()
         
         # Draw game world
-        draw_track()
-        draw_environment()
-        draw_obstacles()
-        draw_coins()
-        draw_power_ups()
-
-        # Draw chasing enemy
-        draw_chasing_enemy()
-        
-        # Draw player
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        draw_player()
-        glDisable(GL_BLEND)
+        draw_world()
         
         # Draw UI
-        glColor3f(1, 1, 1)
-        draw_text(10, 770, f"Score: {int(score)}")
-        draw_text(10, 740, f"Distance: {int(distance)}m")
-        draw_text(10, 710, f"Coins: {coins_collected}")
-        draw_text(10, 680, f"Speed: {speed:.1f}")
-        draw_text(10, 650, f"Lives: {player_lives}")
-        
-        # Show next speed increase progress
-        next_milestone = ((int(score // 2500) + 1) * 2500)
-        points_needed = next_milestone - int(score)
-        draw_text(10, 620, f"Next speed boost: {points_needed} points")
-        
-        # Draw power-up status
-        draw_power_up_status()
-        
-
-        # Show life loss message if applicable
-        if "lives remaining" in game_over_reason:
-            glColor3f(1, 0, 0)
-            draw_text(300, 400, game_over_reason, GLUT_BITMAP_HELVETICA_18)
-
-
-            # Show enemy warning if active and close
-        if (chasing_enemy.pursuit_mode and 
-            last_life_lost_time is not None):
-            time_remaining = 20 - (time.time() - last_life_lost_time)
-            if time_remaining > 0 and life_lost_count >= 1:
-                glColor3f(1, 0, 0)
-                draw_text(10, 590, f"Guardian Alert! Avoid mistakes: {time_remaining:.1f}s")
-                
-            enemy_distance = distance - chasing_enemy.y
-            if enemy_distance < 200:
-                if enemy_distance < 50:
-                    glColor3f(1, 0, 0)  # Red when very close
-                else:
-                    glColor3f(1, 1, 0)  # Yellow when close
-                draw_text(10, 565, f"Guardian Distance: {int(enemy_distance)}m")
-        
-        # Show life loss message if applicable
-        if "lives remaining" in game_over_reason:
-            glColor3f(1, 0, 0)
-            draw_text(300, 400, game_over_reason, GLUT_BITMAP_HELVETICA_18)
-            
-
-        glColor3f(1, 1, 1)
-        draw_text(10, 20, "P - Pause")
+        draw_hud()
 
         
     elif game_state == GameState.GAME_OVER:
         glClearColor(0.2, 0.1, 0.1, 1.0)
-        draw_text(350, 550, "GAME OVER!", GLUT_BITMAP_TIMES_ROMAN_24)
-        draw_text(300, 500, game_over_reason)
-        draw_text(300, 450, f"Final Score: {int(score)}")
-        draw_text(300, 420, f"Distance: {int(distance)}m")
-        draw_text(300, 390, f"Coins Collected: {coins_collected}")
-        draw_text(300, 360, f"Final Speed: {speed:.1f}")
-        draw_text(300, 330, f"Speed Milestones Reached: {int(score // 5000)}")
-        draw_text(300, 300, f"Lives Used: {5 - player_lives}")
-        draw_text(300, 250, "Press R to Restart")
-        draw_text(300, 220, "Press Q for Main Menu")
+        hud.begin()
+        hud.text(350, 550, "GAME OVER!", font=GLUT_BITMAP_TIMES_ROMAN_24)
+        hud.text(300, 500, game_over_reason)
+        hud.text(300, 450, "Final Score: {}", int(score))
+        hud.text(300, 420, "Distance: {}m", int(distance))
+        hud.text(300, 390, "Coins Collected: {}", sim.coins_collected)
+        hud.text(300, 360, "Final Speed: {:.1f}", sim.speed)
+        hud.text(300, 330, "Speed Milestones Reached: {}", int(score // 5000))
+        hud.text(300, 300, "Lives Used: {}", 5 - sim.player_lives)
+        hud.text(300, 250, "Press R to Restart")
+        hud.text(300, 220, "Press Q for Main Menu")
+        hud.end()
 
 
     elif game_state == GameState.PAUSED:
         # Keep displaying the game scene but with pause overlay
-        setup_camera()
-        draw_track()
-        draw_environment()
-        draw_obstacles()
-        draw_coins()
-        draw_power_ups()
-        draw_player()
-        
+        draw_world(paused=True)
         
-        draw_text(400, 400, "GAME PAUSED", GLUT_BITMAP_TIMES_ROMAN_24)
-        draw_text(350, 350, "Press P to Resume")
-        draw_text(350, 320, "Press Q for Main Menu")
+        hud.begin()
+        hud.text(400, 400, "GAME PAUSED", font=GLUT_BITMAP_TIMES_ROMAN_24)
+        hud.text(350, 350, "Press P to Resume")
+        hud.text(350, 320, "Press Q for Main Menu")
+        hud.end()
     
-    glutSwapBuffers()
+    if show_profiler:
+        draw_profiler_overlay()
+
+
+def showScreen():
+    draw_frame()
+    # Work time only: the swap waits for vsync
+    tier = quality.end_frame()
+    if tier is not None:
+        apply_quality()
+        # Logged by event_log off the frame path, like the game's own events
+        sim.events.publish(sim.tick, QUALITY, f"Quality: {tier.name} (p90 frame work "
+                           f"{quality.last_p90:.1f} ms, budget {quality.budget_ms:.1f} ms)", tier.name)
+    with profiler.phase("swap"):
+        glutSwapBuffers()
 
 
 
 
 def main():
+    global sim, view, replay_player, lod_thresholds, event_log
+    
+    parser = argparse.ArgumentParser(description="Temple Run 3D - Enhanced")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write frame phase timings to PATH on exit (.json or .csv)")
+    parser.add_argument("--seed", type=int,
+                        help="seed for the track and the guardian (random if omitted)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="save the seed and every input to PATH on exit")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="play back a recording instead of taking input")
+    parser.add_argument("--threaded-track", action="store_true",
+                        help="generate track segments on a worker thread")
+    parser.add_argument("--renderer", choices=RENDERERS, default="fixed",
+                        help="draw the world with fixed-function GL or GL 3.3 shaders")
+    parser.add_argument("--lod", metavar="NEAR,FAR",
+                        help="camera distances beyond which curved shapes use coarser "
+                             "tessellation (default %s)" % ",".join(map(str, lod.thresholds)))
+    parser.add_argument("--quality", choices=("auto",) + TIER_NAMES, default="auto",
+                        help="render quality tier; auto steps between them to hold --target-fps")
+    parser.add_argument("--target-fps", type=float, default=60,
+                        help="frame rate the auto quality tier aims for (default 60)")
+    args = parser.parse_args()
+    if args.lod:
+        try:
+            thresholds = tuple(float(value) for value in args.lod.split(","))
+        except ValueError:
+            parser.error("--lod takes comma-separated distances")
+        if len(thresholds) != len(lod.thresholds):
+            parser.error(f"--lod takes {len(lod.thresholds)} distances")
+        lod_thresholds = tuple(sorted(thresholds))
+    if args.target_fps <= 0:
+        parser.error("--target-fps must be positive")
+    if args.record and args.seed is not None and not 0 <= args.seed < SEED_LIMIT:
+        parser.error("--seed must be from 0 to 2**64 - 1 to be recorded")
+    quality.set_target(args.target_fps)
+    if args.quality != "auto":
+        quality.adaptive = False
+        quality.set_tier(args.quality)
+    if args.profile:
+        atexit.register(profiler.dump, args.profile)
+    
+    seed = args.seed
+    if args.replay:
+        replay = Replay.load(args.replay)
+        replay_player = ReplayPlayer(replay)
+        seed = replay.seed
+    sim = Simulation(seed=seed, profiler=profiler, threaded_track=args.threaded_track)
+    atexit.register(sim.close)
+    view = sim.view()
+    sim.events.subscribe(on_event)
+    event_log = LogWriter(sim.events, sys.stdout)
+    atexit.register(event_log.close)
+    if args.record:
+        sim.recorder = Recorder(sim.seed)
+        atexit.register(sim.recorder.save, args.record)
+    
     glutInit()
     glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
     glutInitWindowSize(1000, 800)
@@ -1373,6 +983,8 @@ def main():
     
     glShadeModel(GL_SMOOTH)
     glEnable(GL_DEPTH_TEST)
+    use_renderer(args.renderer)
+    apply_quality()
     
     glutDisplayFunc(showScreen)
     glutKeyboardFunc(keyboardListener)
@@ -1380,6 +992,11 @@ def main():
     glutMouseFunc(mouseListener)
     glutIdleFunc(idle)
     
+    # Free cached GL objects while the context still exists (freeglut only)
+    if bool(glutSetOption):
+        glutSetOption(GLUT_ACTION_ON_WINDOW_CLOSE, GLUT_ACTION_GLUTMAINLOOP_RETURNS)
+        glutCloseFunc(release_gl_resources)
+    
     print("Temple Run 3D Enhanced - Controls:")
     print("A/D or Arrow Keys: Change lanes")
     print("W or Up Arrow: Jump")
@@ -1389,6 +1006,7 @@ def main():
     print("P: Pause (during game)")
     print("R: Restart (when game over)")
     print("Q: Main menu (when game over)")
+    print("F: Frame profiler overlay")
     print("\nPower-ups:")
     print("- Magnet (Purple): Attracts nearby coins")
     print("- Shield (Cyan): Temporary invincibility")
@@ -1396,6 +1014,11 @@ def main():
     print("- Double Jump (Green): Ability to jump twice")
     print("- Coin Multiplier (Yellow): Triple coin value")
     print("\nSpeed increases by 0.1 every 5000 points!")
+    print(f"\nSeed: {sim.seed}" + (f" (replaying {args.replay})" if args.replay else ""))
+    # On the event log like every later change, so the log has the full history
+    sim.events.publish(sim.tick, QUALITY, f"Quality: {quality.tier.name}" +
+                       (f" (auto, target {args.target_fps:g} fps)" if quality.adaptive else ""),
+                       quality.tier.name)
     
     glutMainLoop()
 
@@ -0,0 +1,139 @@
+"""Gameplay events: a ring buffer the rules publish to, and a log writer.
+
+The rules used to print() their messages ("Nice slide! +150 points",
+"Guardian awakened!") in the middle of a tick, so a slow terminal or a pipe
+into a log collector held up the frame.  Now they publish an Event to the
+simulation's EventBus, which only stores it in a fixed-size ring and calls
+any subscribers.  A LogWriter copies events to a stream from a daemon thread;
+the HUD and tests subscribe, or read the ring with since().
+
+    writer = LogWriter(sim.events, sys.stdout)  # What print() used to show
+    sim.events.subscribe(seen.append)           # Every event, as it happens
+"""
+import sys
+import threading
+
+
+# Event kinds, and what an event's value holds
+BONUS = "bonus"          # Obstacle cleared in style; the points
+LIFE_LOST = "life_lost"  # Lives left
+GUARDIAN = "guardian"    # The guardian woke, caught up or gave up the chase; None
+POWER_UP = "power_up"    # Picked up; the PowerUpType
+QUALITY = "quality"      # The frontend changed render quality tier; its name
+
+
+class Event:
+    """One thing that happened during a tick.
+
+    Kept small, since the bus holds the last capacity of them: the message is
+    usually a constant string and value a small int or None.
+    """
+
+    __slots__ = ('tick', 'kind', 'message', 'value')
+
+    def __init__(self, tick, kind, message, value=None):
+        self.tick = tick  # Simulation.tick it happened on
+        self.kind = kind
+        self.message = message
+        self.value = value
+
+    def __repr__(self):
+        return f"Event(tick={self.tick}, {self.kind}: {self.message!r})"
+
+
+class EventBus:
+    """The last capacity events, plus subscribers called as each is published.
+
+    publish() never blocks on output: it stores the event and calls the
+    subscribers on the publishing thread, so subscribers must be quick.
+    Readers that fall more than capacity events behind lose the oldest
+    ones; since() reports how many.
+    """
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.sequence = 0  # Events published so far
+        self._ring = [None] * capacity
+        self._subscribers = []
+        self._lock = threading.Lock()  # Readers may be on other threads
+
+    def publish(self, tick, kind, message, value=None):
+        with self._lock:
+            event = Event(tick, kind, message, value)
+            self._ring[self.sequence % self.capacity] = event
+            self.sequence += 1
+        for subscriber in self._subscribers:
+            subscriber(event)
+        return event
+
+    def subscribe(self, callback):
+        """Call callback(event) for every event published from now on."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def since(self, sequence):
+        """(events published from sequence on that are still held, how many were lost)."""
+        with self._lock:
+            start = max(sequence, self.sequence - self.capacity)
+            events = [self._ring[i % self.capacity] for i in range(start, self.sequence)]
+        return events, start - sequence
+
+    def recent(self, count):
+        """The last count events still held, oldest first."""
+        return self.since(max(0, self.sequence - count))[0]
+
+
+class LogWriter:
+    """Writes each event on bus to stream as a line, from a daemon thread.
+
+    Starts with the events published after it was created.  close() stops
+    the thread once everything published so far has been written.
+    """
+
+    def __init__(self, bus, stream=None, show_tick=False):
+        self.bus = bus
+        self.stream = stream if stream is not None else sys.stdout
+        self.show_tick = show_tick
+        self.written = 0
+        self.dropped = 0
+        self._cursor = bus.sequence
+        self._stop = threading.Event()
+        self._pending = threading.Event()  # Set by publish(), cleared by the thread
+        bus.subscribe(self._notify)
+        self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        self._thread.start()
+
+    def _notify(self, event):
+        self._pending.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._pending.wait()
+            self._pending.clear()
+            self.flush()
+
+    def flush(self):
+        """Write whatever has been published since the last flush."""
+        events, dropped = self.bus.since(self._cursor)
+        if not events:
+            return
+        if dropped:
+            self.dropped += dropped
+            self.stream.write(f"({dropped} events dropped)\n")
+        for event in events:
+            if self.show_tick:
+                self.stream.write(f"[{event.tick}] {event.message}\n")
+            else:
+                self.stream.write(event.message + "\n")
+        self.stream.flush()
+        self.written += len(events)
+        self._cursor += dropped + len(events)
+
+    def close(self):
+        self.bus.unsubscribe(self._notify)
+        self._stop.set()
+        self._pending.set()
+        self._thread.join()
+        self.flush()
@@ -0,0 +1,200 @@
+"""Per draw function GL call counts.
+
+Most of a frame's CPU cost is the Python to PyOpenGL call overhead of each
+gl*/glu*/glut* call rather than the pixels, and the number of those calls is
+the same on every machine.  GLTracer swaps the GL functions the renderer
+modules imported for counting wrappers, and the draw functions for wrappers
+that note which one is running, so every call is charged to the innermost
+draw function on the stack (or to "frame" outside any of them).
+
+    python gl_trace.py                # count one steady-state frame per scene
+    python gl_trace.py --update       # store the counts as gl_budget.json
+    python gl_trace.py --check        # exit 1 if any count is over budget
+    python gl_trace.py --renderer shader --check   # the shader backend's own budget
+
+It draws the bench_render.py scenes on an offscreen context, after a few
+warm-up frames so that display lists compiled on first use are not counted.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+
+import offscreen
+from bench_render import HEIGHT, SCENES, WIDTH, land
+
+
+BUDGET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gl_budget.json")
+
+# Modules whose `from OpenGL.* import *` names are traced
+RENDER_MODULES = ("escape_runner", "render_cache", "coin_batch", "hud_text", "shader_renderer")
+DRAW_FUNCTIONS = ("setup_camera", "draw_track", "draw_environment", "draw_obstacles",
+                  "draw_coins", "draw_power_ups", "draw_chasing_enemy", "draw_player",
+                  "draw_hud", "draw_power_up_status", "draw_profiler_overlay")
+OUTSIDE = "frame"
+GL_NAME = re.compile(r"gl(u|ut)?[A-Z]")  # glBegin, gluSphere, glutSwapBuffers; not gl_object_counts
+
+
+def categorize(calls):
+    """Sum a Counter of GL function names into the tracked categories."""
+    def total(match):
+        return sum(count for name, count in calls.items() if match(name))
+    return {
+        "calls": sum(calls.values()),
+        "matrix_push": calls["glPushMatrix"],
+        "begin_end": calls["glBegin"],
+        "vertex": total(lambda name: name.startswith("glVertex3") or name.startswith("glVertex2")),
+        "color": total(lambda name: name.startswith("glColor")),
+        "list_call": calls["glCallList"] + calls["glCallLists"],
+        "quadric": calls["gluNewQuadric"],
+    }
+
+
+class GLTracer:
+    """Counts GL calls per draw function while installed."""
+
+    def __init__(self, modules, draw_functions):
+        self.modules = modules
+        self.draw_functions = draw_functions
+        self.calls = defaultdict(Counter)  # draw function -> GL name -> count
+        self._stack = [OUTSIDE]
+        self._saved = []  # (module, name, original)
+
+    def _count(self, name, function):
+        calls = self.calls
+        stack = self._stack
+
+        def traced(*args, **kwargs):
+            calls[stack[-1]][name] += 1
+            return function(*args, **kwargs)
+        return traced
+
+    def _enter(self, name, function):
+        stack = self._stack
+
+        def traced(*args, **kwargs):
+            stack.append(name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stack.pop()
+        return traced
+
+    def install(self):
+        for module in self.modules:
+            for name, value in list(vars(module).items()):
+                if name in self.draw_functions:
+                    wrapper = self._enter(name, value)
+                elif GL_NAME.match(name) and callable(value):
+                    wrapper = self._count(name, value)
+                else:
+                    continue
+                self._saved.append((module, name, value))
+                setattr(module, name, wrapper)
+
+    def uninstall(self):
+        for module, name, value in reversed(self._saved):
+            setattr(module, name, value)
+        self._saved.clear()
+
+    def reset(self):
+        self.calls.clear()
+
+    def report(self):
+        """Category counts per draw function for everything traced since reset()."""
+        return {function: categorize(calls) for function, calls in sorted(self.calls.items())}
+
+
+def over_budget(scene, counts, budget):
+    found = []
+    for function, categories in counts.items():
+        allowed = budget.get(function, {})
+        for category, count in categories.items():
+            if count > allowed.get(category, 0):
+                found.append(f"{scene}/{function}: {count} {category}, budget {allowed.get(category, 0)}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count GL calls per draw function")
+    parser.add_argument("--platform", choices=offscreen.PLATFORMS, default="egl")
+    parser.add_argument("--renderer", choices=("fixed", "shader"), default="fixed",
+                        help="world backend; shader counts are budgeted as <scene>@shader")
+    parser.add_argument("--scene", action="append", metavar="NAME",
+                        help="trace only the named scene (repeatable)")
+    parser.add_argument("--budget", default=BUDGET, metavar="PATH")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true", help="exit 1 if a count exceeds the budget")
+    mode.add_argument("--update", action="store_true", help="store the counts as the budget")
+    args = parser.parse_args()
+
+    scenes = [s for s in SCENES if not args.scene or s.name in args.scene]
+    if not scenes:
+        parser.error("no scene matches " + ", ".join(args.scene))
+
+    offscreen.use_platform(args.platform)
+    context = offscreen.create_context(WIDTH, HEIGHT)
+
+    import escape_runner as er
+    from hud_text import BlockFont, HudLayer
+
+    er.hud = HudLayer(glyph_class=BlockFont)
+    er.use_renderer(args.renderer)
+    tracer = GLTracer([sys.modules[name] for name in RENDER_MODULES], DRAW_FUNCTIONS)
+
+    results = {}
+    for scene in scenes:
+        sim, _ = scene.run()
+        land(sim)
+        er.sim = sim
+        er.timestep.alpha = 1.0
+        for _ in range(3):
+            er.draw_frame()  # Compile the display lists this scene needs
+
+        tracer.install()
+        try:
+            tracer.reset()
+            er.draw_frame()
+        finally:
+            tracer.uninstall()
+        name = scene.name if args.renderer == "fixed" else f"{scene.name}@{args.renderer}"
+        counts = results[name] = tracer.report()
+
+        print(name)
+        print(f"    {'function':<22}" + "".join(f"{category:>12}" for category in categorize(Counter())))
+        for function, categories in counts.items():
+            print(f"    {function:<22}" + "".join(f"{count:>12}" for count in categories.values()))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        er.release_gl_resources()
+    context.release()
+
+    if args.update:
+        budget = {}
+        if os.path.exists(args.budget):
+            with open(args.budget) as f:
+                budget = json.load(f)
+        budget.update(results)
+        with open(args.budget, "w") as f:
+            json.dump(budget, f, indent=2, sort_keys=True)
+        print(f"Budget written to {args.budget}")
+    elif args.check:
+        with open(args.budget) as f:
+            budget = json.load(f)
+        failures = []
+        for scene, counts in results.items():
+            failures += over_budget(scene, counts, budget.get(scene, {}))
+        if failures:
+            print("\nOver budget:")
+            for failure in failures:
+                print("  " + failure)
+            sys.exit(1)
+        print("\nAll counts within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Cached HUD text.
+
+Drawing a string used to mean reloading both matrices and one
+glutBitmapCharacter call per character, for every HUD line on every frame.
+Here each font is compiled once into a display list per character, drawn with
+a single glCallLists per string, and each HUD line is recorded into its own
+display list that is only re-recorded when the line's text changes.
+"""
+from OpenGL.GL import *
+from OpenGL.GLU import *
+from OpenGL.GLUT import *
+
+
+class GlyphFont:
+    """One display list per ASCII character of a GLUT bitmap font."""
+
+    def __init__(self, font):
+        self.font = font
+        self.base = None
+
+    def compile(self):
+        if self.base is not None:
+            return
+        self.base = glGenLists(128)
+        for code in range(128):
+            glNewList(self.base + code, GL_COMPILE)
+            glutBitmapCharacter(self.font, code)
+            glEndList()
+
+    def draw(self, text):
+        """Draw text at the current raster position."""
+        glListBase(self.base)
+        glCallLists(text.encode('ascii', 'replace'))
+
+    def release(self):
+        if self.base is not None:
+            glDeleteLists(self.base, 128)
+            self.base = None
+
+
+class BlockFont(GlyphFont):
+    """Stand-in for GlyphFont when GLUT is not initialised (offscreen runs).
+
+    glutBitmapCharacter aborts the process without glutInit, so every
+    printable character is drawn as a solid block of about the size of an
+    18 pt Helvetica glyph instead.  The text is not readable, but it costs
+    one glBitmap per character, the same as the real font.
+    """
+
+    WIDTH, HEIGHT, ADVANCE = 8, 13, 10
+
+    def compile(self):
+        if self.base is not None:
+            return
+        # Rows are padded to GL_UNPACK_ALIGNMENT, 4 bytes by default
+        stride = ((self.WIDTH + 7) // 8 + 3) // 4 * 4
+        block = bytes([0xff] * (stride * self.HEIGHT))
+        self.base = glGenLists(128)
+        for code in range(128):
+            glNewList(self.base + code, GL_COMPILE)
+            if chr(code).isspace() or code < 32:
+                glBitmap(0, 0, 0, 0, self.ADVANCE, 0, block)
+            else:
+                glBitmap(self.WIDTH, self.HEIGHT, 0, 0, self.ADVANCE, 0, block)
+            glEndList()
+
+
+class HudLine:
+    def __init__(self, display_list):
+        self.display_list = display_list
+        self.key = None  # (fmt, values, font, color) the list was recorded with
+
+
+class HudLayer:
+    """Screen-space text, set up once per frame between begin() and end().
+
+    Lines are identified by their screen position.  A line is formatted and
+    recorded only when its format string, values, font or colour differ from
+    what was last drawn there; otherwise drawing it is one glCallList.
+    glyph_class compiles each font; pass BlockFont when GLUT is unavailable.
+    """
+
+    def __init__(self, width=1000, height=800, default_font=GLUT_BITMAP_HELVETICA_18,
+                 glyph_class=GlyphFont):
+        self.width = width
+        self.height = height
+        self.default_font = default_font
+        self.glyph_class = glyph_class
+        self._fonts = {}
+        self._lines = {}  # (x, y) -> HudLine
+        self.rebuilt = 0  # Lines re-recorded because their text changed
+
+    def begin(self):
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        gluOrtho2D(0, self.width, 0, self.height)
+
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+
+    def end(self):
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+
+    def glyphs(self, font):
+        # GLUT font handles are unhashable pointers, but they are singletons
+        glyph_font = self._fonts.get(id(font))
+        if glyph_font is None:
+            glyph_font = self._fonts[id(font)] = self.glyph_class(font)
+        return glyph_font
+
+    def text(self, x, y, fmt, *values, font=None, color=(1, 1, 1)):
+        """Draw fmt.format(*values) at (x, y); formatting only happens on change."""
+        if font is None:
+            font = self.default_font
+        key = (fmt, values, font, color)
+
+        line = self._lines.get((x, y))
+        if line is None:
+            line = self._lines[(x, y)] = HudLine(glGenLists(1))
+        if line.key != key:
+            glyph_font = self.glyphs(font)
+            glyph_font.compile()  # Must not happen inside the line's own list
+            glNewList(line.display_list, GL_COMPILE)
+            glColor3f(*color)
+            glRasterPos2f(x, y)
+            glyph_font.draw(fmt.format(*values) if values else fmt)
+            glEndList()
+            line.key = key
+            self.rebuilt += 1
+
+        glCallList(line.display_list)
+
+    def counts(self):
+        return {"display_lists": len(self._lines) +
+                128 * sum(1 for f in self._fonts.values() if f.base is not None)}
+
+    def release(self):
+        for line in self._lines.values():
+            glDeleteLists(line.display_list, 1)
+        self._lines.clear()
+        for glyph_font in self._fonts.values():
+            glyph_font.release()
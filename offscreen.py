@@ -0,0 +1,91 @@
+"""Offscreen OpenGL contexts, for rendering without a window or a GPU.
+
+PyOpenGL picks its platform (GLX, EGL, OSMesa) from PYOPENGL_PLATFORM the
+first time OpenGL is imported, so use_platform() must run before anything
+imports OpenGL, escape_runner included.  With Mesa installed, both
+platforms give a software (llvmpipe) context on a machine with no display:
+
+    offscreen.use_platform("egl")
+    context = offscreen.create_context(1000, 800)
+    import escape_runner
+"""
+import ctypes
+import os
+
+
+PLATFORMS = ("egl", "osmesa")
+
+
+def use_platform(platform):
+    if platform not in PLATFORMS:
+        raise ValueError(f"unknown offscreen platform {platform!r}; expected one of {PLATFORMS}")
+    current = os.environ.get("PYOPENGL_PLATFORM")
+    if current not in (None, platform):
+        raise RuntimeError(f"PYOPENGL_PLATFORM is already {current!r}")
+    os.environ["PYOPENGL_PLATFORM"] = platform
+    if platform == "egl":
+        # Without a display server Mesa needs the surfaceless platform
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+
+def create_context(width, height):
+    """Create a compatibility-profile context with an RGB + depth framebuffer
+    of width x height and make it current.  Keep the returned object alive."""
+    platform = os.environ.get("PYOPENGL_PLATFORM")
+    if platform == "egl":
+        return _EglContext(width, height)
+    if platform == "osmesa":
+        return _OSMesaContext(width, height)
+    raise RuntimeError("call offscreen.use_platform() before create_context()")
+
+
+class _EglContext:
+    def __init__(self, width, height):
+        from OpenGL import EGL
+
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        if not EGL.eglInitialize(self.display, None, None):
+            raise RuntimeError("eglInitialize failed")
+        attributes = (EGL.EGLint * 13)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+            EGL.EGL_DEPTH_SIZE, 24,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE)
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        EGL.eglChooseConfig(self.display, attributes, ctypes.pointer(config), 1, ctypes.pointer(count))
+        if count.value == 0:
+            raise RuntimeError("no EGL config with desktop OpenGL and a pbuffer")
+
+        size = (EGL.EGLint * 5)(EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE)
+        self.surface = EGL.eglCreatePbufferSurface(self.display, config, size)
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, None)
+        if not EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context):
+            raise RuntimeError("eglMakeCurrent failed")
+
+    def release(self):
+        from OpenGL import EGL
+
+        EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+        EGL.eglDestroySurface(self.display, self.surface)
+        EGL.eglDestroyContext(self.display, self.context)
+        EGL.eglTerminate(self.display)
+
+
+class _OSMesaContext:
+    def __init__(self, width, height):
+        from OpenGL import GL, osmesa
+
+        self.context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        if not self.context:
+            raise RuntimeError("OSMesaCreateContextExt failed")
+        self.buffer = (GL.GLubyte * (width * height * 4))()
+        if not osmesa.OSMesaMakeCurrent(self.context, self.buffer, GL.GL_UNSIGNED_BYTE, width, height):
+            raise RuntimeError("OSMesaMakeCurrent failed")
+
+    def release(self):
+        from OpenGL import osmesa
+
+        osmesa.OSMesaDestroyContext(self.context)
@@ -0,0 +1,178 @@
+"""Per-phase frame timing.
+
+FrameProfiler times named phases of each frame (simulation sub-steps, each
+draw function, the HUD) and keeps a rolling window of samples per phase, so
+it can report p50/p95/p99 and the worst frame at any point and dump the lot to
+JSON or CSV.  It has no GL dependency; the frontend draws the overlay.
+"""
+import csv
+import functools
+import json
+import time
+from collections import deque
+
+
+# Upper bounds (ms) of the frame-time histogram buckets; the last is open-ended
+HISTOGRAM_BUCKETS = (4.0, 8.0, 16.7, 33.3, 50.0, 100.0, float("inf"))
+
+
+def percentile(sorted_samples, fraction):
+    if not sorted_samples:
+        return 0.0
+    index = min(int(fraction * len(sorted_samples)), len(sorted_samples) - 1)
+    return sorted_samples[index]
+
+
+class _Phase:
+    """Reusable context manager that adds its elapsed time to one phase."""
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = self.profiler.timer()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = (self.profiler.timer() - self.start) * 1000
+        frame = self.profiler._frame
+        frame[self.name] = frame.get(self.name, 0.0) + elapsed
+        return False
+
+
+class FrameProfiler:
+    """Rolling per-phase timings over the last window frames.
+
+    timer is wall time by default; time.process_time measures CPU time instead.
+    """
+
+    def __init__(self, window=600, timer=time.perf_counter):
+        self.window = window
+        self.timer = timer
+        self._phases = {}   # name -> _Phase
+        self._samples = {}  # name -> deque of per-frame ms
+        self._worst = {}    # name -> worst per-frame ms seen
+        self._frame = {}    # name -> ms accumulated in the current frame
+        self.reset()
+
+    def reset(self):
+        """Forget every sample; phases handed out by phase() and timed() stay valid."""
+        self._samples.clear()
+        self._worst.clear()
+        self._frame.clear()
+        self._frame_times = deque(maxlen=self.window)
+        self._frame_start = None
+        self.frames = 0
+        self.worst_frame = 0.0
+        self.worst_frame_phases = {}
+        self.histogram = [0] * len(HISTOGRAM_BUCKETS)
+
+    def phase(self, name):
+        """Context manager timing one phase; a phase may run several times a frame."""
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = _Phase(self, name)
+        return phase
+
+    def timed(self, function):
+        """Decorator timing every call of function as a phase named after it."""
+        phase = self.phase(function.__name__)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with phase:
+                return function(*args, **kwargs)
+        return wrapper
+
+    def next_frame(self):
+        """Close the current frame and start the next one."""
+        now = self.timer()
+        if self._frame_start is not None:
+            self._finish_frame((now - self._frame_start) * 1000)
+        self._frame_start = now
+
+    def _finish_frame(self, frame_ms):
+        self.frames += 1
+        self._frame_times.append(frame_ms)
+        for i, bound in enumerate(HISTOGRAM_BUCKETS):
+            if frame_ms <= bound:
+                self.histogram[i] += 1
+                break
+
+        for name, elapsed in self._frame.items():
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(elapsed)
+            if elapsed > self._worst.get(name, 0.0):
+                self._worst[name] = elapsed
+
+        if frame_ms > self.worst_frame:
+            self.worst_frame = frame_ms
+            self.worst_frame_phases = dict(self._frame)
+        self._frame.clear()
+
+    def _stats(self, samples, worst):
+        ordered = sorted(samples)
+        return {
+            "p50": percentile(ordered, 0.50),
+            "p95": percentile(ordered, 0.95),
+            "p99": percentile(ordered, 0.99),
+            "worst": worst,
+            "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        }
+
+    def summary(self):
+        """Percentiles over the rolling window, plus all-time worst values."""
+        return {
+            "frames": self.frames,
+            "frame": self._stats(self._frame_times, self.worst_frame),
+            "phases": {name: self._stats(samples, self._worst[name])
+                       for name, samples in self._samples.items()},
+            "worst_frame_phases": self.worst_frame_phases,
+            "histogram": {("inf" if bound == float("inf") else str(bound)): count
+                          for bound, count in zip(HISTOGRAM_BUCKETS, self.histogram)},
+        }
+
+    def dump(self, path):
+        """Write summary() to path, as CSV if it ends in .csv, JSON otherwise."""
+        summary = self.summary()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["phase", "p50_ms", "p95_ms", "p99_ms", "worst_ms", "mean_ms"])
+                rows = [("frame", summary["frame"])] + sorted(summary["phases"].items())
+                for name, stats in rows:
+                    writer.writerow([name] + ["%.4f" % stats[k] for k in ("p50", "p95", "p99", "worst", "mean")])
+        else:
+            with open(path, "w") as f:
+                json.dump(summary, f, indent=2)
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullProfiler:
+    """Stand-in used when nobody is profiling; phases cost a no-op with-block."""
+
+    _phase = _NullPhase()
+
+    def phase(self, name):
+        return self._phase
+
+    def timed(self, function):
+        return function
+
+    def next_frame(self):
+        pass
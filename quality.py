@@ -0,0 +1,135 @@
+"""Render quality tiers and a governor that picks one to hold a frame budget.
+
+A QualityTier is a set of render knobs: how far ahead entities and scenery
+are drawn, how dense the temple scenery is, how early curved shapes drop to
+coarser tessellations, and whether the translucent flying-trail and shield
+effects are drawn.  QualityGovernor measures how long each frame takes to
+update and draw (not counting the buffer swap, which waits for vsync) and
+steps down a tier when the recent frames run over budget, and back up once
+they have had room to spare for a while.  It has no GL dependency; the
+frontend applies the tier.
+
+    governor = QualityGovernor(target_fps=60)
+    governor.begin_frame()
+    ...update and draw...
+    if governor.end_frame() is not None:
+        ...the tier changed; apply governor.tier, report governor.last_p90...
+"""
+import time
+
+from profiler import percentile
+
+
+class QualityTier:
+    """One step of the quality ladder."""
+
+    __slots__ = ('name', 'view_distance', 'span', 'scenery_spacing', 'detail', 'effects')
+
+    def __init__(self, name, view_distance, span, scenery_spacing, detail, effects):
+        self.name = name
+        self.view_distance = view_distance  # Entities within this of the player are drawn
+        self.span = span  # (behind, ahead) of the player that track and scenery are drawn
+        self.scenery_spacing = scenery_spacing  # Multiplies the gap between walls and pillars
+        self.detail = detail  # Multiplies the LevelOfDetail distance thresholds
+        self.effects = effects  # Flying trail and shield bubble
+
+
+# Best first; the first tier is the game as it has always been drawn
+TIERS = (
+    QualityTier("high", 600, (500, 1000), 1, 1.0, True),
+    QualityTier("medium", 500, (400, 800), 1, 0.6, True),
+    QualityTier("low", 400, (300, 600), 2, 0.35, False),
+    QualityTier("minimal", 300, (200, 450), 2, 0.2, False),
+)
+TIER_NAMES = tuple(tier.name for tier in TIERS)
+
+
+class QualityGovernor:
+    """Moves through tiers to keep frame work time within 1000 / target_fps ms.
+
+    Every window frames it looks at the 90th percentile of their work time:
+    over budget steps one tier down at once, under headroom * budget steps one
+    tier up, but only after patience such windows in a row, so a tier that
+    only just fits is not left and re-entered every second.  With
+    adaptive=False the tier stays where set_tier() puts it.
+    """
+
+    def __init__(self, target_fps=60, tiers=TIERS, window=60, headroom=0.6, patience=3,
+                 adaptive=True, timer=time.perf_counter):
+        self.tiers = tiers
+        self.window = window
+        self.headroom = headroom
+        self.patience = patience
+        self.adaptive = adaptive
+        self.timer = timer
+        self.set_target(target_fps)
+        self.index = 0
+        self.changes = 0  # Tier changes made by the governor
+        self.last_p90 = 0.0  # Work time of the last window evaluated, ms
+        self._samples = []
+        self._calm = 0  # Windows in a row with room to spare
+        self._start = None
+
+    @property
+    def tier(self):
+        return self.tiers[self.index]
+
+    def set_target(self, target_fps):
+        self.target_fps = target_fps
+        self.budget_ms = 1000 / target_fps
+
+    def set_tier(self, name):
+        """Jump to the named tier and start measuring afresh; returns it."""
+        for index, tier in enumerate(self.tiers):
+            if tier.name == name:
+                self.index = index
+                self._samples.clear()
+                self._calm = 0
+                return tier
+        raise ValueError(f"unknown quality tier {name!r}; expected one of "
+                         f"{tuple(tier.name for tier in self.tiers)}")
+
+    def begin_frame(self):
+        """Open a frame, unless one is already open: idle can run more than
+        once before a redisplay, and that work belongs to the next frame."""
+        if self._start is None:
+            self._start = self.timer()
+
+    def end_frame(self):
+        """Close the frame opened by begin_frame(); see record()."""
+        if self._start is None:
+            return None
+        frame_ms = (self.timer() - self._start) * 1000
+        self._start = None
+        return self.record(frame_ms)
+
+    def record(self, frame_ms):
+        """Count one frame's work time; returns the new tier if it changed, else None."""
+        if not self.adaptive:
+            return None
+        samples = self._samples
+        samples.append(frame_ms)
+        if len(samples) < self.window:
+            return None
+        p90 = percentile(sorted(samples), 0.9)
+        samples.clear()
+        self.last_p90 = p90
+
+        step = 0
+        if p90 > self.budget_ms:
+            self._calm = 0
+            if self.index < len(self.tiers) - 1:
+                step = 1
+        elif p90 < self.budget_ms * self.headroom and self.index > 0:
+            self._calm += 1
+            if self._calm >= self.patience:
+                self._calm = 0
+                step = -1
+        else:
+            self._calm = 0
+        if not step:
+            return None
+
+        self.index += step
+        self.changes += 1
+        return self.tier
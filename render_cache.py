@@ -0,0 +1,239 @@
+"""GL resource caches used by the GLUT frontend.
+
+Most of the world never changes once it has been drawn: the track surface,
+lane dashes, temple walls and pillars are the same every time the runner
+passes a given stretch, and every cube, sphere and coin is one of a handful
+of shapes.  Those are compiled once into display lists and replayed, instead
+of being re-issued (and re-tessellated) in immediate mode every frame.
+
+Curved shapes far from the camera are drawn from coarser tessellations
+picked by a LevelOfDetail, so distant spheres, cylinders and tori cost a
+fraction of the vertices; that matters most on software rasterizers.
+"""
+import bisect
+import math
+from collections import OrderedDict
+
+from OpenGL.GL import *
+from OpenGL.GLU import *
+
+
+class LevelOfDetail:
+    """Tessellation levels picked by distance from the camera.
+
+    Objects closer than thresholds[0] are drawn at level 0, the full detail
+    they ask for; beyond thresholds[i] at level i + 1.  Level i multiplies
+    slice, stack, side and ring counts by scales[i], down to min_segments.
+    setup_camera() moves the camera every frame.
+    """
+
+    def __init__(self, thresholds=(400, 800), scales=(1.0, 0.5, 0.25), min_segments=4):
+        if len(scales) != len(thresholds) + 1:
+            raise ValueError("need one more scale than thresholds")
+        self.thresholds = tuple(sorted(thresholds))
+        self.scales = scales
+        self.min_segments = min_segments
+        self.camera = (0.0, 0.0, 0.0)
+
+    def set_camera(self, x, y, z):
+        self.camera = (x, y, z)
+
+    def level(self, x, y, z):
+        cx, cy, cz = self.camera
+        distance = math.sqrt((x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2)
+        return bisect.bisect_right(self.thresholds, distance)
+
+    def segments(self, count, level):
+        """count slices (stacks, sides, rings) reduced for level; never more than count."""
+        return min(count, max(self.min_segments, round(count * self.scales[level])))
+
+    def reduce(self, position, *counts):
+        """Segment counts to use for a shape at position, one per count given."""
+        level = self.level(*position)
+        return tuple(self.segments(count, level) for count in counts)
+
+
+class ChunkCache:
+    """Static geometry split into fixed-length chunks along the track.
+
+    build(y_start, y_end) issues the immediate-mode calls for one chunk; it
+    runs once per chunk and is recorded into a display list.  GL cannot
+    compile two lists at once, so anything a chunk calls into (shared meshes)
+    must be created by prepare(), which runs just before compiling.  The
+    cache is an LRU: chunks the camera has left behind are the least recently
+    drawn, so they are the ones deleted once more than capacity lists are held.
+
+    With a LevelOfDetail, each chunk is compiled per level, picked from the
+    distance of its midpoint on the track centre line, and build and prepare
+    get the level as an extra argument.
+    """
+
+    def __init__(self, build, chunk_length=200, capacity=16, prepare=None, lod=None):
+        self.build = build
+        self.prepare = prepare
+        self.chunk_length = chunk_length
+        self.capacity = capacity
+        self.lod = lod
+        self._lists = OrderedDict()  # (chunk index, level) -> display list id
+        self.compiled = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._lists)
+
+    def draw(self, y_lo, y_hi):
+        """Draw every chunk overlapping y_lo..y_hi."""
+        first = math.floor(y_lo / self.chunk_length)
+        last = math.ceil(y_hi / self.chunk_length)
+        for index in range(first, last):
+            key = (index, self._level(index))
+            display_list = self._lists.get(key)
+            if display_list is None:
+                display_list = self._compile(*key)
+            else:
+                self._lists.move_to_end(key)
+            glCallList(display_list)
+
+        while len(self._lists) > self.capacity:
+            _, display_list = self._lists.popitem(last=False)
+            glDeleteLists(display_list, 1)
+            self.evicted += 1
+
+    def _level(self, index):
+        if self.lod is None:
+            return None
+        return self.lod.level(0, (index + 0.5) * self.chunk_length, 0)
+
+    def _compile(self, index, level):
+        detail = () if level is None else (level,)
+        if self.prepare is not None:
+            self.prepare(*detail)
+        display_list = glGenLists(1)
+        glNewList(display_list, GL_COMPILE)
+        self.build(index * self.chunk_length, (index + 1) * self.chunk_length, *detail)
+        glEndList()
+        self._lists[index, level] = display_list
+        self.compiled += 1
+        return display_list
+
+    def release(self):
+        """Delete every cached display list (needs the GL context)."""
+        for display_list in self._lists.values():
+            glDeleteLists(display_list, 1)
+        self._lists.clear()
+
+
+class MeshCache:
+    """Shared quadric and display lists for the primitive shapes.
+
+    Each shape is tessellated and compiled the first time it is asked for
+    with a given size and detail; later calls return the same display list
+    id, to be drawn with glCallList.  Nothing is allocated per frame, and
+    release() frees everything on shutdown.
+
+    Curved shapes take an optional at=(x, y, z), the world position they are
+    drawn at; the segment counts are then reduced by lod for that distance.
+    A cube is 24 vertices at any distance, so cube() has no level of detail.
+    """
+
+    def __init__(self, lod=None):
+        self.lod = lod if lod is not None else LevelOfDetail()
+        self._quadric = None
+        self._lists = {}  # (shape, *params) -> display list id
+        self.quadrics_created = 0
+
+    def quadric(self):
+        """The one GLU quadric used for every sphere and cylinder."""
+        if self._quadric is None:
+            self._quadric = gluNewQuadric()
+            self.quadrics_created += 1
+        return self._quadric
+
+    def _get(self, key, build, *args):
+        display_list = self._lists.get(key)
+        if display_list is None:
+            display_list = glGenLists(1)
+            glNewList(display_list, GL_COMPILE)
+            build(*args)
+            glEndList()
+            self._lists[key] = display_list
+        return display_list
+
+    def cube(self, size):
+        """Solid cube of the given edge length, like glutSolidCube."""
+        return self._get(('cube', size), _build_cube, size)
+
+    def sphere(self, radius, slices, stacks, at=None):
+        if at is not None:
+            slices, stacks = self.lod.reduce(at, slices, stacks)
+        return self._get(('sphere', radius, slices, stacks), gluSphere,
+                         self.quadric(), radius, slices, stacks)
+
+    def cylinder(self, base, top, height, slices, stacks, at=None):
+        if at is not None:
+            slices, stacks = self.lod.reduce(at, slices, stacks)
+        return self._get(('cylinder', base, top, height, slices, stacks), gluCylinder,
+                         self.quadric(), base, top, height, slices, stacks)
+
+    def torus(self, inner_radius, outer_radius, sides, rings, at=None):
+        """Solid torus with the same arguments as glutSolidTorus."""
+        if at is not None:
+            sides, rings = self.lod.reduce(at, sides, rings)
+        return self._get(('torus', inner_radius, outer_radius, sides, rings), _build_torus,
+                         inner_radius, outer_radius, sides, rings)
+
+    def counts(self):
+        """Live GL/GLU objects owned by the cache."""
+        return {
+            "quadrics": 0 if self._quadric is None else 1,
+            "display_lists": len(self._lists),
+        }
+
+    def release(self):
+        """Delete every display list and the quadric (needs the GL context)."""
+        for display_list in self._lists.values():
+            glDeleteLists(display_list, 1)
+        self._lists.clear()
+        if self._quadric is not None:
+            gluDeleteQuadric(self._quadric)
+            self._quadric = None
+
+
+# Face normals and corner signs for a cube centred on the origin
+_CUBE_FACES = (
+    ((1, 0, 0), ((1, -1, -1), (1, 1, -1), (1, 1, 1), (1, -1, 1))),
+    ((-1, 0, 0), ((-1, -1, 1), (-1, 1, 1), (-1, 1, -1), (-1, -1, -1))),
+    ((0, 1, 0), ((1, 1, 1), (1, 1, -1), (-1, 1, -1), (-1, 1, 1))),
+    ((0, -1, 0), ((-1, -1, 1), (-1, -1, -1), (1, -1, -1), (1, -1, 1))),
+    ((0, 0, 1), ((1, 1, 1), (-1, 1, 1), (-1, -1, 1), (1, -1, 1))),
+    ((0, 0, -1), ((1, -1, -1), (-1, -1, -1), (-1, 1, -1), (1, 1, -1))),
+)
+
+
+def _build_cube(size):
+    half = size / 2
+    glBegin(GL_QUADS)
+    for normal, corners in _CUBE_FACES:
+        glNormal3f(*normal)
+        for sx, sy, sz in corners:
+            glVertex3f(sx * half, sy * half, sz * half)
+    glEnd()
+
+
+def _build_torus(inner_radius, outer_radius, sides, rings):
+    # inner_radius is the tube radius, outer_radius the distance from the
+    # centre of the torus to the centre of the tube (GLUT's convention)
+    for ring in range(rings):
+        glBegin(GL_QUAD_STRIP)
+        for side in range(sides + 1):
+            theta = 2 * math.pi * side / sides
+            for r in (ring + 1, ring):
+                phi = 2 * math.pi * r / rings
+                ring_radius = outer_radius + inner_radius * math.cos(theta)
+                glNormal3f(math.cos(phi) * math.cos(theta),
+                           math.sin(phi) * math.cos(theta),
+                           math.sin(theta))
+                glVertex3f(math.cos(phi) * ring_radius,
+                           math.sin(phi) * ring_radius,
+                           inner_radius * math.sin(theta))
+        glEnd()
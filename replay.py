@@ -0,0 +1,130 @@
+"""Input recording and exact playback.
+
+A Simulation is fully determined by its seed and by the Actions passed to
+each step() call, so that is all a replay stores: a small header with the
+seed and the number of ticks, then one (tick, action) record per input.
+Playing the file back into a fresh Simulation with the same seed reproduces
+the session tick for tick, which makes a heavy or buggy run repeatable.
+
+    python replay.py run.replay [--profile timings.json]
+
+plays a recording headless as fast as possible and prints where it ended.
+"""
+import argparse
+import struct
+import time
+
+from profiler import FrameProfiler
+from simulation import Simulation
+
+
+MAGIC = b"TRRP"
+VERSION = 2  # 2: track laid out in segments (track_gen.py)
+_HEADER = struct.Struct("<4sHQI")  # magic, version, seed, ticks
+_RECORD = struct.Struct("<IB")     # tick, action
+SEED_LIMIT = 2 ** 64  # Seeds are stored unsigned in 64 bits
+
+
+class Replay:
+    """The seed of a session and every input it received, in tick order."""
+
+    def __init__(self, seed, inputs=None, ticks=0):
+        self.seed = seed
+        self.inputs = inputs if inputs is not None else []  # (tick, action) pairs
+        self.ticks = ticks  # Number of step() calls the session ran
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, self.seed, self.ticks))
+            for tick, action in self.inputs:
+                f.write(_RECORD.pack(tick, action))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f"{path}: too short to be a replay")
+        magic, version, seed, ticks = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a replay file")
+        if version != VERSION:
+            raise ValueError(f"{path}: replay version {version}, expected {VERSION}")
+        body = data[_HEADER.size:]
+        if len(body) % _RECORD.size:
+            raise ValueError(f"{path}: truncated input record")
+        return cls(seed, list(_RECORD.iter_unpack(body)), ticks)
+
+
+class Recorder:
+    """Collects a Simulation's inputs; install with sim.recorder = Recorder(sim.seed)."""
+
+    def __init__(self, seed):
+        if not 0 <= seed < SEED_LIMIT:
+            # Refuse now rather than lose the recording when it is saved on exit
+            raise ValueError(f"seed {seed} cannot be recorded; replays hold seeds 0 to 2**64 - 1")
+        self.replay = Replay(seed)
+
+    def record(self, tick, inputs):
+        for action in inputs:
+            self.replay.inputs.append((tick, action))
+        self.replay.ticks = tick + 1
+
+    def save(self, path):
+        self.replay.save(path)
+
+
+class ReplayPlayer:
+    """Hands back the recorded inputs tick by tick."""
+
+    def __init__(self, replay):
+        self.replay = replay
+        self._next = 0  # Index of the first input not yet handed out
+
+    @property
+    def finished(self):
+        return self._next >= len(self.replay.inputs)
+
+    def inputs(self, tick):
+        """The Actions recorded for tick; ticks must be asked for in order."""
+        inputs = self.replay.inputs
+        actions = []
+        while self._next < len(inputs) and inputs[self._next][0] <= tick:
+            actions.append(inputs[self._next][1])
+            self._next += 1
+        return actions
+
+
+def play(replay, profiler=None):
+    """Run replay in a new Simulation and return it once the last tick is done."""
+    sim = Simulation(seed=replay.seed, profiler=profiler)
+    player = ReplayPlayer(replay)
+    for tick in range(replay.ticks):
+        sim.profiler.next_frame()  # One profiler frame per tick
+        sim.step(player.inputs(tick))
+    return sim
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a Temple Run 3D replay headless")
+    parser.add_argument("path", help="replay file written with escape_runner.py --record")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write per-tick phase timings to PATH (.json or .csv)")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.path)
+    profiler = FrameProfiler() if args.profile else None
+    start = time.perf_counter()
+    sim = play(replay, profiler)
+    elapsed = time.perf_counter() - start
+
+    print(f"seed {replay.seed}: {replay.ticks} ticks, {len(replay.inputs)} inputs "
+          f"in {elapsed:.2f}s ({replay.ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    print(f"distance {sim.distance:.1f}  score {int(sim.score)}  "
+          f"coins {sim.coins_collected}  lives {sim.player_lives}")
+    if profiler is not None:
+        profiler.dump(args.profile)
+
+
+if __name__ == "__main__":
+    main()
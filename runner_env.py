@@ -0,0 +1,182 @@
+"""Reinforcement-learning environment over the headless game rules.
+
+RunnerEnv follows the Gymnasium Env API without depending on it:
+reset(seed) returns (observation, info) and step(action) returns
+(observation, reward, terminated, truncated, info).  One step is one
+Simulation tick; the reward is the score gained on that tick (distance,
+coins, power-ups and clean dodges).  Nothing here imports OpenGL.
+
+    env = RunnerEnv(max_steps=10000)
+    observation, info = env.reset(seed=1)
+    while True:
+        observation, reward, terminated, truncated, info = env.step(policy(observation))
+        if terminated or truncated:
+            break
+
+Actions are indices into ACTIONS: nothing, left, right, jump, slide.  The
+observation is a float32 array of OBSERVATION_SIZE values, all roughly in
+-1..1 (see observe()):
+
+    per lane, the next OBSTACLES_PER_LANE obstacles ahead: distance, low, high, gap
+    per lane, coins in the next COIN_RANGE: count / 3, distance to the nearest
+    power-up ticks left, by PowerUpType, as a fraction of their duration
+    player x, z, jumping, sliding
+    guardian pursuing, its distance behind the player, its x
+    speed, lives
+
+The environment plays with Simulation(cosmetics=False), which skips the
+coin and power-up spin that only drawing needs.  observe() fills one
+preallocated buffer and hands back a copy.  For far more steps per second
+over many sessions at once, see batch_sim.BatchSimulation.
+
+    python runner_env.py --steps 100000      # steps/sec under a random policy
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from simulation import POWER_UPS, Action, GameState, Simulation
+
+
+ACTIONS = (None, Action.LEFT, Action.RIGHT, Action.JUMP, Action.SLIDE)
+LANES = (-1, 0, 1)
+OBSTACLES_PER_LANE = 2
+OBSTACLE_RANGE = 1200  # Obstacles spawn this far ahead
+COIN_RANGE = 300
+GUARDIAN_RANGE = 300
+OBSTACLE_TYPES = ('low', 'high', 'gap')
+POWER_UP_TICKS = tuple(POWER_UPS[kind].duration for kind in sorted(POWER_UPS))  # By PowerUpType
+
+OBSERVATION_SIZE = len(LANES) * (OBSTACLES_PER_LANE * 4 + 2) + len(POWER_UP_TICKS) + 4 + 3 + 2
+_NO_OBSTACLE = (1, 0, 0, 0)  # An empty obstacle slot: as far off as can be seen
+
+
+class RunnerEnv:
+    """One game session driven an action per tick."""
+
+    def __init__(self, difficulty=None, max_steps=None):
+        self.difficulty = difficulty
+        self.max_steps = max_steps  # Truncate runs that last this many steps
+        self.action_count = len(ACTIONS)
+        self.observation_size = OBSERVATION_SIZE
+        self.sim = None
+        self.steps = 0
+        self._observation = np.zeros(OBSERVATION_SIZE, dtype=np.float32)  # Refilled by observe()
+
+    def reset(self, seed=None, options=None):
+        """Start a new run.  A seed starts a new session; without one the next
+        run of the current session is played, which is also deterministic."""
+        if self.sim is None or seed is not None:
+            self.sim = Simulation(seed=seed, difficulty=self.difficulty, cosmetics=False)
+        self.sim.reset()
+        self.steps = 0
+        return self.observe(), self.info()
+
+    def step(self, action):
+        sim = self.sim
+        if sim.game_state != GameState.PLAYING:
+            raise RuntimeError("step() after the run ended; call reset()")
+        score = sim.score
+        command = ACTIONS[action]
+        sim.step(() if command is None else (command,))
+        self.steps += 1
+
+        terminated = sim.game_state == GameState.GAME_OVER
+        truncated = not terminated and self.max_steps is not None and self.steps >= self.max_steps
+        return self.observe(), sim.score - score, terminated, truncated, self.info()
+
+    def info(self):
+        sim = self.sim
+        return {
+            "distance": sim.distance,
+            "score": sim.score,
+            "coins": sim.coins_collected,
+            "lives": sim.player_lives,
+            "reason": sim.game_over_reason,
+        }
+
+    def observe(self):
+        """Encode the session's current state as a new observation array."""
+        sim = self.sim
+        player = sim.player
+        distance = sim.distance
+        values = []
+
+        # The next obstacles ahead in each lane, nearest first
+        obstacles = sim.obstacles
+        for lane in LANES:
+            seen = 0
+            for obstacle in obstacles.in_lane(lane, distance - 50, distance + OBSTACLE_RANGE):
+                if obstacle.active:
+                    kind = obstacle.type
+                    values += ((obstacle.y - distance) / OBSTACLE_RANGE,
+                               kind == 'low', kind == 'high', kind == 'gap')
+                    seen += 1
+                    if seen == OBSTACLES_PER_LANE:
+                        break
+            values += _NO_OBSTACLE * (OBSTACLES_PER_LANE - seen)
+
+        # Coins ahead in each lane.  Only the coins between the retire cutoff
+        # and the spawn horizon are live, a dozen at most, and a NumPy mask
+        # over so few costs more in per-call overhead than this loop
+        coins = sim.coins
+        live = slice(coins.head, coins.tail)
+        counts = [0] * len(LANES)
+        nearest = [COIN_RANGE] * len(LANES)
+        for x, y, collected in zip(coins.x[live].tolist(), coins.y[live].tolist(),
+                                   coins.collected[live].tolist()):
+            dy = y - distance
+            if -40 < dy < COIN_RANGE and not collected:
+                lane = round(x / 100) - LANES[0]
+                if 0 <= lane < len(LANES):
+                    counts[lane] += 1
+                    if dy < nearest[lane]:
+                        nearest[lane] = dy
+        for count, dy in zip(counts, nearest):
+            values += (count / 3, dy / COIN_RANGE)
+
+        # Power-ups not running stay 0
+        timers = [0] * len(POWER_UP_TICKS)
+        effects = player.effects
+        for kind, deadline in effects.active.items():
+            timers[kind] = (deadline - effects.now) / POWER_UP_TICKS[kind]
+        values += timers
+
+        values += (player.x / 100, (player.z - 20) / 200, player.jumping, player.sliding)
+        enemy = sim.chasing_enemy
+        if enemy.pursuit_mode:
+            values += (1, min(distance - enemy.y, GUARDIAN_RANGE) / GUARDIAN_RANGE, enemy.x / 100)
+        else:
+            values += (0, 0, 0)
+        values += (sim.speed / sim.difficulty.max_speed, sim.player_lives / 5)
+
+        observation = self._observation
+        observation[:] = values
+        return observation.copy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure RunnerEnv steps/sec under a random policy")
+    parser.add_argument("--steps", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    env = RunnerEnv()
+    rng = random.Random(args.seed)
+    env.reset(seed=args.seed)
+    runs = 1
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        action = rng.randrange(len(ACTIONS)) if rng.random() < 0.1 else 0
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+            runs += 1
+    elapsed = time.perf_counter() - start
+    print(f"{args.steps} steps in {elapsed:.2f}s: {args.steps / elapsed:,.0f} steps/s over {runs} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,555 @@
+"""GL 3.3 shader and vertex-buffer backend for the 3D world.
+
+The fixed-function path issues a push/translate/rotate/colour/call/pop run
+of PyOpenGL calls for every part of every object.  ShaderRenderer instead
+keeps every mesh (cube, quad, lane dashes, and each tessellation level of
+the spheres, cylinders and the torus) in one vertex buffer uploaded at
+start-up, and draws the world as instanced batches: each frame the 3x4
+model matrix and colour of every instance are packed into one buffer read
+by the vertex shader through a buffer texture, so a frame is one buffer
+upload, the view-projection uniform, and a uniform plus an instanced draw
+per mesh, some forty GL calls in all instead of several hundred.
+
+The shaders are GLSL 330 core, which Mesa's llvmpipe provides in software,
+but the context stays a compatibility one: the HUD is still drawn by
+hud_text.py with bitmaps and display lists on top of the world.
+
+    python escape_runner.py --renderer shader
+    python bench_render.py --renderer shader
+"""
+import ctypes
+import math
+
+import numpy as np
+from OpenGL.GL import *
+
+from coin_batch import cylinder_triangles
+from profiler import NullProfiler
+from quality import TIERS
+from simulation import PowerUpType
+
+
+VERTEX_SHADER = """
+#version 330 core
+layout(location = 0) in vec3 position;
+uniform mat4 view_projection;
+uniform samplerBuffer instances;  // Per instance: three matrix rows, then the colour
+uniform int first_instance;
+out vec4 colour;
+
+void main()
+{
+    int texel = (first_instance + gl_InstanceID) * 4;
+    vec4 local = vec4(position, 1.0);
+    vec3 world = vec3(dot(texelFetch(instances, texel), local),
+                      dot(texelFetch(instances, texel + 1), local),
+                      dot(texelFetch(instances, texel + 2), local));
+    colour = texelFetch(instances, texel + 3);
+    gl_Position = view_projection * vec4(world, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330 core
+in vec4 colour;
+out vec4 fragment;
+
+void main()
+{
+    fragment = colour;
+}
+"""
+
+FLOATS_PER_INSTANCE = 16
+CHUNK_LENGTH = 200  # Track and scenery repeat every chunk, as in the fixed path
+
+# Tessellations the world asks for, before level of detail
+SPHERES = ((12, 12), (16, 16), (6, 6), (8, 8))
+TORUS = (5, 15, 8, 16)  # inner radius, outer radius, sides, rings
+COIN = (15, 5, 8, 2)    # radius, height, slices, stacks
+PILLAR = (8, 8)         # slices, stacks of the unit cylinder
+
+
+class Transform:
+    """A 3x4 row-major affine matrix composed the way the GL matrix stack is:
+    each call multiplies on the right, so later calls act first on the mesh."""
+
+    __slots__ = ('m',)
+
+    def __init__(self, m=(1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0)):
+        self.m = list(m)
+
+    def copy(self):
+        return Transform(self.m)
+
+    def translate(self, x, y, z):
+        m = self.m
+        for r in (0, 4, 8):
+            m[r + 3] += m[r] * x + m[r + 1] * y + m[r + 2] * z
+        return self
+
+    def scale(self, x, y, z):
+        m = self.m
+        for r in (0, 4, 8):
+            m[r] *= x
+            m[r + 1] *= y
+            m[r + 2] *= z
+        return self
+
+    def rotate(self, angle, x, y, z):
+        """Rotate angle degrees about the axis (x, y, z), like glRotatef."""
+        length = math.sqrt(x * x + y * y + z * z)
+        x, y, z = x / length, y / length, z / length
+        c = math.cos(math.radians(angle))
+        s = math.sin(math.radians(angle))
+        t = 1 - c
+        r00, r01, r02 = x * x * t + c, x * y * t - z * s, x * z * t + y * s
+        r10, r11, r12 = y * x * t + z * s, y * y * t + c, y * z * t - x * s
+        r20, r21, r22 = x * z * t - y * s, y * z * t + x * s, z * z * t + c
+        m = self.m
+        for r in (0, 4, 8):
+            a, b, d = m[r], m[r + 1], m[r + 2]
+            m[r] = a * r00 + b * r10 + d * r20
+            m[r + 1] = a * r01 + b * r11 + d * r21
+            m[r + 2] = a * r02 + b * r12 + d * r22
+        return self
+
+
+def cube_triangles():
+    """Unit cube centred on the origin, as a triangle list."""
+    vertices = []
+    for axis in range(3):
+        for sign in (-0.5, 0.5):
+            corners = []
+            for u, v in ((-0.5, -0.5), (0.5, -0.5), (0.5, 0.5), (-0.5, 0.5)):
+                corner = [0.0, 0.0, 0.0]
+                corner[axis] = sign
+                corner[(axis + 1) % 3] = u
+                corner[(axis + 2) % 3] = v
+                corners.append(corner)
+            vertices += [corners[0], corners[1], corners[2], corners[0], corners[2], corners[3]]
+    return np.array(vertices, dtype=np.float32)
+
+
+def quad_triangles():
+    """Unit square in the xy plane centred on the origin."""
+    return np.array([(-0.5, -0.5, 0), (0.5, -0.5, 0), (0.5, 0.5, 0),
+                     (-0.5, -0.5, 0), (0.5, 0.5, 0), (-0.5, 0.5, 0)], dtype=np.float32)
+
+
+def dash_lines():
+    """The lane dividers of one chunk of track, as GL_LINES."""
+    vertices = []
+    for i in range(0, CHUNK_LENGTH, 20):
+        vertices += [(-50, i, 1), (-50, i + 10, 1), (50, i, 1), (50, i + 10, 1)]
+    return np.array(vertices, dtype=np.float32)
+
+
+def sphere_triangles(slices, stacks):
+    """Unit sphere about the z axis, tessellated like gluSphere."""
+    def point(stack, slice_):
+        rho = math.pi * stack / stacks
+        theta = 2 * math.pi * slice_ / slices
+        return (-math.sin(theta) * math.sin(rho), math.cos(theta) * math.sin(rho), math.cos(rho))
+    vertices = []
+    for stack in range(stacks):
+        for i in range(slices):
+            a, b = point(stack, i), point(stack, i + 1)
+            c, d = point(stack + 1, i + 1), point(stack + 1, i)
+            vertices += [a, b, c, a, c, d]
+    return np.array(vertices, dtype=np.float32)
+
+
+def torus_triangles(inner_radius, outer_radius, sides, rings):
+    """Solid torus with glutSolidTorus's arguments, as a triangle list."""
+    def point(ring, side):
+        theta = 2 * math.pi * side / sides
+        phi = 2 * math.pi * ring / rings
+        ring_radius = outer_radius + inner_radius * math.cos(theta)
+        return (math.cos(phi) * ring_radius, math.sin(phi) * ring_radius, inner_radius * math.sin(theta))
+    vertices = []
+    for ring in range(rings):
+        for side in range(sides):
+            a, b = point(ring, side), point(ring + 1, side)
+            c, d = point(ring + 1, side + 1), point(ring, side + 1)
+            vertices += [a, b, c, a, c, d]
+    return np.array(vertices, dtype=np.float32)
+
+
+def perspective(fovy, aspect, near, far):
+    """The matrix gluPerspective multiplies by."""
+    f = 1 / math.tan(math.radians(fovy) / 2)
+    return np.array([[f / aspect, 0, 0, 0],
+                     [0, f, 0, 0],
+                     [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)],
+                     [0, 0, -1, 0]])
+
+
+def look_at(eye, target, up=(0, 0, 1)):
+    """The matrix gluLookAt multiplies by."""
+    eye = np.asarray(eye, dtype=float)
+    forward = np.asarray(target, dtype=float) - eye
+    forward /= np.linalg.norm(forward)
+    side = np.cross(forward, up)
+    side /= np.linalg.norm(side)
+    upward = np.cross(side, forward)
+    view = np.identity(4)
+    view[0, :3], view[1, :3], view[2, :3] = side, upward, -forward
+    view[:3, 3] = -view[:3, :3] @ eye
+    return view
+
+
+def _compile(kind, source):
+    shader = glCreateShader(kind)
+    glShaderSource(shader, source)
+    glCompileShader(shader)
+    if not glGetShaderiv(shader, GL_COMPILE_STATUS):
+        raise RuntimeError("shader compile failed: " + glGetShaderInfoLog(shader).decode())
+    return shader
+
+
+class ShaderRenderer:
+    """Draws the world with instanced batches; needs a current GL 3.3 context.
+
+    lod is the LevelOfDetail the fixed path uses, so both backends pick the
+    same tessellations; profiler gets "instances" and "submit" phases.
+    """
+
+    def __init__(self, lod, profiler=None):
+        self.lod = lod
+        self.profiler = profiler if profiler is not None else NullProfiler()
+
+        vertex = _compile(GL_VERTEX_SHADER, VERTEX_SHADER)
+        fragment = _compile(GL_FRAGMENT_SHADER, FRAGMENT_SHADER)
+        self.program = glCreateProgram()
+        glAttachShader(self.program, vertex)
+        glAttachShader(self.program, fragment)
+        glLinkProgram(self.program)
+        glDeleteShader(vertex)
+        glDeleteShader(fragment)
+        if not glGetProgramiv(self.program, GL_LINK_STATUS):
+            raise RuntimeError("shader link failed: " + glGetProgramInfoLog(self.program).decode())
+        self._view_projection = glGetUniformLocation(self.program, "view_projection")
+        self._first_instance = glGetUniformLocation(self.program, "first_instance")
+        glUseProgram(self.program)
+        glUniform1i(glGetUniformLocation(self.program, "instances"), 0)
+        glUseProgram(0)
+
+        # Every mesh in one static buffer: key -> (mode, first vertex, vertex count)
+        self.meshes = {}
+        parts = []
+        first = 0
+
+        def add(key, vertices, mode=GL_TRIANGLES):
+            nonlocal first
+            if key not in self.meshes:
+                self.meshes[key] = (mode, first, len(vertices))
+                parts.append(vertices)
+                first += len(vertices)
+
+        add('cube', cube_triangles())
+        add('quad', quad_triangles())
+        add('dashes', dash_lines(), GL_LINES)
+        for level in range(len(lod.scales)):
+            for slices, stacks in SPHERES:
+                detail = (lod.segments(slices, level), lod.segments(stacks, level))
+                add(('sphere',) + detail, sphere_triangles(*detail))
+            sides, rings = lod.segments(TORUS[2], level), lod.segments(TORUS[3], level)
+            add(('torus', sides, rings), torus_triangles(TORUS[0], TORUS[1], sides, rings))
+            slices, stacks = lod.segments(COIN[2], level), lod.segments(COIN[3], level)
+            add(('coin', slices, stacks), cylinder_triangles(COIN[0], COIN[1], slices, stacks))
+            segments = lod.segments(PILLAR[0], level)
+            add(('cylinder', segments, segments), cylinder_triangles(1, 1, segments, segments))
+        vertices = np.concatenate(parts)
+
+        self.vertex_array = glGenVertexArrays(1)
+        glBindVertexArray(self.vertex_array)
+        self.vertex_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        # Per-frame instance data, read through a buffer texture
+        self.instance_buffer = glGenBuffers(1)
+        glBindBuffer(GL_TEXTURE_BUFFER, self.instance_buffer)
+        glBufferData(GL_TEXTURE_BUFFER, 4 * FLOATS_PER_INSTANCE, None, GL_STREAM_DRAW)
+        self.instance_texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_BUFFER, self.instance_texture)
+        glTexBuffer(GL_TEXTURE_BUFFER, GL_RGBA32F, self.instance_buffer)
+        glBindTexture(GL_TEXTURE_BUFFER, 0)
+        glBindBuffer(GL_TEXTURE_BUFFER, 0)
+
+        self._batches = {}  # (translucent, mesh key) -> flat list or array blocks
+        self.instances = 0  # Instances drawn in the last frame
+
+    # Instance collection
+
+    def _add(self, key, transform, colour, translucent=False):
+        batch = self._batches.get((translucent, key))
+        if batch is None:
+            batch = self._batches[translucent, key] = [[]]
+        batch[0] += transform.m
+        batch[0] += colour if len(colour) == 4 else (*colour, 1.0)
+
+    def _cube(self, transform, size, colour, translucent=False):
+        self._add('cube', transform.copy().scale(size, size, size), colour, translucent)
+
+    def _sphere(self, transform, radius, slices, stacks, at, colour, translucent=False):
+        slices, stacks = self.lod.reduce(at, slices, stacks)
+        self._add(('sphere', slices, stacks), transform.copy().scale(radius, radius, radius),
+                  colour, translucent)
+
+    def _quad(self, transform, colour):
+        self._add('quad', transform, colour)
+
+    def draw(self, sim, view, eye, target, paused=False, tier=TIERS[0]):
+        """Draw the world as seen from eye looking at target (the fixed path's
+        setup_camera() pose); paused leaves out the guardian like the fixed path.
+        tier is the QualityTier to draw at."""
+        self.lod.set_camera(*eye)
+        profiler = self.profiler
+        reach = tier.view_distance
+        with profiler.phase("instances"):
+            self._batches.clear()
+            self._collect_track(view, tier)
+            self._collect_obstacles(sim, view, reach)
+            self._collect_coins(sim, view, reach)
+            self._collect_power_ups(sim, view, reach)
+            if not paused:
+                self._collect_chasing_enemy(sim, view, reach)
+            self._collect_player(sim, view, tier.effects)
+            batches, data = self._pack()
+        with profiler.phase("submit"):
+            self._submit(batches, data, perspective(70, 1.25, 1, 2000) @ look_at(eye, target))
+
+    def _pack(self):
+        """Lay the batches out in one array, opaque ones first; returns
+        [(mode, first vertex, vertex count, first instance, instances, translucent)]."""
+        blocks = []
+        batches = []
+        first_instance = 0
+        for translucent, key in sorted(self._batches, key=lambda batch: batch[0]):
+            rows = self._batches[translucent, key]
+            listed = np.array(rows[0], dtype=np.float32).reshape(-1, FLOATS_PER_INSTANCE)
+            block = np.concatenate([listed] + rows[1:]) if len(rows) > 1 else listed
+            if not len(block):
+                continue
+            blocks.append(block)
+            mode, first, count = self.meshes[key]
+            batches.append((mode, first, count, first_instance, len(block), translucent))
+            first_instance += len(block)
+        self.instances = first_instance
+        if not blocks:
+            return batches, None
+        return batches, np.concatenate(blocks)
+
+    def _submit(self, batches, data, view_projection):
+        if data is None:
+            return
+        glUseProgram(self.program)
+        glBindVertexArray(self.vertex_array)
+        glUniformMatrix4fv(self._view_projection, 1, GL_TRUE, view_projection.astype(np.float32))
+        glBindBuffer(GL_TEXTURE_BUFFER, self.instance_buffer)
+        glBufferData(GL_TEXTURE_BUFFER, data.nbytes, data, GL_STREAM_DRAW)
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_BUFFER, self.instance_texture)
+
+        blending = False
+        for mode, first, count, first_instance, instances, translucent in batches:
+            if translucent and not blending:
+                glEnable(GL_BLEND)
+                glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+                blending = True
+            glUniform1i(self._first_instance, first_instance)
+            glDrawArraysInstanced(mode, first, count, instances)
+        if blending:
+            glDisable(GL_BLEND)
+
+        glBindTexture(GL_TEXTURE_BUFFER, 0)
+        glBindBuffer(GL_TEXTURE_BUFFER, 0)
+        glBindVertexArray(0)
+        glUseProgram(0)
+
+    # The world, object by object, as the fixed-function draw functions build it
+
+    def _collect_track(self, view, tier):
+        distance = view.distance
+        behind, ahead = tier.span
+        spacing = tier.scenery_spacing
+        first = math.floor((distance - behind) / CHUNK_LENGTH)
+        last = math.ceil((distance + ahead) / CHUNK_LENGTH)
+        for index in range(first, last):
+            y = index * CHUNK_LENGTH
+            self._quad(Transform().translate(0, y + CHUNK_LENGTH / 2, 0).scale(300, CHUNK_LENGTH, 1),
+                       (0.6, 0.4, 0.2))
+            self._add('dashes', Transform().translate(0, y, 0), (0.8, 0.8, 0.8))
+
+            # Temple walls every chunk, pillars every other one (at full density)
+            if index % spacing == 0:
+                for side in (-300, 300):
+                    self._add('cube', Transform().translate(side, y, 50).scale(50, 200, 100), (0.4, 0.3, 0.2))
+            if y % (400 * spacing) == 0:
+                segments = self.lod.segments(PILLAR[0], self.lod.level(0, y + CHUNK_LENGTH / 2, 0))
+                for side in (-200, 200):
+                    self._add(('cylinder', segments, segments),
+                              Transform().translate(side, y, 80).scale(20, 20, 160), (0.5, 0.4, 0.3))
+
+    def _collect_obstacles(self, sim, view, reach):
+        distance = view.distance
+        cube = self._cube
+        for obstacle in sim.obstacles.query(distance - reach, distance + reach):
+            if not obstacle.active:
+                continue
+            base = Transform().translate(obstacle.x, obstacle.y, 0)
+            if obstacle.type == 'low':
+                colour = (0.5, 0.3, 0.1)
+                cube(base.copy().translate(0, 0, 70).scale(2, 0.4, 1.2), 60, colour)
+                cube(base.copy().translate(-60, 0, 50).scale(0.4, 0.4, 2.5), 60, colour)
+                cube(base.copy().translate(60, 0, 50).scale(0.4, 0.4, 2.5), 60, colour)
+                self._quad(base.copy().scale(100, 40, 1), (0.1, 0.1, 0.1))
+            elif obstacle.type == 'high':
+                cube(base.translate(0, 0, 50).scale(1.5, 0.4, 1.8), 50, (0.7, 0.2, 0.1))
+            elif obstacle.type == 'gap':
+                self._quad(base.copy().translate(0, 0, -20).scale(160, 100, 1), (0.0, 0.0, 0.0))
+                wall = (0.2, 0.1, 0.0)
+                for y in (-50, 50):
+                    self._quad(base.copy().translate(0, y, -10).rotate(90, 1, 0, 0).scale(160, 20, 1), wall)
+                for x in (-80, 80):
+                    self._quad(base.copy().translate(x, 0, -10).rotate(90, 0, 1, 0).scale(20, 100, 1), wall)
+                for i in range(-60, 80, 20):
+                    for y in (-55, 55):
+                        cube(base.copy().translate(i, y, 5).rotate(45, 0, 0, 1), 8, (1.0, 0.0, 0.0))
+
+    def _collect_coins(self, sim, view, reach):
+        coins = sim.coins
+        visible = coins.visible(view.distance, reach)
+        if not len(visible):
+            return
+        colour = (1, 1, 0.5) if sim.player.coin_multiplier_timer > 0 else (1, 1, 0)
+        x, y, z = coins.x[visible], coins.y[visible], coins.z[visible]
+        angle = np.radians(coins.rotation[visible])
+        cos, sin = np.cos(angle), np.sin(angle)
+        rows = np.zeros((len(visible), FLOATS_PER_INSTANCE), dtype=np.float32)
+        rows[:, 0], rows[:, 1], rows[:, 3] = cos, -sin, x
+        rows[:, 4], rows[:, 5], rows[:, 7] = sin, cos, y
+        rows[:, 10], rows[:, 11] = 1, z
+        rows[:, 12:15] = colour
+        rows[:, 15] = 1
+
+        lod = self.lod
+        cx, cy, cz = lod.camera
+        levels = np.searchsorted(lod.thresholds, np.sqrt((x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2),
+                                 side='right')
+        for level in np.unique(levels):
+            key = (False, ('coin', lod.segments(COIN[2], level), lod.segments(COIN[3], level)))
+            self._batches.setdefault(key, [[]]).append(rows[levels == level])
+
+    def _collect_power_ups(self, sim, view, reach):
+        distance = view.distance
+        cube = self._cube
+        for power_up in sim.power_ups.query(distance - reach, distance + reach):
+            if power_up.collected:
+                continue
+            here = (power_up.x, power_up.y, power_up.z + power_up.float_offset)
+            base = Transform().translate(*here).rotate(power_up.rotation, 0, 1, 0)
+            kind = power_up.type
+            if kind == PowerUpType.MAGNET:
+                sides, rings = self.lod.reduce(here, TORUS[2], TORUS[3])
+                self._add(('torus', sides, rings), base, (1.0, 0.0, 1.0))
+            elif kind == PowerUpType.SHIELD:
+                cube(base.copy().rotate(45, 1, 1, 0), 20, (0.0, 1.0, 1.0))
+            elif kind == PowerUpType.SPEED_BOOST:
+                cube(base.scale(0.5, 2.0, 0.5), 20, (1.0, 0.5, 0.0))
+            elif kind == PowerUpType.DOUBLE_JUMP:
+                cube(base, 15, (0.0, 1.0, 0.0))
+                cube(base.translate(0, 0, 20), 10, (0.0, 1.0, 0.0))
+            elif kind == PowerUpType.COIN_MULTIPLIER:
+                for i in range(5):
+                    cube(base.copy().rotate(i * 72, 0, 0, 1).translate(0, 15, 0), 8, (1.0, 1.0, 0.0))
+            elif kind == PowerUpType.FLYING:
+                colour = (0.5, 0.8, 1.0)
+                self._sphere(base, 12, 8, 8, here, colour)
+                wing_angle = math.sin(sim.time * 8) * 30
+                cube(base.copy().translate(-15, 0, 0).rotate(wing_angle, 0, 0, 1).scale(2.0, 0.3, 0.1), 15, colour)
+                cube(base.copy().translate(15, 0, 0).rotate(-wing_angle, 0, 0, 1).scale(2.0, 0.3, 0.1), 15, colour)
+
+    def _collect_chasing_enemy(self, sim, view, reach):
+        enemy = sim.chasing_enemy
+        if not enemy.active or not enemy.pursuit_mode or abs(view.enemy_y - view.distance) > reach:
+            return
+        here = (view.enemy_x, view.enemy_y, enemy.z)
+        base = Transform().translate(*here)
+        glow = 0.3 + enemy.glowing_intensity * 0.4
+        self._sphere(base, 45, 12, 12, here, (1.0, 0.2 * glow, 0.0, 0.8), translucent=True)
+        self._cube(base, 35, (0.8, 0.1, 0.1))
+        for x in (-8, 8):
+            self._sphere(base.copy().translate(x, -15, 8), 3, 6, 6, here, (1.0, 1.0, 0.2))
+
+    def _collect_player(self, sim, view, effects):
+        player = sim.player
+        cube = self._cube
+        here = (view.player_x, view.distance + player.y, view.player_z)
+        base = Transform().translate(*here)
+
+        if effects and player.flying_timer > 0:
+            for i in range(3):
+                self._sphere(base.copy().translate(0, -i * 20, -i * 5), 30 - i * 5, 12, 12, here,
+                             (0.5, 0.8, 1.0, 0.3), translucent=True)
+        if effects and player.shield_timer > 0:
+            self._sphere(base, 35, 16, 16, here, (0.5, 0.5, 1.0, 0.3), translucent=True)
+
+        walk_cycle = (view.distance * 0.1) % (2 * math.pi)
+        arm_swing = math.sin(walk_cycle) * 15
+        leg_swing = math.sin(walk_cycle) * 10
+        if player.flying_timer > 0:
+            base.rotate(-15, 1, 0, 0)
+            arm_swing = math.sin(walk_cycle * 0.5) * 30
+            leg_swing = 0
+        elif player.sliding:
+            base.translate(0, 0, -30).rotate(60, 1, 0, 0)
+
+        if player.speed_boost_timer > 0:
+            body = (1.0, 0.5, 0.0)
+        elif player.magnet_timer > 0:
+            body = (1.0, 0.0, 1.0)
+        else:
+            body = (0.1, 0.5, 1.0)
+        cube(base, 25, body)
+
+        head = base.copy().translate(0, 0, 15)
+        cube(head, 12, (1.0, 0.8, 0.6))
+        cube(head.copy().translate(-3, -5, 1), 1.5, (1.0, 1.0, 1.0))
+        cube(head.copy().translate(3, -5, 1), 1.5, (1.0, 1.0, 1.0))
+
+        for side in (-1, 1):
+            arm = base.copy().translate(15 * side, 0, 3)
+            if not player.sliding:
+                arm.rotate(arm_swing * side, 1, 0, 0)
+            cube(arm.copy().translate(0, 0, -6).scale(0.4, 0.4, 1.0), 12, (1.0, 0.8, 0.6))
+            arm.translate(0, 0, -15).rotate(-30, 1, 0, 0)
+            cube(arm.copy().translate(0, 0, -6).scale(0.3, 0.3, 0.8), 12, (1.0, 0.8, 0.6))
+            cube(arm.translate(0, 0, -12), 4, (1.0, 0.7, 0.5))
+
+        for side in (-1, 1):
+            leg = base.copy().translate(6 * side, 0, -15)
+            if not player.sliding and not player.jumping:
+                leg.rotate(leg_swing * side, 1, 0, 0)
+            cube(leg.copy().translate(0, 0, -8).scale(0.5, 0.5, 1.2), 12, (0.2, 0.2, 0.8))
+            leg.translate(0, 0, -20)
+            if not player.sliding:
+                leg.rotate(20, 1, 0, 0)
+            cube(leg.copy().translate(0, 0, -8).scale(0.4, 0.4, 1.0), 12, (0.2, 0.2, 0.8))
+            cube(leg.translate(0, 0, -16).translate(0, -4, 0).scale(0.6, 1.2, 0.3), 10, (0.1, 0.1, 0.1))
+
+    def counts(self):
+        return {"programs": 1, "buffers": 2, "vertex_arrays": 1, "textures": 1}
+
+    def release(self):
+        """Delete the program, buffers and texture (needs the GL context)."""
+        glDeleteTextures([self.instance_texture])
+        glDeleteBuffers(2, [self.vertex_buffer, self.instance_buffer])
+        glDeleteVertexArrays(1, [self.vertex_array])
+        glDeleteProgram(self.program)
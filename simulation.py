@@ -0,0 +1,866 @@
+"""Headless game rules for Temple Run 3D.
+
+Everything that decides how a run plays out lives here: the player, the
+guardian, the track contents and the collision rules.  This module never
+imports OpenGL, so a Simulation can be stepped on a machine with no display;
+it does need NumPy, for the coin store (see requirements.txt).  The GLUT
+frontend in escape_runner.py only feeds it inputs and draws it.
+"""
+import math
+import random
+
+from coin_store import CoinStore
+from effects import EffectSchedule
+from events import BONUS, GUARDIAN, LIFE_LOST, POWER_UP, EventBus
+from profiler import NullProfiler
+from spatial import LaneIndex
+from track_gen import COIN, OBSTACLE, TrackGenerator, TrackPipeline
+
+
+# The rules count in ticks (timers, jump physics, scoring), so the
+# simulation always advances in fixed steps of this length
+TICK_RATE = 60
+TICK = 1 / TICK_RATE
+
+
+# Game state
+class GameState:
+    MENU = 0
+    PLAYING = 1
+    GAME_OVER = 2
+    PAUSED = 3
+
+
+# Power-up types
+class PowerUpType:
+    MAGNET = 0
+    SHIELD = 1
+    SPEED_BOOST = 2
+    DOUBLE_JUMP = 3
+    COIN_MULTIPLIER = 4
+    FLYING = 5
+
+
+# Inputs accepted by Simulation.step
+class Action:
+    LEFT = 0
+    RIGHT = 1
+    JUMP = 2
+    SLIDE = 3
+    START = 4  # New run from the menu or the game over screen
+    PAUSE = 5  # Toggles between playing and paused
+    MENU = 6   # Back to the main menu from pause or game over
+
+
+def swept_hit(offset, previous_offset, reach):
+    """Whether something offset along the track from the player, and
+    previous_offset from it a tick earlier, met the player's box of half-size
+    reach during the tick.
+
+    Either it is inside the box now or the two passed clean through each
+    other, as a long tick at high speed can carry them.  While they close by
+    less than 2 * reach a tick this is just abs(offset) < reach.
+    """
+    if -reach < offset < reach:
+        return True
+    return ((offset <= -reach and previous_offset >= reach) or
+            (offset >= reach and previous_offset <= -reach))
+
+
+class Difficulty:
+    """Tuning knobs for a session; the defaults are the game as released.
+
+    Kept to plain attributes so a sweep can pickle it to worker processes
+    and vary one knob at a time with replace().
+    """
+
+    FIELDS = ('obstacle_gap', 'power_up_gap', 'speed_milestone', 'speed_step', 'max_speed',
+              'guardian_near_speed', 'guardian_speed', 'guardian_far_speed')
+
+    def __init__(self, obstacle_gap=(400, 700), power_up_gap=(800, 1500),
+                 speed_milestone=2500, speed_step=0.1, max_speed=8.0,
+                 guardian_near_speed=1.0, guardian_speed=2.0, guardian_far_speed=2.5):
+        self.obstacle_gap = obstacle_gap    # Track units between obstacles (min, max)
+        self.power_up_gap = power_up_gap    # Track units between power-ups (min, max)
+        self.speed_milestone = speed_milestone  # Score per speed increase
+        self.speed_step = speed_step
+        self.max_speed = max_speed
+        self.guardian_near_speed = guardian_near_speed  # Within 30 of the player
+        self.guardian_speed = guardian_speed
+        self.guardian_far_speed = guardian_far_speed    # More than 100 behind
+
+    def replace(self, **changes):
+        """A copy with the given fields changed."""
+        fields = self.as_dict()
+        fields.update(changes)
+        return Difficulty(**fields)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class PowerUpEffect:
+    """How one power-up type behaves once picked up.
+
+    stacking says what picking it up again while it runs does: REFRESH
+    restarts it at duration ticks, EXTEND adds duration to what is left.
+    on_start, if given, is called with the player when it is picked up.
+    """
+
+    REFRESH = 'refresh'
+    EXTEND = 'extend'
+
+    __slots__ = ('type', 'name', 'label', 'duration', 'stacking', 'color', 'on_start')
+
+    def __init__(self, type, name, label, duration, color, stacking=REFRESH, on_start=None):
+        self.type = type
+        self.name = name    # Full name for display
+        self.label = label  # Short name for the HUD
+        self.duration = duration  # Ticks
+        self.stacking = stacking
+        self.color = color  # HUD colour
+        self.on_start = on_start
+
+
+def _start_flying(player):
+    # Cancel other movement states when starting to fly
+    player.jumping = False
+    player.sliding = False
+    player.jump_velocity = 0
+
+
+# Every power-up, by PowerUpType; the HUD lists active ones in this order
+POWER_UPS = {effect.type: effect for effect in (
+    PowerUpEffect(PowerUpType.MAGNET, "MAGNET", "MAGNET", 600, (1.0, 0.0, 1.0)),  # 10 seconds at 60 FPS
+    PowerUpEffect(PowerUpType.SHIELD, "SHIELD", "SHIELD", 600, (0.0, 1.0, 1.0)),
+    PowerUpEffect(PowerUpType.SPEED_BOOST, "SPEED BOOST", "SPEED BOOST", 480, (1.0, 0.5, 0.0)),
+    PowerUpEffect(PowerUpType.DOUBLE_JUMP, "DOUBLE JUMP", "DOUBLE JUMP", 900, (0.0, 1.0, 0.0)),
+    PowerUpEffect(PowerUpType.COIN_MULTIPLIER, "COIN MULTIPLIER", "COIN x3", 600, (1.0, 1.0, 0.0)),
+    PowerUpEffect(PowerUpType.FLYING, "FLYING MODE", "FLYING", 1200, (0.5, 0.8, 1.0),
+                  on_start=_start_flying),
+)}
+
+# Power-up names for display
+power_up_names = {power_up_type: effect.name for power_up_type, effect in POWER_UPS.items()}
+_pickup_messages = {power_up_type: name + "!" for power_up_type, name in power_up_names.items()}
+
+
+def _effect_timer(power_up_type):
+    """Player attribute for the ticks left on one power-up, backed by its schedule."""
+    def get(self):
+        return self.effects.remaining(power_up_type)
+
+    def set(self, ticks):
+        self.effects.start(power_up_type, ticks)
+
+    return property(get, set)
+
+
+# Player class
+class Player:
+    # Ticks left on each power-up; 0 when it is not active
+    magnet_timer = _effect_timer(PowerUpType.MAGNET)
+    shield_timer = _effect_timer(PowerUpType.SHIELD)
+    speed_boost_timer = _effect_timer(PowerUpType.SPEED_BOOST)
+    double_jump_timer = _effect_timer(PowerUpType.DOUBLE_JUMP)
+    coin_multiplier_timer = _effect_timer(PowerUpType.COIN_MULTIPLIER)
+    flying_timer = _effect_timer(PowerUpType.FLYING)
+
+    def __init__(self):
+        self.x = 0 # Lane position (-1, 0, 1 for left, center, right)
+        self.y = 0 # Forward position
+        self.z = 20 # Height (for jumping)
+        self.target_x = 0 # Target lane for smooth movement
+        self.lane = 0 # Current lane (-1, 0, 1)
+        self.jumping = False
+        self.sliding = False
+        self.jump_velocity = 0
+        self.slide_timer = 0
+        self.turning = False
+        self.turn_direction = 0 # -1 for left, 1 for right
+
+        # Power-up states: active power-ups by PowerUpType, on a clock of player ticks
+        self.effects = EffectSchedule()
+        self.can_double_jump = False
+        self.has_double_jumped = False
+
+        # Flying animation variables
+        self.flying_height_offset = 0
+        self.flying_animation_timer = 0
+
+    def update(self):
+        # Smooth lane movement
+        if abs(self.x - self.target_x) > 1:
+            if self.x < self.target_x:
+                self.x += 2
+            else:
+                self.x -= 2
+        else:
+            self.x = self.target_x
+
+        # Power-ups count down together; read the ones this tick depends on first
+        effects = self.effects
+        flying = PowerUpType.FLYING in effects.active
+        self.can_double_jump = PowerUpType.DOUBLE_JUMP in effects.active
+        effects.advance()
+
+        # Flying mode with smooth transition
+        if flying:
+            self.flying_animation_timer += 1
+
+            # Target flying height
+            target_height = 200
+            self.flying_height_offset = math.sin(self.flying_animation_timer * 0.1) * 25
+            target_z = target_height + self.flying_height_offset
+
+            # Smooth transition to flying height
+            if self.z < target_z:
+                self.z = min(self.z + 5, target_z)  # Ascend smoothly
+            else:
+                self.z = target_z
+
+            # Disable jumping and sliding while flying
+            self.jumping = False
+            self.sliding = False
+            self.jump_velocity = 0
+
+        else:
+            # Normal ground-based movement
+            self.flying_height_offset = 0
+            self.flying_animation_timer = 0
+
+            # Smooth descent when flying ends
+            if self.z > 20 and not self.jumping:
+                self.z = max(20, self.z - 8)  # Descend smoothly at 8 units per frame
+
+            # Jumping physics (only when not flying)
+            if self.jumping:
+                self.z += self.jump_velocity
+                self.jump_velocity -= 0.5
+                if self.z <= 20:
+                    self.z = 20
+                    self.jumping = False
+                    self.jump_velocity = 0
+                    self.has_double_jumped = False # Reset double jump
+
+            # Sliding (only when not flying)
+            if self.sliding:
+                self.slide_timer -= 1
+                if self.slide_timer <= 0:
+                    self.sliding = False
+
+    def jump(self):
+        # Can't jump while flying
+        if PowerUpType.FLYING in self.effects.active:
+            return
+
+        if not self.jumping and not self.sliding:
+            self.jumping = True
+            self.jump_velocity = 25
+        elif self.jumping and self.can_double_jump and not self.has_double_jumped:
+            # Double jump
+            self.jump_velocity = 50
+            self.has_double_jumped = True
+
+    def slide(self):
+        # Can't slide while flying
+        if PowerUpType.FLYING in self.effects.active:
+            return
+
+        if not self.jumping and not self.sliding:
+            self.sliding = True
+            self.slide_timer = 180
+
+    def move_left(self):
+        if not self.turning and self.lane > -1:
+            self.lane -= 1
+            self.target_x = self.lane * 100
+
+    def move_right(self):
+        if not self.turning and self.lane < 1:
+            self.lane += 1
+            self.target_x = self.lane * 100
+
+    def activate_power_up(self, power_up_type):
+        effect = POWER_UPS[power_up_type]
+        self.effects.start(power_up_type, effect.duration, extend=effect.stacking == PowerUpEffect.EXTEND)
+        if effect.on_start is not None:
+            effect.on_start(self)
+
+
+class ChasingEnemy:
+    def __init__(self, rng=random, difficulty=None):
+        self.rng = rng  # Source of the lane-following decisions
+        self.difficulty = difficulty if difficulty is not None else Difficulty()
+        self.x = 0  # Lane position
+        self.y = -300  # Start far behind player
+        self.z = 20  # Ground level
+        self.speed = 1.5  # Base chase speed
+        self.target_x = 0  # Target lane position
+        self.active = True
+        self.caught_player = False
+        self.pursuit_mode = False  # Activated after first life lost
+        self.previous_y = self.y  # Where the last tick started, for swept collisions
+
+        # Animation variables
+        self.animation_timer = 0
+        self.glowing_intensity = 0
+
+    def update(self, distance, player_lane, delta_time):
+        if not self.active:
+            return
+        self.previous_y = self.y
+
+        # Update animation
+        self.animation_timer += 1
+        self.glowing_intensity = (math.sin(self.animation_timer * 0.2) + 1) * 0.5
+
+        # Only start moving if pursuit mode is activated
+        if self.pursuit_mode:
+            # Calculate distance to player
+            distance_to_player = distance - self.y
+
+            # Adjust speed based on distance
+            if distance_to_player > 100:
+                self.speed = self.difficulty.guardian_far_speed  # Speed up if far behind
+            elif distance_to_player < 30:
+                self.speed = self.difficulty.guardian_near_speed  # Slow down when close
+            else:
+                self.speed = self.difficulty.guardian_speed  # Normal pursuit speed
+
+            # Move forward
+            self.y += self.speed * delta_time * 60
+
+            # Follow player's lane with some delay
+            if self.rng.randint(1, 30) == 1:  # Update target occasionally
+                self.target_x = player_lane * 100
+
+            # Smooth lane movement
+            if abs(self.x - self.target_x) > 2:
+                if self.x < self.target_x:
+                    self.x += 3
+                else:
+                    self.x -= 3
+            else:
+                self.x = self.target_x
+
+    def activate_pursuit(self, distance):
+        """Start chasing after first life lost"""
+        self.pursuit_mode = True
+        self.y = max(self.y, distance - 150)  # Move closer
+        self.previous_y = self.y  # A jump, not a sweep
+
+    def rush_attack(self, distance):
+        """Rush forward for immediate catch after second life lost"""
+        self.y = distance - 30  # Move very close
+        self.previous_y = self.y
+        self.speed = 5.0  # Fast approach
+
+    def check_collision(self, player_x, distance, previous_distance):
+        if not self.active or not self.pursuit_mode:
+            return False
+
+        # Check if enemy caught the player at any point of the tick
+        if (abs(self.x - player_x) < 40 and
+            swept_hit(self.y - distance, self.previous_y - previous_distance, 40)):
+            self.caught_player = True
+            return True
+        return False
+
+    def reset(self):
+        self.x = 0
+        self.y = -300
+        self.previous_y = self.y
+        self.speed = 1.5
+        self.active = True
+        self.caught_player = False
+        self.pursuit_mode = False
+        self.animation_timer = 0
+
+
+# Coins live in a CoinStore (coin_store.py).  The other track entities are
+# recycled through an EntityPool, so each one is set up
+# by reset() rather than __init__ and carries __slots__ instead of a __dict__
+
+# Obstacle class
+class Obstacle:
+    __slots__ = ('x', 'y', 'type', 'active')
+
+    def __init__(self, x, y, obstacle_type):
+        self.reset(x, y, obstacle_type)
+
+    def reset(self, x, y, obstacle_type):
+        self.x = x  # Lane position
+        self.y = y  # Forward position
+        self.type = obstacle_type  # 'low', 'high', 'gap'
+        self.active = True
+
+
+# Power-up class
+class PowerUp:
+    __slots__ = ('x', 'y', 'z', 'type', 'rotation', 'collected', 'float_offset')
+
+    def __init__(self, x, y, power_type):
+        self.reset(x, y, power_type)
+
+    def reset(self, x, y, power_type):
+        self.x = x
+        self.y = y
+        self.z = 30
+        self.type = power_type
+        self.rotation = 0
+        self.collected = False
+        self.float_offset = 0
+
+
+class EntityPool:
+    """Free list of retired entities of one class, handed out again by acquire().
+
+    A long session settles at a steady number of live objects instead of
+    allocating a new one for every spawn.
+    """
+
+    def __init__(self, entity_class):
+        self.entity_class = entity_class
+        self._free = []
+        self.allocated = 0  # Instances ever constructed
+        self.reused = 0     # acquire() calls served from the free list
+        self.released = 0
+
+    def acquire(self, *args):
+        if self._free:
+            entity = self._free.pop()
+            entity.reset(*args)
+            self.reused += 1
+            return entity
+        self.allocated += 1
+        return self.entity_class(*args)
+
+    def release(self, entity):
+        self._free.append(entity)
+        self.released += 1
+
+    def stats(self):
+        return {
+            "allocated": self.allocated,
+            "reused": self.reused,
+            "released": self.released,
+            "live": self.allocated + self.reused - self.released,
+            "free": len(self._free),
+        }
+
+
+def obstacle_done(obstacle):
+    return not obstacle.active
+
+
+def pickup_done(pickup):
+    return pickup.collected
+
+
+class FixedTimestep:
+    """Accumulator that turns variable frame times into whole simulation ticks.
+
+    advance() returns how many ticks to run for a frame; the leftover fraction
+    of a tick is kept in alpha so the renderer can blend between the last two
+    ticks.  time_scale runs the simulation faster or slower than real time.
+    """
+
+    def __init__(self, rate=TICK_RATE, max_substeps=5, time_scale=1.0):
+        self.dt = 1 / rate
+        self.max_substeps = max_substeps  # Catch-up clamp after a long frame
+        self.time_scale = time_scale
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.dropped_time = 0.0  # Time discarded by the clamp
+
+    def advance(self, frame_time):
+        self.accumulator += max(frame_time, 0.0) * self.time_scale
+
+        ticks = int(self.accumulator / self.dt)
+        if ticks > self.max_substeps:
+            # Too far behind: give up on the extra ticks instead of spiralling
+            self.dropped_time += (ticks - self.max_substeps) * self.dt
+            ticks = self.max_substeps
+            self.accumulator = self.accumulator % self.dt + ticks * self.dt
+
+        self.accumulator -= ticks * self.dt
+        self.alpha = min(self.accumulator / self.dt, 1.0)
+        return ticks
+
+
+class View:
+    """Positions to draw, blended between the previous and the current tick."""
+
+    def __init__(self, distance, player_x, player_z, enemy_x, enemy_y):
+        self.distance = distance
+        self.player_x = player_x
+        self.player_z = player_z
+        self.enemy_x = enemy_x
+        self.enemy_y = enemy_y
+
+
+class Simulation:
+    """One game session: all state that used to live in module globals.
+
+    Call step() once per tick with the inputs received since the previous
+    tick.  No window or GL context is needed.  Every random draw comes from
+    a generator seeded with seed and every timer from the simulation clock,
+    so the same seed and the same inputs on the same ticks replay a session
+    exactly (see replay.py).  With threaded_track, close() the session when
+    done with it to stop its track worker.
+    """
+
+    def __init__(self, seed=None, profiler=None, threaded_track=False, difficulty=None, cosmetics=True):
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.tick = 0     # step() calls so far, in any state
+        self.time = 0.0   # Seconds of play, advanced by update(); replaces wall time
+        self.recorder = None  # Receives every step's inputs; see replay.Recorder
+        self.threaded_track = threaded_track  # Build track segments on a worker thread
+        self.difficulty = difficulty if difficulty is not None else Difficulty()
+        self.cosmetics = cosmetics  # Spin coins and power-ups; only drawing needs it
+        # Times each phase of update(); see profiler.py
+        self.profiler = profiler if profiler is not None else NullProfiler()
+        # Bonuses, lost lives, guardian and power-up news; see events.py
+        self.events = EventBus()
+
+        # Entity pools outlive individual runs
+        self.obstacle_pool = EntityPool(Obstacle)
+        self.power_up_pool = EntityPool(PowerUp)
+
+        self.player = Player()
+        self.obstacles = LaneIndex()
+        self.coins = CoinStore()
+        self.power_ups = LaneIndex()
+        self.game_state = GameState.MENU
+        self.score = 0
+        self.speed = 1.5
+        self.distance = 0
+        self.previous_distance = 0  # Distance when the last tick started
+        self.coins_collected = 0
+        self.game_over_reason = ""
+        self.player_lives = 5
+        self.last_speed_increase_score = 0  # Track when we last increased speed
+
+        # Guardian tracking
+        self.chasing_enemy = ChasingEnemy(self.rng, self.difficulty)
+        self.last_life_lost_time = None
+        self.life_lost_count = 0
+
+        # Track content for the current run, built ahead in segments
+        self.track = None
+
+        # State at the start of the last tick, for render interpolation
+        self.previous = None
+
+    def reset(self):
+        """Start a fresh run."""
+        self.player = Player()
+        self.obstacles.clear(self.obstacle_pool.release)
+        self.coins.clear()
+        self.power_ups.clear(self.power_up_pool.release)
+        self.score = 0
+        self.speed = 3
+        self.distance = 0
+        self.previous_distance = 0
+        self.coins_collected = 0
+        self.game_state = GameState.PLAYING
+        if self.track is not None:
+            self.track.close()
+        # Every run gets its own layout, drawn from the session's seed
+        generator = TrackGenerator(self.rng.getrandbits(64),
+                                   obstacle_gap=self.difficulty.obstacle_gap,
+                                   power_up_gap=self.difficulty.power_up_gap)
+        self.track = TrackPipeline(generator, threaded=self.threaded_track)
+        self.player_lives = 5
+        self.last_speed_increase_score = 0
+
+        # Reset enemy tracking
+        self.chasing_enemy.reset()
+        self.last_life_lost_time = None
+        self.life_lost_count = 0
+
+    def close(self):
+        """Stop the track worker thread, if any.  A closed session can only
+        be played again after reset()."""
+        if self.track is not None:
+            self.track.close()
+
+    def pool_stats(self):
+        """Allocation and reuse counters for each entity pool and the coin store."""
+        return {
+            "obstacles": self.obstacle_pool.stats(),
+            "coins": self.coins.stats(),
+            "power_ups": self.power_up_pool.stats(),
+        }
+
+    def step(self, inputs=(), delta_time=TICK):
+        """Apply the given Actions, then advance one tick of delta_time seconds."""
+        if self.recorder is not None:
+            self.recorder.record(self.tick, inputs)
+        self.tick += 1
+        for action in inputs:
+            self.apply(action)
+
+        self.previous = self.snapshot()
+        if self.game_state == GameState.PLAYING:
+            self.update(delta_time)
+
+    def snapshot(self):
+        return (self.distance, self.player.x, self.player.z,
+                self.chasing_enemy.x, self.chasing_enemy.y)
+
+    def view(self, alpha=1.0):
+        """Return a View blended alpha of the way from the previous tick to the current one."""
+        current = self.snapshot()
+        previous = self.previous
+        if previous is None or alpha >= 1.0:
+            return View(*current)
+        return View(*(p + (c - p) * alpha for p, c in zip(previous, current)))
+
+    def apply(self, action):
+        """Apply a single Action; actions that don't fit the current state are ignored."""
+        if action == Action.START:
+            if self.game_state in (GameState.MENU, GameState.GAME_OVER):
+                self.reset()
+        elif action == Action.PAUSE:
+            if self.game_state == GameState.PLAYING:
+                self.game_state = GameState.PAUSED
+            elif self.game_state == GameState.PAUSED:
+                self.game_state = GameState.PLAYING
+        elif action == Action.MENU:
+            if self.game_state in (GameState.PAUSED, GameState.GAME_OVER):
+                self.game_state = GameState.MENU
+        elif self.game_state == GameState.PLAYING:
+            if action == Action.LEFT:
+                self.player.move_left()
+            elif action == Action.RIGHT:
+                self.player.move_right()
+            elif action == Action.JUMP:
+                self.player.jump()
+            elif action == Action.SLIDE:
+                self.player.slide()
+
+    def generate_track(self):
+        """Spawn the track content that has come within sight."""
+        for _, _, kind, x, y, spawn_type in self.track.pull(self.distance):
+            if kind == OBSTACLE:
+                self.obstacles.insert(self.obstacle_pool.acquire(x, y, spawn_type))
+            elif kind == COIN:
+                self.coins.add(x, y)
+            else:
+                self.power_ups.insert(self.power_up_pool.acquire(x, y, spawn_type))
+
+    def check_collisions(self):
+        """Apply everything the player met while moving from previous_distance
+        to distance, so a long tick cannot carry it past an obstacle or pickup."""
+        player = self.player
+        chasing_enemy = self.chasing_enemy
+        distance = self.distance
+        previous_distance = self.previous_distance
+        player_y = player.y + distance
+        previous_y = player.y + previous_distance
+
+        current_time = self.time
+        publish = self.events.publish
+        tick = self.tick
+        active = player.effects.active  # Power-ups by PowerUpType
+        flying = PowerUpType.FLYING in active
+        exposed = not flying and PowerUpType.SHIELD not in active
+
+        # Check obstacle collisions (unless shield is active OR flying)
+        if exposed:
+            for obstacle in self.obstacles.query(min(player_y, previous_y) - 50, player_y + 50, player.x, 50):
+                if obstacle.active:
+                    if (abs(obstacle.x - player.x) < 50 and
+                        swept_hit(obstacle.y - player_y, obstacle.y - previous_y, 50)):
+                        collision_happened = False
+
+                        if obstacle.type == 'low' and not player.sliding:
+                            collision_happened = True
+                            self.game_over_reason = "Hit low barrier! Should have slid!"
+                        elif obstacle.type == 'low' and player.sliding and player.z > 25:
+                            collision_happened = True
+                            self.game_over_reason = "Didn't slide low enough!"
+                        elif obstacle.type == 'high' and player.z < 70:
+                            collision_happened = True
+                            self.game_over_reason = "Hit high barrier! Should have jumped higher!"
+                        elif obstacle.type == 'gap' and player.z < 30:
+                            collision_happened = True
+                            self.game_over_reason = "Fell in gap! Should have jumped!"
+
+                        if collision_happened:
+                            self.player_lives -= 1
+                            obstacle.active = False
+
+                            # ENEMY CHASING LOGIC
+                            if self.last_life_lost_time is None:
+                                # First life lost - activate enemy pursuit
+                                self.life_lost_count = 1
+                                self.last_life_lost_time = current_time
+                                chasing_enemy.activate_pursuit(distance)
+                                publish(tick, GUARDIAN, "Guardian awakened! It's now hunting you...")
+
+                            elif (current_time - self.last_life_lost_time) <= 20:
+                                # Second life lost within 20 seconds
+                                self.life_lost_count += 1
+                                if self.life_lost_count >= 2:
+                                    chasing_enemy.rush_attack(distance)
+                                    # Enemy catches player, causing additional life loss
+                                    self.player_lives -= 1
+                                    publish(tick, GUARDIAN, "Guardian caught you due to repeated mistakes!")
+                                    self.game_over_reason = "Caught by Guardian for repeated failures!"
+
+                                    # Reset tracking
+                                    self.life_lost_count = 0
+                                    self.last_life_lost_time = None
+                            else:
+                                # More than 20 seconds passed, reset counter
+                                self.life_lost_count = 1
+                                self.last_life_lost_time = current_time
+                                chasing_enemy.activate_pursuit(distance)
+
+                            if self.player_lives <= 0:
+                                self.game_state = GameState.GAME_OVER
+                            else:
+                                if self.life_lost_count < 2:
+                                    self.game_over_reason = f"Life lost! {self.player_lives} lives remaining - Guardian approaches!"
+                            publish(tick, LIFE_LOST, self.game_over_reason, self.player_lives)
+
+                            player.jumping = False
+                            player.sliding = False
+                            player.z = 20
+
+                        else:
+                            obstacle.active = False
+                            # Bonus points for successfully avoiding obstacles
+                            if obstacle.type == 'low' and player.sliding:
+                                self.score += 150
+                                publish(tick, BONUS, "Nice slide! +150 points", 150)
+                            elif obstacle.type == 'high' and player.z > 60:
+                                self.score += 200
+                                publish(tick, BONUS, "Great jump! +200 points", 200)
+                            elif obstacle.type == 'gap' and player.z > 30:
+                                self.score += 250
+                                publish(tick, BONUS, "Perfect gap jump! +250 points", 250)
+
+        # Check if enemy caught player (separate from obstacle collisions, but not while flying)
+        if chasing_enemy.check_collision(player.x, distance, previous_distance) and exposed:
+            self.player_lives -= 1
+            if self.player_lives <= 0:
+                self.game_state = GameState.GAME_OVER
+                self.game_over_reason = "Caught by the Ancient Guardian!"
+            else:
+                self.game_over_reason = f"Guardian touched you! {self.player_lives} lives remaining"
+                chasing_enemy.y -= 80  # Push enemy back after catch
+            publish(tick, LIFE_LOST, self.game_over_reason, self.player_lives)
+
+        if flying:
+            # Auto-collect all nearby coins while flying (larger range, any lane)
+            picked = self.coins.collect_window(distance, 300, previous_distance)
+        else:
+            # Normal coin collection
+            picked = self.coins.collect_near(player.x, player_y, player.z, 40, previous_y)
+
+        if picked:
+            coin_value = 10
+            if PowerUpType.COIN_MULTIPLIER in active:
+                coin_value = 30
+            self.coins_collected += picked
+            self.score += picked * coin_value
+
+        # Check power-up collection
+        for power_up in self.power_ups.query(min(player_y, previous_y) - 40, player_y + 40, player.x, 40):
+            if (not power_up.collected and
+                abs(power_up.x - player.x) < 40 and
+                swept_hit(power_up.y - player_y, power_up.y - previous_y, 40) and
+                abs(power_up.z + power_up.float_offset - player.z) < 40):
+                power_up.collected = True
+                player.activate_power_up(power_up.type)
+                self.score += 50
+                publish(tick, POWER_UP, _pickup_messages[power_up.type], power_up.type)
+
+    def update_pickups(self):
+        """Animate coins and power-ups and apply the magnet pull."""
+        player = self.player
+        distance = self.distance
+
+        # Spin coins in view; the magnet pulls those within 200 towards the player
+        if PowerUpType.MAGNET in player.effects.active:
+            self.coins.animate(distance, 600, player.x, distance + player.y, spin=self.cosmetics)
+        elif self.cosmetics:
+            self.coins.animate(distance, 600)
+
+        # Floating animation; the float height is a rule (pickups test z
+        # against it), the spin only shows when drawn
+        float_offset = math.sin(self.time * 3) * 10
+        spin = self.cosmetics
+        for power_up in self.power_ups.query(distance - 600, distance + 600):
+            if not power_up.collected:
+                power_up.float_offset = float_offset
+                if spin:
+                    power_up.rotation = (power_up.rotation + 3) % 360
+
+    def update(self, delta_time):
+        """Advance a playing session by one tick (formerly update_game)."""
+        player = self.player
+        profiler = self.profiler
+        self.time += delta_time
+        current_time = self.time
+
+        # Reset life lost tracking if 20 seconds passed without second life lost
+        if (self.last_life_lost_time is not None and
+            (current_time - self.last_life_lost_time) > 20 and
+            self.life_lost_count < 2):
+            self.life_lost_count = 0
+            self.last_life_lost_time = None
+            self.events.publish(self.tick, GUARDIAN, "Guardian's pursuit cooled down...")
+
+        # Update player
+        with profiler.phase("player"):
+            player.update()
+
+        # Update chasing enemy
+        with profiler.phase("enemy"):
+            self.chasing_enemy.update(self.distance, player.lane, delta_time)
+
+        # Calculate current speed with power-up effects
+        current_speed = self.speed
+        if PowerUpType.SPEED_BOOST in player.effects.active:
+            current_speed *= 2.0
+
+        # Move forward
+        self.previous_distance = self.distance
+        self.distance += current_speed * delta_time * 60
+        self.score += 0.2
+
+        # Speed increase based on score (every 2500 points by default)
+        difficulty = self.difficulty
+        score_milestones = int(self.score // difficulty.speed_milestone)
+        last_milestones = int(self.last_speed_increase_score // difficulty.speed_milestone)
+        if score_milestones > last_milestones:
+            self.speed += difficulty.speed_step
+            self.speed = min(self.speed, difficulty.max_speed)
+            self.last_speed_increase_score = self.score
+
+        # Generate new track sections
+        with profiler.phase("generate_track"):
+            self.generate_track()
+
+        # Check collisions
+        with profiler.phase("check_collisions"):
+            self.check_collisions()
+
+        # Retire objects that fell behind or are already used up
+        with profiler.phase("retire"):
+            cutoff = self.distance - 1200
+            self.obstacles.retire(cutoff, obstacle_done, self.obstacle_pool.release)
+            self.coins.retire(cutoff)
+            self.power_ups.retire(cutoff, pickup_done, self.power_up_pool.release)
+
+        # Pickup animation and magnet pull (previously done while drawing)
+        with profiler.phase("pickups"):
+            self.update_pickups()
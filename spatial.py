@@ -0,0 +1,124 @@
+"""Lane-bucketed spatial index for obstacles and power-ups.
+
+Track entities sit in one of three lanes and only matter near the player or
+inside the view window, so each lane keeps its entities sorted on the forward
+y coordinate and lookups are bisect window queries instead of full scans.
+
+The track is generated in increasing y, so new entities land on the back of
+a lane and expired ones leave from the front.  Each lane is a pair of plain
+lists, since indexing a deque walks it and would make every bisect linear,
+plus the index of its first live entry.  Retiring only moves that head on;
+the dead prefix is cut off once it is longer than the live part, so each
+entity is copied a constant number of times on average.
+"""
+import bisect
+
+
+LANE_WIDTH = 100
+COMPACT_MIN = 32  # Dead entries a lane may hold before it is compacted
+
+
+class LaneIndex:
+    """Entities bucketed by lane, each bucket sorted on y.
+
+    Entities only need x and y attributes, and must not move once indexed;
+    they leave through retire() or clear().
+    """
+
+    def __init__(self, lanes=(-1, 0, 1), lane_width=LANE_WIDTH):
+        self.lanes = lanes
+        self.lane_width = lane_width
+        self._ys = {lane: [] for lane in lanes}     # Sorted y keys per lane
+        self._items = {lane: [] for lane in lanes}  # Entities, parallel to _ys
+        self._heads = dict.fromkeys(lanes, 0)       # First live entry per lane
+
+    def __len__(self):
+        return sum(len(self._items[lane]) - self._heads[lane] for lane in self.lanes)
+
+    def __iter__(self):
+        for lane in self.lanes:
+            yield from self._items[lane][self._heads[lane]:]
+
+    def lane_of(self, x):
+        lane = round(x / self.lane_width)
+        return min(max(lane, self.lanes[0]), self.lanes[-1])
+
+    def insert(self, entity):
+        lane = self.lane_of(entity.x)
+        ys = self._ys[lane]
+        items = self._items[lane]
+        if not ys or entity.y >= ys[-1]:
+            # Usual case: spawned ahead of everything already in the lane
+            ys.append(entity.y)
+            items.append(entity)
+        else:
+            i = bisect.bisect_right(ys, entity.y, self._heads[lane])
+            ys.insert(i, entity.y)
+            items.insert(i, entity)
+
+    def query(self, y_lo, y_hi, x=None, reach=None):
+        """Yield entities with y_lo < y < y_hi.
+
+        With x and reach, only lanes that can hold an entity within reach of
+        x are visited; callers still do their own exact x test.
+        """
+        half_lane = self.lane_width / 2
+        for lane in self.lanes:
+            if x is not None and abs(lane * self.lane_width - x) >= reach + half_lane:
+                continue
+            ys = self._ys[lane]
+            start = bisect.bisect_right(ys, y_lo, self._heads[lane])
+            end = bisect.bisect_left(ys, y_hi, start)
+            items = self._items[lane]
+            for i in range(start, end):
+                yield items[i]
+
+    def in_lane(self, lane, y_lo, y_hi):
+        """List of the entities in lane with y_lo < y < y_hi, in y order."""
+        ys = self._ys[lane]
+        start = bisect.bisect_right(ys, y_lo, self._heads[lane])
+        return self._items[lane][start:bisect.bisect_left(ys, y_hi, start)]
+
+    def retire(self, y_cutoff, is_dead=None, on_retire=None):
+        """Pop entities off the front of each lane and return how many went.
+
+        An entity goes once its y is <= y_cutoff, or earlier if is_dead says
+        it is finished (collected, deactivated) and it has reached the front.
+        Each retired entity is passed to on_retire, e.g. to return it to its
+        pool.  Work is proportional to the number retired.
+        """
+        retired = 0
+        for lane in self.lanes:
+            ys = self._ys[lane]
+            items = self._items[lane]
+            head = start = self._heads[lane]
+            end = len(ys)
+            while head < end and (ys[head] <= y_cutoff or
+                                  (is_dead is not None and is_dead(items[head]))):
+                if on_retire is not None:
+                    on_retire(items[head])
+                items[head] = None  # Not kept alive by the index
+                head += 1
+            if head == start:
+                continue
+            retired += head - start
+            if head == end:
+                ys.clear()
+                items.clear()
+                head = 0
+            elif head >= COMPACT_MIN and head * 2 > end:
+                del ys[:head]
+                del items[:head]
+                head = 0
+            self._heads[lane] = head
+        return retired
+
+    def clear(self, on_retire=None):
+        """Empty every lane, passing each entity to on_retire."""
+        for lane in self.lanes:
+            if on_retire is not None:
+                for entity in self._items[lane][self._heads[lane]:]:
+                    on_retire(entity)
+            self._ys[lane].clear()
+            self._items[lane].clear()
+            self._heads[lane] = 0
@@ -0,0 +1,204 @@
+"""Difficulty sweeps: many headless sessions per combination of tuning knobs.
+
+Every combination of the values given with --set is played for --runs
+sessions by a scripted or random policy, spread over a process pool with one
+worker per core, and the outcomes are aggregated into one table row per
+combination: survival distance, score and how the runs ended.
+
+    python sweep.py --set obstacle_gap=400:700,300:550 --set max_speed=8,10 --runs 2000
+    python sweep.py --policy random --set guardian_speed=1.5,2.0,2.5 --output sweep.csv
+
+Knobs are the fields of simulation.Difficulty; a:b gives a (min, max) range.
+Session i of every combination uses seed --seed + i, so combinations are
+compared on the same track seeds and policy decisions.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from simulation import Action, Difficulty, GameState, Simulation
+
+
+SURVIVED = "Survived to the tick limit"
+GAP_KNOBS = ('obstacle_gap', 'power_up_gap')  # Drawn with randint(min, max)
+
+
+def random_policy(sim, rng, tick):
+    """A random move every quarter second."""
+    if tick % 15 == 0:
+        return [rng.choice((Action.LEFT, Action.RIGHT, Action.JUMP, Action.SLIDE))]
+    return []
+
+
+def dodge_policy(sim, rng, tick):
+    """Jump or slide for the next obstacle in the lane, and wander between lanes."""
+    player = sim.player
+    distance = sim.distance
+    for obstacle in sim.obstacles.query(distance + 40, distance + 130, player.x, 50):
+        if obstacle.active and abs(obstacle.x - player.x) < 50:
+            return [Action.SLIDE if obstacle.type == 'low' else Action.JUMP]
+    if tick % 60 == 0 and rng.random() < 0.3:
+        return [rng.choice((Action.LEFT, Action.RIGHT))]
+    return []
+
+
+def idle_policy(sim, rng, tick):
+    return []
+
+
+POLICIES = {"dodge": dodge_policy, "random": random_policy, "idle": idle_policy}
+
+
+def play_session(difficulty, policy, seed, max_ticks):
+    """Play one session to game over or max_ticks; returns (distance, score, reason)."""
+    sim = Simulation(seed=seed, difficulty=difficulty)
+    rng = random.Random(seed)
+    sim.step([Action.START])
+    for tick in range(max_ticks):
+        sim.step(policy(sim, rng, tick))
+        if sim.game_state != GameState.PLAYING:
+            return sim.distance, sim.score, sim.game_over_reason
+    return sim.distance, sim.score, SURVIVED
+
+
+def run_batch(fields, policy_name, seeds, max_ticks):
+    """Worker entry point: play one session per seed with the given Difficulty fields."""
+    difficulty = Difficulty(**fields)
+    policy = POLICIES[policy_name]
+    return [play_session(difficulty, policy, seed, max_ticks) for seed in seeds]
+
+
+def parse_value(text):
+    if ":" in text:
+        return tuple(parse_value(part) for part in text.split(":"))
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def check_value(name, value):
+    """Raise ValueError unless value is usable for the knob name, so a bad
+    --set fails here rather than in every worker."""
+    if name in GAP_KNOBS:
+        if not (isinstance(value, tuple) and len(value) == 2 and
+                all(isinstance(part, int) for part in value)):
+            raise ValueError(f"{name} takes whole-number ranges min:max, not {format_value(value)}")
+        if not 0 < value[0] <= value[1]:
+            raise ValueError(f"{name} range {format_value(value)} needs 0 < min <= max")
+    elif isinstance(value, tuple):
+        raise ValueError(f"{name} takes single numbers, not {format_value(value)}")
+    elif name == 'speed_milestone' and value <= 0:
+        raise ValueError(f"speed_milestone must be positive, not {value}")
+
+
+def parse_grid(settings):
+    """Turn ["name=v1,v2", ...] into a list of {name: value} combinations."""
+    axes = []
+    for setting in settings:
+        name, _, values = setting.partition("=")
+        if name not in Difficulty.FIELDS:
+            raise ValueError(f"unknown knob {name!r}; expected one of {', '.join(Difficulty.FIELDS)}")
+        if not values:
+            raise ValueError(f"no values given for {name}")
+        axis = []
+        for text in values.split(","):
+            try:
+                value = parse_value(text)
+            except ValueError:
+                raise ValueError(f"{name}: {text!r} is not a number or min:max range") from None
+            check_value(name, value)
+            axis.append((name, value))
+        axes.append(axis)
+    return [dict(combination) for combination in itertools.product(*axes)]
+
+
+def summarize(changes, outcomes):
+    distances = sorted(outcome[0] for outcome in outcomes)
+    reasons = Counter(outcome[2] for outcome in outcomes)
+    return {
+        "changes": changes,
+        "runs": len(outcomes),
+        "mean_distance": statistics.fmean(distances),
+        "median_distance": statistics.median(distances),
+        "p90_distance": distances[min(int(0.9 * len(distances)), len(distances) - 1)],
+        "mean_score": statistics.fmean(outcome[1] for outcome in outcomes),
+        "reasons": dict(reasons.most_common()),
+    }
+
+
+def format_value(value):
+    return ":".join(map(str, value)) if isinstance(value, tuple) else str(value)
+
+
+def format_changes(changes):
+    if not changes:
+        return "defaults"
+    return " ".join(f"{name}={format_value(value)}" for name, value in changes.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep Temple Run 3D difficulty knobs headless")
+    parser.add_argument("--set", dest="settings", action="append", default=[], metavar="KNOB=V1,V2",
+                        help="values to try for one Difficulty field (repeatable)")
+    parser.add_argument("--runs", type=int, default=1000, help="sessions per combination")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="dodge")
+    parser.add_argument("--max-ticks", type=int, default=60 * 60 * 10,
+                        help="end a session that survives this long (default 10 minutes)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first session")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=25, help="sessions per worker task")
+    parser.add_argument("--output", metavar="PATH", help="also write the table as CSV")
+    args = parser.parse_args()
+
+    try:
+        grid = parse_grid(args.settings)
+    except ValueError as e:
+        parser.error(str(e))
+    base = Difficulty()
+    seeds = range(args.seed, args.seed + args.runs)
+
+    start = time.perf_counter()
+    outcomes = [[] for _ in grid]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = []
+        for index, changes in enumerate(grid):
+            fields = base.replace(**changes).as_dict()
+            for first in range(0, len(seeds), args.batch):
+                batch = seeds[first:first + args.batch]
+                futures.append((index, pool.submit(run_batch, fields, args.policy, batch, args.max_ticks)))
+        for index, future in futures:
+            outcomes[index].extend(future.result())
+    elapsed = time.perf_counter() - start
+
+    rows = [summarize(changes, results) for changes, results in zip(grid, outcomes)]
+    print(f"{len(grid)} combinations x {args.runs} sessions ({args.policy} policy) "
+          f"in {elapsed:.1f}s on {args.workers} workers\n")
+    print(f"{'combination':<40}{'mean dist':>11}{'median':>10}{'p90':>10}{'score':>9}  ending")
+    for row in rows:
+        top = ", ".join(f"{count / row['runs']:.0%} {reason}"
+                        for reason, count in list(row["reasons"].items())[:3])
+        print(f"{format_changes(row['changes']):<40}{row['mean_distance']:>11.0f}"
+              f"{row['median_distance']:>10.0f}{row['p90_distance']:>10.0f}{row['mean_score']:>9.0f}  {top}")
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["combination", "runs", "mean_distance", "median_distance",
+                             "p90_distance", "mean_score", "reasons"])
+            for row in rows:
+                writer.writerow([format_changes(row["changes"]), row["runs"],
+                                 "%.1f" % row["mean_distance"], "%.1f" % row["median_distance"],
+                                 "%.1f" % row["p90_distance"], "%.1f" % row["mean_score"],
+                                 json.dumps(row["reasons"])])
+
+
+if __name__ == "__main__":
+    main()
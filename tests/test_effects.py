@@ -0,0 +1,70 @@
+"""EffectSchedule against a plain dict of deadlines.
+
+The schedule's heap keeps stale entries for extended effects and compacts
+itself, neither of which may change what is active or when it expires.
+"""
+import random
+
+import pytest
+
+from effects import EffectSchedule
+
+
+class ReferenceSchedule:
+    """What EffectSchedule must behave like: a dict scanned every tick."""
+
+    def __init__(self):
+        self.now = 0
+        self.active = {}
+
+    def start(self, effect, ticks, extend=False):
+        deadline = self.now + ticks
+        if extend and effect in self.active:
+            deadline = self.active[effect] + ticks
+        if deadline <= self.now:
+            self.active.pop(effect, None)
+        else:
+            self.active[effect] = deadline
+
+    def advance(self):
+        self.now += 1
+        expired = [effect for effect, deadline in self.active.items() if deadline <= self.now]
+        for effect in expired:
+            del self.active[effect]
+        return expired
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_reference(seed):
+    rng = random.Random(seed)
+    schedule = EffectSchedule()
+    reference = ReferenceSchedule()
+    for _ in range(20000):
+        # Starts, refreshes every tick, extensions, shortenings and cancels
+        for _ in range(rng.randrange(4)):
+            effect = rng.randrange(6)
+            ticks = rng.randrange(-5, 60)
+            extend = rng.random() < 0.3
+            schedule.start(effect, ticks, extend)
+            reference.start(effect, ticks, extend)
+        assert sorted(schedule.advance()) == sorted(reference.advance())
+        assert schedule.active == reference.active
+        for effect in range(6):
+            assert schedule.remaining(effect) == max(0, reference.active.get(effect, 0) - reference.now)
+
+
+def test_refresh_every_tick_keeps_heap_small():
+    schedule = EffectSchedule()
+    for tick in range(10000):
+        schedule.start("flying", 1200)
+        schedule.start("magnet", 50 + tick * 7919 % 500)  # Shortened about half the time
+        schedule.advance()
+        assert len(schedule._heap) <= 2 * len(schedule.active) + 2
+
+
+def test_expires_on_its_deadline():
+    schedule = EffectSchedule()
+    schedule.start("shield", 3)
+    schedule.start("shield", 2, extend=True)
+    assert [schedule.advance() for _ in range(5)] == [[], [], [], [], ["shield"]]
+    assert len(schedule) == 0
@@ -0,0 +1,66 @@
+"""Recording a session and playing it back reproduces it exactly."""
+import random
+
+import pytest
+
+from replay import SEED_LIMIT, Recorder, Replay, ReplayPlayer, play
+from simulation import Action, GameState, Simulation
+
+
+def final_state(sim):
+    player = sim.player
+    enemy = sim.chasing_enemy
+    return (sim.tick, sim.distance, sim.score, sim.coins_collected, sim.player_lives,
+            sim.game_state, player.x, player.z, enemy.x, enemy.y, sim.rng.getstate())
+
+
+def record_session(seed, ticks):
+    """Play ticks of a session under a seeded random policy, recording it."""
+    policy = random.Random(seed)
+    sim = Simulation(seed=seed)
+    sim.recorder = Recorder(sim.seed)
+    moves = (Action.LEFT, Action.RIGHT, Action.JUMP, Action.SLIDE)
+    for tick in range(ticks):
+        inputs = []
+        if tick == 0 or (sim.game_state == GameState.GAME_OVER and tick % 100 == 0):
+            inputs.append(Action.START)
+        elif tick % 13 == 0:
+            inputs.append(policy.choice(moves))
+        if tick % 997 == 500:
+            inputs.append(Action.PAUSE)  # Paused ticks count too
+        sim.step(inputs)
+    return sim
+
+
+@pytest.mark.parametrize("seed", [1, 1234, SEED_LIMIT - 1])
+def test_round_trip(tmp_path, seed):
+    sim = record_session(seed, 12000)
+    path = tmp_path / "run.replay"
+    sim.recorder.save(path)
+
+    replay = Replay.load(path)
+    assert replay.seed == seed
+    assert replay.ticks == sim.tick
+    assert replay.inputs == sim.recorder.replay.inputs
+    assert final_state(play(replay)) == final_state(sim)
+
+
+def test_player_hands_out_inputs_by_tick():
+    player = ReplayPlayer(Replay(7, [(0, Action.START), (5, Action.JUMP), (5, Action.LEFT)], 9))
+    assert player.inputs(0) == [Action.START]
+    assert player.inputs(4) == []
+    assert player.inputs(5) == [Action.JUMP, Action.LEFT]
+    assert player.finished
+
+
+@pytest.mark.parametrize("seed", [-1, SEED_LIMIT])
+def test_recorder_rejects_seeds_the_header_cannot_hold(seed):
+    with pytest.raises(ValueError):
+        Recorder(seed)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "not.replay"
+    path.write_bytes(b"not a replay file at all")
+    with pytest.raises(ValueError):
+        Replay.load(path)
@@ -0,0 +1,32 @@
+"""Knob values are checked when --set is parsed, before any worker starts."""
+import pytest
+
+from sweep import parse_grid
+
+
+def test_grid_is_every_combination():
+    grid = parse_grid(["obstacle_gap=300:550,400:700", "max_speed=8,9.5"])
+    assert grid == [
+        {"obstacle_gap": (300, 550), "max_speed": 8},
+        {"obstacle_gap": (300, 550), "max_speed": 9.5},
+        {"obstacle_gap": (400, 700), "max_speed": 8},
+        {"obstacle_gap": (400, 700), "max_speed": 9.5},
+    ]
+
+
+@pytest.mark.parametrize("setting", [
+    "obstacle_gap=400",          # Not a range
+    "power_up_gap=1:2:3",
+    "obstacle_gap=1.5:3",        # randint() needs whole numbers
+    "obstacle_gap=700:400",      # min > max
+    "obstacle_gap=0:10",
+    "speed_milestone=0",         # Divides the score
+    "speed_milestone=-5",
+    "max_speed=8:9",             # A range where a number goes
+    "max_speed=fast",
+    "gravity=1",                 # Not a knob
+    "max_speed=",
+])
+def test_bad_settings_are_rejected(setting):
+    with pytest.raises(ValueError):
+        parse_grid([setting])
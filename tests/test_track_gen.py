@@ -0,0 +1,54 @@
+"""Track segments do not depend on the thread that built them."""
+import threading
+
+import pytest
+
+from simulation import Action, Simulation
+from track_gen import TrackGenerator, TrackPipeline
+
+
+def pull_spawns(pipeline, distance_to, step=7.5):
+    spawns = []
+    distance = 0.0
+    while distance < distance_to:
+        spawns.extend(pipeline.pull(distance))
+        distance += step
+    return spawns
+
+
+@pytest.mark.parametrize("seed", [0, 99, 2 ** 64 - 1])
+def test_threaded_segments_match_inline(seed):
+    inline = TrackPipeline(TrackGenerator(seed))
+    threaded = TrackPipeline(TrackGenerator(seed), threaded=True)
+    try:
+        expected = pull_spawns(inline, 60000)
+        assert pull_spawns(threaded, 60000) == expected
+        assert threaded.segments == inline.segments
+    finally:
+        threaded.close()
+
+
+def test_threaded_session_matches_inline():
+    sessions = [Simulation(seed=5, threaded_track=threaded) for threaded in (False, True)]
+    try:
+        for sim in sessions:
+            sim.step([Action.START])
+            for tick in range(5000):
+                sim.step([Action.JUMP] if tick % 40 == 0 else [])
+        inline, threaded = sessions
+        assert (threaded.distance, threaded.score, threaded.coins_collected, threaded.player_lives) == \
+               (inline.distance, inline.score, inline.coins_collected, inline.player_lives)
+    finally:
+        for sim in sessions:
+            sim.close()
+
+
+def test_close_stops_the_worker():
+    sim = Simulation(seed=1, threaded_track=True)
+    sim.step([Action.START])
+    worker = sim.track._worker
+    assert worker.is_alive()
+    sim.close()
+    assert not worker.is_alive()
+    sim.close()  # Closing twice is harmless
+    assert "track-generator" not in {thread.name for thread in threading.enumerate()}
@@ -0,0 +1,162 @@
+"""Track content generated ahead of the player in whole segments.
+
+The rules used to decide, tick by tick, whether the runner had passed the
+next spawn threshold and then rolled one obstacle (with its coins) or one
+power-up.  Here a TrackGenerator lays out a whole fixed-length segment of
+track at a time, in track coordinates, and a TrackPipeline keeps segments
+ready ahead of the player, optionally built on a worker thread.  The tick
+only pops the spawns that have come within sight.
+
+Each spawn carries the distance at which it appears, which is where the old
+rules would have spawned it: obstacles 1200 ahead of the player, power-ups
+1000 ahead, coins together with their obstacle.  The generator draws from
+its own random.Random, so a segment's content depends only on the seed and
+never on when, or on which thread, it was built.
+"""
+import heapq
+import queue
+import random
+import threading
+
+
+OBSTACLE = 0
+COIN = 1
+POWER_UP = 2
+
+OBSTACLE_AHEAD = 1200  # How far ahead of the player obstacles appear
+POWER_UP_AHEAD = 1000
+
+
+class Segment:
+    """Spawns for obstacle and power-up positions in start..end.
+
+    spawns holds (appear_at, order, kind, x, y, type) tuples sorted by the
+    distance at which they appear; order breaks ties in generation order.
+    """
+
+    __slots__ = ('start', 'end', 'spawns')
+
+    def __init__(self, start, end, spawns):
+        self.start = start
+        self.end = end
+        self.spawns = spawns
+
+
+class TrackGenerator:
+    """Lays out consecutive segments of chunk_length track units."""
+
+    def __init__(self, seed, chunk_length=2000, obstacle_gap=(400, 700), power_up_gap=(800, 1500)):
+        self.rng = random.Random(seed)
+        self.chunk_length = chunk_length
+        self.obstacle_gap = obstacle_gap  # (min, max) track units between obstacles
+        self.power_up_gap = power_up_gap
+        self.start = 0
+        self.next_obstacle_y = 100 + OBSTACLE_AHEAD
+        self.next_power_up_y = 800 + POWER_UP_AHEAD
+        self._order = 0
+
+    def next_segment(self):
+        rng = self.rng
+        start = self.start
+        end = start + self.chunk_length
+        spawns = []
+
+        while self.next_obstacle_y < end:
+            y = self.next_obstacle_y
+            appear_at = y - OBSTACLE_AHEAD
+            lane = rng.randint(-1, 1)
+            obstacle_type = rng.choice(['low', 'high', 'gap'])
+            spawns.append((appear_at, self._order, OBSTACLE, lane * 100, y, obstacle_type))
+            self._order += 1
+            self.next_obstacle_y = y + rng.randint(*self.obstacle_gap)
+
+            # Coins lead up to the obstacle, never in its lane
+            for i in range(3):
+                coin_lane = rng.randint(-1, 1)
+                if coin_lane != lane:
+                    spawns.append((appear_at, self._order, COIN, coin_lane * 100, y - 400 + i * 150, None))
+                    self._order += 1
+
+        while self.next_power_up_y < end:
+            y = self.next_power_up_y
+            lane = rng.randint(-1, 1)
+            power_type = rng.randint(0, 5)
+            spawns.append((y - POWER_UP_AHEAD, self._order, POWER_UP, lane * 100, y, power_type))
+            self._order += 1
+            self.next_power_up_y = y + rng.randint(*self.power_up_gap)
+
+        spawns.sort()
+        self.start = end
+        return Segment(start, end, spawns)
+
+
+class TrackPipeline:
+    """Segments from a TrackGenerator, handed out as the player reaches them.
+
+    With threaded=True a daemon thread keeps up to ahead segments queued;
+    otherwise a segment is generated in one go when the player gets near it.
+    Either way pull() only merges ready segments and pops what is due.
+    """
+
+    def __init__(self, generator, ahead=2, threaded=False):
+        self.generator = generator
+        self.threaded = threaded
+        self._due = []  # Heap of spawns from loaded segments, by appear_at
+        self._loaded_end = 0  # Track position up to which segments are loaded
+        self._quiet_until = 0  # pull() has nothing to do before this distance
+        self.segments = 0
+
+        self._stop = None
+        if threaded:
+            self._ready = queue.Queue(maxsize=ahead)
+            self._stop = threading.Event()
+            self._worker = threading.Thread(target=self._produce, name="track-generator", daemon=True)
+            self._worker.start()
+
+    def _produce(self):
+        while not self._stop.is_set():
+            segment = self.generator.next_segment()
+            while not self._stop.is_set():
+                try:
+                    self._ready.put(segment, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def _load(self):
+        if self.threaded:
+            segment = self._ready.get()
+        else:
+            segment = self.generator.next_segment()
+        for spawn in segment.spawns:
+            heapq.heappush(self._due, spawn)
+        self._loaded_end = segment.end
+        self.segments += 1
+
+    def pull(self, distance):
+        """Pop every spawn the player has passed the appearance point of, in order."""
+        if distance < self._quiet_until:
+            return ()  # Most ticks
+
+        # No later segment holds anything that appears before its start
+        # minus the longest look-ahead, so load until that passes distance
+        while self._loaded_end - OBSTACLE_AHEAD <= distance:
+            self._load()
+
+        due = self._due
+        spawns = []
+        while due and due[0][0] < distance:
+            spawns.append(heapq.heappop(due))
+        self._quiet_until = min(due[0][0] if due else float("inf"),
+                                self._loaded_end - OBSTACLE_AHEAD)
+        return spawns
+
+    def close(self):
+        """Stop the worker thread, if any."""
+        if self._stop is not None:
+            self._stop.set()
+            # Make room so a worker blocked in put() sees the stop at once
+            while not self._ready.empty():
+                self._ready.get_nowait()
+            self._worker.join()
+            self._stop = None